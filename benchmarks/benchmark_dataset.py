@@ -0,0 +1,160 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Benchmark of dataset create, read, update and delete against an in-process fake CKAN site
+
+Run from the root of the repository eg.
+
+    python benchmarks/benchmark_dataset.py --datasets 10 --resources 1 100 1000 --latency 0.01
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from os.path import abspath, dirname
+
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from hdx.configuration import Configuration
+from hdx.data.dataset import Dataset
+from hdx.utilities.fakeckan import FakeCKAN
+from hdx.utilities.metrics import percentile
+
+
+def get_configuration(project_config_dict: Optional[dict] = None) -> Configuration:
+    """Get a configuration with a throwaway API key
+
+    Args:
+        project_config_dict (Optional[dict]): Project configuration dictionary. Defaults to None (empty).
+
+    Returns:
+        Configuration: HDX configuration
+    """
+    fd, hdx_key_file = tempfile.mkstemp()
+    with os.fdopen(fd, 'w') as f:
+        f.write('12345')
+    try:
+        return Configuration(hdx_key_file=hdx_key_file, project_config_dict=project_config_dict or dict())
+    finally:
+        os.remove(hdx_key_file)
+
+
+def make_dataset(configuration: Configuration, name: str, no_resources: int) -> Dataset:
+    """Make a dataset with all required fields and a number of resources
+
+    Args:
+        configuration (Configuration): HDX configuration
+        name (str): Name of dataset
+        no_resources (int): Number of resources to add
+
+    Returns:
+        Dataset: Dataset
+    """
+    dataset = Dataset(configuration, {
+        'name': name, 'title': 'Benchmark %s' % name, 'private': False, 'notes': 'Benchmark dataset',
+        'dataset_source': 'Benchmark', 'owner_org': 'benchmark', 'dataset_date': '01/01/2016',
+        'groups': [{'name': 'world'}], 'license_id': 'cc-by', 'methodology': 'Other',
+        'data_update_frequency': '7'})
+    dataset.add_update_resources([{'name': '%s-resource-%d' % (name, i), 'format': 'csv',
+                                   'url': 'http://example.com/%s/%d.csv' % (name, i),
+                                   'description': 'Resource %d' % i} for i in range(no_resources)])
+    return dataset
+
+
+def time_operations(operation: Callable[[int], None], count: int) -> Dict:
+    """Time an operation repeated a number of times
+
+    Args:
+        operation (Callable[[int], None]): Function taking index of repetition
+        count (int): Number of repetitions
+
+    Returns:
+        Dict: Dictionary with keys count, seconds, throughput, p50 and p95
+    """
+    latencies = list()
+    start_time = time.perf_counter()
+    for i in range(count):
+        operation_start_time = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - operation_start_time)
+    seconds = time.perf_counter() - start_time
+    latencies.sort()
+    return {'count': count, 'seconds': seconds, 'throughput': count / seconds if seconds else float('inf'),
+            'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95)}
+
+
+def run_benchmark(no_datasets: int, no_resources: int, latency: float = 0, error_rate: float = 0,
+                  seed: Optional[int] = 0, project_config_dict: Optional[dict] = None) -> Dict[str, Dict]:
+    """Create, read, update and delete datasets with a number of resources against a fake CKAN site
+
+    Args:
+        no_datasets (int): Number of datasets
+        no_resources (int): Number of resources in each dataset
+        latency (float): Simulated latency of each request in seconds. Defaults to 0.
+        error_rate (float): Probability that a request fails transiently. Defaults to 0.
+        seed (Optional[int]): Seed for error injection. Defaults to 0.
+        project_config_dict (Optional[dict]): Project configuration dictionary. Defaults to None (empty).
+
+    Returns:
+        Dict[str, Dict]: Dictionary keyed by operation of timings with requests made added
+    """
+    configuration = get_configuration(project_config_dict)
+    fake = FakeCKAN(latency=latency, error_rate=error_rate, seed=seed)
+    fake.install(configuration)
+    names = ['benchmark-%d' % i for i in range(no_datasets)]
+    datasets = dict()
+
+    def create(i: int) -> None:
+        dataset = make_dataset(configuration, names[i], no_resources)
+        dataset.create_in_hdx()
+        datasets[names[i]] = dataset
+
+    def read(i: int) -> None:
+        datasets[names[i]] = Dataset.read_from_hdx(configuration, names[i])
+
+    def update(i: int) -> None:
+        dataset = datasets[names[i]]
+        dataset['notes'] = 'Updated benchmark dataset'
+        dataset.update_in_hdx()
+
+    def delete(i: int) -> None:
+        datasets[names[i]].delete_from_hdx()
+
+    results = dict()
+    for operation_name, operation in (('create', create), ('read', read), ('update', update), ('delete', delete)):
+        configuration.metrics().reset()
+        results[operation_name] = time_operations(operation, no_datasets)
+        summary = configuration.metrics().summary()
+        results[operation_name]['requests'] = sum(stats['count'] for stats in summary.values())
+    configuration.remoteckan().close()
+    return results
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark dataset operations against a fake CKAN site')
+    parser.add_argument('--datasets', type=int, default=10, help='Number of datasets per run')
+    parser.add_argument('--resources', type=int, nargs='+', default=[1, 100, 1000],
+                        help='Numbers of resources per dataset to benchmark')
+    parser.add_argument('--latency', type=float, default=0, help='Simulated latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Probability of transient errors. Creates are not retried so may fail.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+    args = parser.parse_args(args)
+    logging.disable(logging.WARNING)
+    print('%9s %9s %8s %10s %10s %10s %9s' % ('resources', 'operation', 'requests', 'ops/s', 'p50 (s)',
+                                              'p95 (s)', 'total (s)'))
+    for no_resources in args.resources:
+        retry = {'backoff_factor': 0} if args.error_rate else dict()
+        results = run_benchmark(args.datasets, no_resources, args.latency, args.error_rate, args.seed,
+                                {'retry': retry})
+        for operation_name, result in results.items():
+            print('%9d %9s %8d %10.2f %10.4f %10.4f %9.2f' % (no_resources, operation_name, result['requests'],
+                                                               result['throughput'], result['p50'], result['p95'],
+                                                               result['seconds']))
+
+
+if __name__ == '__main__':
+    main()
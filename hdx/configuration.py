@@ -3,11 +3,18 @@
 """Configuration for HDX"""
 import logging
 from collections import UserDict
+from concurrent.futures import ThreadPoolExecutor
 from os.path import expanduser, join
 
 from typing import Optional
 
+from hdx.utilities.cache import ResponseCache
+from hdx.utilities.cassette import install_cassette
 from hdx.utilities.loader import load_yaml, load_json, script_dir_plus_file
+from hdx.utilities.metrics import RequestMetrics
+from hdx.utilities.ratelimiter import RateLimiter
+from hdx.utilities.resolver import NameResolver
+from hdx.utilities.session import RemoteCKAN, get_session
 from .utilities.dictionary import merge_two_dictionaries
 
 logger = logging.getLogger(__name__)
@@ -30,6 +37,28 @@ class Configuration(UserDict):
         project_config_dict (dict): Project configuration dictionary OR
         project_config_json (str): Path to JSON Project configuration OR
         project_config_yaml (str): Path to YAML Project configuration. Defaults to config/project_configuration.yml.
+
+    The optional session key in the configuration controls the HTTP connection pool shared by all HDX objects
+    created with this configuration and the number of worker threads used for asynchronous operations
+    eg. session: {pool_connections: 10, pool_maxsize: 10, timeout: 60, max_workers: 10}. The optional retry key
+    controls retrying of transient failures eg. retry: {max_retries: 3, backoff_factor: 0.5, max_backoff: 30} and the
+    optional rate_limit key turns on adaptive rate limiting eg. rate_limit: {rate: 10, min_rate: 0.5, max_rate: 100}
+    The optional cache key turns on caching of read responses eg. cache: {max_entries: 1000, ttl: 300}
+    If the optional skip_unchanged key is True, updates that would not change an object are not sent and the object
+    type and identifier of each are appended to the skipped_updates list.
+    If the optional optimistic_updates key is True, objects read from or written to HDX are updated without reading
+    them again first, only reading and merging if HDX rejects the update.
+    The optional cassette key records all requests and responses to a file or replays them from it without network
+    access eg. cassette: {path: run.jsonl.gz, mode: record} or cassette: {path: run.jsonl.gz, mode: replay,
+    latency: True} where latency means waiting for the recorded time each request took.
+    The optional merge_strategies key sets how lists are merged when updating objects keyed by field name eg.
+    merge_strategies: {tags: replace} where the strategy is union (the default), replace or append.
+    The optional datastore key controls loading of files into the datastore eg. datastore: {batch_size: 10000,
+    max_workers: 1, sample_size: 100} where sample_size is the number of rows column types are inferred from.
+    If the optional intern_keys key is True, the keys of data read from HDX are interned to save memory. If the
+    optional drop_server_fields key is True, they are interned and fields that HDX sets itself and recalculates like
+    tracking_summary are also removed. If the optional keep_old_data key is False, the data replaced by an update is
+    not kept as the previous internal dictionary.
     """
 
     def __init__(self, **kwargs):
@@ -94,6 +123,33 @@ class Configuration(UserDict):
         if self.hdx_site not in self.data:
             raise ConfigurationError('%s not defined in configuration!' % self.hdx_site)
 
+        session_config = dict(self.data.get('session', dict()))
+        max_workers = session_config.pop('max_workers', 10)
+        session = get_session(**session_config)
+        rate_limit_config = self.data.get('rate_limit', None)
+        if rate_limit_config is None:
+            rate_limiter = None
+        else:
+            rate_limiter = RateLimiter(**rate_limit_config)
+        self._metrics = RequestMetrics()
+        self._remoteckan = RemoteCKAN(self.get_hdx_site(), apikey=self.get_api_key(), session=session,
+                                      rate_limiter=rate_limiter, metrics=self._metrics,
+                                      **self.data.get('retry', dict()))
+        cassette_config = self.data.get('cassette', None)
+        if cassette_config is not None:
+            try:
+                install_cassette(session, self.get_hdx_site(), **cassette_config)
+            except ValueError as e:
+                raise ConfigurationError(str(e))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.skipped_updates = list()
+        self._name_resolver = NameResolver()
+        cache_config = self.data.get('cache', None)
+        if cache_config is None:
+            self._cache = None
+        else:
+            self._cache = ResponseCache(**cache_config)
+
     def get_api_key(self) -> str:
         """
 
@@ -112,6 +168,61 @@ class Configuration(UserDict):
         """
         return self.data[self.hdx_site]
 
+    def remoteckan(self) -> RemoteCKAN:
+        """
+        Get the CKAN client shared by all HDX objects using this configuration. It keeps connections alive and
+        pools them so that they are reused across requests.
+
+        Returns:
+            RemoteCKAN: CKAN client
+
+        """
+        return self._remoteckan
+
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool on which asynchronous HDX operations run their blocking requests. Its size should not
+        exceed the connection pool size so that every worker can reuse a kept alive connection.
+
+        Returns:
+            ThreadPoolExecutor: Thread pool executor
+
+        """
+        return self._executor
+
+    def metrics(self) -> RequestMetrics:
+        """
+        Get the collector of metrics of every request made to HDX by HDX objects using this configuration. Hooks can
+        be added to it to receive the metrics of each request and it can summarise requests per action.
+
+        Returns:
+            RequestMetrics: Request metrics collector
+
+        """
+        return self._metrics
+
+    def cache(self) -> Optional[ResponseCache]:
+        """
+        Get the cache of read responses shared by all HDX objects using this configuration
+
+        Returns:
+            Optional[ResponseCache]: Response cache or None if caching is not turned on
+
+        """
+        return self._cache
+
+    def name_resolver(self) -> NameResolver:
+        """
+        Get the cache of dataset ids keyed by name shared by all datasets using this configuration. It lets creates
+        and updates load an existing dataset with a single request and skip the check entirely for names known not
+        to exist.
+
+        Returns:
+            NameResolver: Dataset name resolver
+
+        """
+        return self._name_resolver
+
     @staticmethod
     def load_api_key(path: str) -> str:
         """
@@ -5,14 +5,17 @@
 It also handles resource and gallery items.
 """
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from os.path import join
 
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Iterator, Tuple
 
 from hdx.configuration import Configuration
-from hdx.utilities.dictionary import merge_two_dictionaries
 from .galleryitem import GalleryItem
-from .hdxobject import HDXObject, HDXError
+from .hdxobject import HDXObject, HDXObjectList, HDXError
 from .resource import Resource
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,9 @@ class Dataset(HDXObject):
         configuration (Configuration): HDX Configuration
         initial_data (Optional[dict]): Initial dataset metadata dictionary. Defaults to None.
         include_gallery (Optional[bool]): Whether to include gallery items in dataset. Defaults to True.
+
+    When a dataset is read from HDX, its gallery is only read when get_gallery is first called unless it is needed
+    sooner to merge with gallery items being created or updated.
     """
 
     def __init__(self, configuration: Configuration, initial_data: Optional[dict] = None,
@@ -33,6 +39,7 @@ class Dataset(HDXObject):
             initial_data = dict()
         super(Dataset, self).__init__(configuration, initial_data)
         self.include_gallery = include_gallery
+        self.gallery_pending = False
         self.init_resources()
         self.init_gallery()
 
@@ -46,8 +53,10 @@ class Dataset(HDXObject):
         return {
             'show': 'package_show',
             'update': 'package_update',
+            'patch': 'package_patch',
             'create': 'package_create',
-            'delete': 'package_delete'
+            'delete': 'package_delete',
+            'search': 'package_search'
         }
 
     def __setitem__(self, key: Any, value: Any) -> None:
@@ -72,7 +81,11 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        self._separate_hdxobjects(self.resources, 'resources', 'name', Resource)
+        if self.resources:
+            self._separate_hdxobjects(self.resources, 'resources', 'name', Resource)
+        elif self.data.get('resources'):
+            self.resources.extend(self.data['resources'])
+            del self.data['resources']
 
     def separate_gallery(self):
         """Move contents of gallery key in internal dictionary into self.gallery
@@ -88,7 +101,7 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        self.resources = list()
+        self.resources = HDXObjectList(self.configuration, Resource)
 
     def add_update_resource(self, resource: Any) -> None:
         """Add new or update existing resource in dataset with new metadata
@@ -132,11 +145,10 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        for i, resource in enumerate(self.resources):
-            resourceid = resource.get('id', None)
-            if resourceid and resourceid == identifier:
-                resource.delete_from_hdx()
-                del self.resources[i]
+        position = self.resources.find('id', identifier)
+        if position is not None:
+            self.resources[position].delete_from_hdx()
+            del self.resources[position]
 
     def get_resources(self) -> List[Resource]:
         """Get dataset's resources
@@ -152,7 +164,7 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        self.gallery = list()
+        self.gallery = HDXObjectList(self.configuration, GalleryItem, key_fields=('title', 'id'))
 
     def add_update_galleryitem(self, galleryitem) -> None:
         """Add new or update existing gallery item in dataset with new metadata
@@ -197,20 +209,36 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        for i, galleryitem in enumerate(self.gallery):
-            galleryitemid = galleryitem.get('id', None)
-            if galleryitemid and galleryitemid == identifier:
-                galleryitem.delete_from_hdx()
-                del self.gallery[i]
+        position = self.get_gallery().find('id', identifier)
+        if position is not None:
+            self.gallery[position].delete_from_hdx()
+            del self.gallery[position]
+            self._invalidate_cache(self.data)
 
     def get_gallery(self) -> List[GalleryItem]:
-        """Get dataset's gallery
+        """Get dataset's gallery, reading it from HDX if it has not been read yet
 
         Returns:
             List[GalleryItem]: List of GalleryItem objects
         """
+        if self.gallery_pending:
+            self._dataset_read_gallery_from_hdx()
         return self.gallery
 
+    def _dataset_read_gallery_from_hdx(self) -> bool:
+        """Reads the dataset's gallery from HDX adding its items to self.gallery
+
+        Returns:
+            bool: True if read, False if not
+        """
+        success, result = self._read_from_hdx('gallery', self.data['id'], GalleryItem.actions()['list'])
+        if not success:
+            return False
+        self.data['gallery'] = self._compact_metadata(result)
+        self.separate_gallery()
+        self.gallery_pending = False
+        return True
+
     def update_yaml(self, path: Optional[str] = join('config', 'hdx_dataset_static.yml')) -> None:
         """Update dataset metadata with static metadata from YAML file
 
@@ -255,6 +283,98 @@ class Dataset(HDXObject):
             return dataset
         return None
 
+    @staticmethod
+    def _search_page_in_hdx(configuration: Configuration, query: str, fq: Optional[str], rows: int, start: int,
+                            **kwargs) -> dict:
+        """Reads one page of dataset search results from HDX
+
+        Args:
+            configuration (Configuration): HDX Configuration
+            query (str): Query string
+            fq (Optional[str]): Filter query string
+            rows (int): Number of datasets in page
+            start (int): Offset of first dataset in page
+            **kwargs: Other package_search parameters eg. sort
+
+        Returns:
+            dict: Dictionary with count of all matching datasets and results of this page
+        """
+        data = {'q': query, 'rows': rows, 'start': start}
+        if fq is not None:
+            data['fq'] = fq
+        data.update(kwargs)
+        try:
+            return configuration.remoteckan().call_action(Dataset.actions()['search'], data,
+                                                          requests_kwargs={'auth': ('dataproject', 'humdata')})
+        except Exception as e:
+            raise HDXError('HTTP Post failed when trying to search for %s' % query) from e
+
+    @staticmethod
+    def search_in_hdx(configuration: Configuration, query: Optional[str] = '*:*', fq: Optional[str] = None,
+                      rows: Optional[int] = 100, **kwargs) -> Iterator['Dataset']:
+        """Searches for datasets in HDX, yielding Dataset objects one page of results at a time. The next page is
+        read in the background while the current one is being processed so at most two pages are held in memory.
+        Gallery items are only read when get_gallery is called.
+
+        Args:
+            configuration (Configuration): HDX Configuration
+            query (Optional[str]): Query string. Defaults to *:* (all datasets).
+            fq (Optional[str]): Filter query string eg. organization:acled. Defaults to None.
+            rows (Optional[int]): Number of datasets to read in each page. Defaults to 100.
+            **kwargs: Other package_search parameters eg. sort
+
+        Returns:
+            Iterator[Dataset]: Datasets matching query
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start = 0
+            page = executor.submit(Dataset._search_page_in_hdx, configuration, query, fq, rows, start, **kwargs)
+            while page is not None:
+                result = page.result()
+                results = result['results']
+                start += len(results)
+                if results and start < result['count']:
+                    page = executor.submit(Dataset._search_page_in_hdx, configuration, query, fq, rows, start,
+                                           **kwargs)
+                else:
+                    page = None
+                configuration.name_resolver().seed({datasetdict['name']: datasetdict['id']
+                                                    for datasetdict in results})
+                for datasetdict in results:
+                    dataset = Dataset(configuration)
+                    dataset.data = dataset._compact_metadata(datasetdict)
+                    dataset.separate_resources()
+                    dataset.gallery_pending = True
+                    yield dataset
+
+    @staticmethod
+    def seed_name_resolver(configuration: Configuration, fq: Optional[str] = None, rows: Optional[int] = 1000,
+                           complete: Optional[bool] = False) -> int:
+        """Seeds the configuration's name resolver with the ids of all datasets in HDX or those matching a filter
+        query so that creates and updates of them need only one request to load the existing dataset
+
+        Args:
+            configuration (Configuration): HDX Configuration
+            fq (Optional[str]): Filter query string eg. organization:acled. Defaults to None (all datasets).
+            rows (Optional[int]): Number of datasets to list in each request. Defaults to 1000.
+            complete (Optional[bool]): Whether the listing includes every dataset that could be created so that
+            no request is made to check for names missing from it. Defaults to False.
+
+        Returns:
+            int: Number of datasets listed
+        """
+        ids = dict()
+        start = 0
+        while True:
+            result = Dataset._search_page_in_hdx(configuration, '*:*', fq, rows, start, fl='id,name')
+            results = result['results']
+            ids.update((datasetdict['name'], datasetdict['id']) for datasetdict in results)
+            start += len(results)
+            if not results or start >= result['count']:
+                break
+        configuration.name_resolver().seed(ids, complete)
+        return len(ids)
+
     def _dataset_load_from_hdx(self, id_or_name: str) -> bool:
         """Loads the dataset given by either id or name from HDX
 
@@ -267,17 +387,66 @@ class Dataset(HDXObject):
 
         if not self._load_from_hdx('dataset', id_or_name):
             return False
+        self.configuration.name_resolver().add(self.data.get('name'), self.data.get('id'))
         if 'resources' in self.data:
-            self.old_data['resources'] = self._copy_hdxobjects(self.resources, Resource)
+            self.old_data['resources'] = self.resources
+            self.init_resources()
             self.separate_resources()
+        self.gallery_pending = False
         if self.include_gallery:
-            success, result = self._read_from_hdx('gallery', self.data['id'], GalleryItem.actions()['list'])
-            if success:
-                self.data['gallery'] = result
-                self.old_data['gallery'] = self._copy_hdxobjects(self.gallery, GalleryItem)
-                self.separate_gallery()
+            if self.gallery:
+                gallery = self.gallery
+                self.init_gallery()
+                if self._dataset_read_gallery_from_hdx():
+                    self.old_data['gallery'] = gallery
+                else:
+                    self.gallery = gallery
+            else:
+                self.gallery_pending = True
+        return True
+
+    def _dataset_load_existing_from_hdx(self) -> bool:
+        """Loads the existing dataset with the id or name of this dataset from HDX. The id of the name is looked up
+        in the configuration's name resolver so that only one request is made and none if the name is known not to
+        exist. The name is only tried after the id if the id fails to load.
+
+        Returns:
+            bool: True if loaded, False if not
+        """
+        name = self.data.get('name')
+        identifier = self.data.get('id')
+        if not identifier and name:
+            known, identifier = self.configuration.name_resolver().resolve(name)
+            if known and identifier is None:
+                return False
+        if identifier:
+            if self._dataset_load_from_hdx(identifier):
+                return True
+            logger.warning('Failed to load dataset with id %s' % identifier)
+            if 'id' not in self.data:
+                self.configuration.name_resolver().remove(name)
+        if not name or not self._dataset_load_from_hdx(name):
+            return False
+        if identifier:
+            # the id that failed to load is stale so must not replace the loaded dataset's id when merging
+            self.old_data.pop('id', None)
         return True
 
+    @staticmethod
+    def _cache_identifiers(data: dict) -> List[str]:
+        """Get identifiers under which responses affected by writing the supplied dataset may be cached
+
+        Args:
+            data (dict): Dataset data written to HDX
+
+        Returns:
+            List[str]: Identifiers of the dataset and of its resources
+        """
+        identifiers = HDXObject._cache_identifiers(data)
+        for resource in data.get('resources', list()):
+            identifiers.extend(HDXObject._cache_identifiers(resource))
+        return identifiers
+
     def check_required_fields(self, ignore_fields: List[str] = list()) -> None:
         """Check that metadata for dataset and its resources and gallery is complete
 
@@ -306,7 +475,7 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        merge_two_dictionaries(self.data, self.old_data)
+        self._merge_dictionaries(self.data, self.old_data)
         if 'resources' in self.data:
             del self.data['resources']
         if 'gallery' in self.data:
@@ -314,45 +483,173 @@ class Dataset(HDXObject):
         old_resources = self.old_data.get('resources', None)
         if update_resources and old_resources:
             resource_dataset_id = [self.configuration['resource']['dataset_id']]
-            resource_names = set()
-            for resource in self.resources:
-                resource_name = resource['name']
-                resource_names.add(resource_name)
-                for old_resource in old_resources:
-                    if resource_name == old_resource['name']:
-                        logger.warning('Resource exists. Updating %s' % resource_name)
-                        merge_two_dictionaries(resource, old_resource)
-                        resource.check_required_fields(resource_dataset_id)
-                        break
             for old_resource in old_resources:
-                if not old_resource['name'] in resource_names:
+                resource = self.resources.get('name', old_resource['name'])
+                if resource is None:
                     old_resource.check_required_fields(resource_dataset_id)
                     self.resources.append(old_resource)
+                else:
+                    logger.warning('Resource exists. Updating %s' % old_resource['name'])
+                    self._merge_dictionaries(resource, old_resource)
+                    resource.check_required_fields(resource_dataset_id)
         old_gallery = self.old_data.get('gallery', None)
+        files_to_upload = self._dataset_files_to_upload(old_resources if update_resources else None)
         if self.resources:
             self.data['resources'] = self._convert_hdxobjects(self.resources)
-        self._save_to_hdx('update', 'id')
+        self._update_changed_in_hdx('dataset', 'id')
         self.init_resources()
         self.separate_resources()
+        self._dataset_upload_files(files_to_upload)
         if self.include_gallery and update_gallery and old_gallery:
-            self.old_data['gallery'] = self._copy_hdxobjects(self.gallery, GalleryItem)
-            galleryitem_titles = set()
+            if self.old_data is not None:
+                self.old_data['gallery'] = self._copy_hdxobjects(self.gallery, GalleryItem)
+            self._dataset_sync_gallery(old_gallery)
+
+    @staticmethod
+    def _dataset_files_to_upload(resources: Optional[List[Resource]]) -> Dict[str, str]:
+        """Helper method to get the files to upload set on resources
+
+        Args:
+            resources (Optional[List[Resource]]): Resources
+
+        Returns:
+            Dict[str, str]: Paths of files to upload keyed by resource name
+        """
+        if not resources:
+            return dict()
+        return {resource['name']: resource.file_to_upload for resource in resources
+                if isinstance(resource, Resource) and resource.file_to_upload is not None}
+
+    def _dataset_upload_files(self, files_to_upload: Dict[str, str]) -> None:
+        """Helper method to upload files to the dataset's resources in HDX after the dataset has been saved. Files are
+        uploaded concurrently and any that match the file already in HDX are skipped.
+
+        Args:
+            files_to_upload (Dict[str, str]): Paths of files to upload keyed by resource name
+
+        Returns:
+            None
+        """
+        if not files_to_upload:
+            return
+        uploads = list()
+        for resource in self.resources:
+            file_to_upload = files_to_upload.get(resource['name'])
+            if file_to_upload is not None:
+                resource.set_file_to_upload(file_to_upload)
+                uploads.append(resource.update_in_hdx)
+        self._run_concurrently(uploads)
+
+    @staticmethod
+    def _run_concurrently(functions: List[Callable[[], Any]], max_workers: Optional[int] = 10) -> None:
+        """Helper method to call functions concurrently on a bounded pool of worker threads. All functions are
+        called even if some fail, after which the first error is raised.
+
+        Args:
+            functions (List[Callable[[], Any]]): Functions to call
+            max_workers (Optional[int]): Maximum number of functions called at once. Defaults to 10.
+
+        Returns:
+            None
+        """
+        if len(functions) < 2:
+            for function in functions:
+                function()
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(functions))) as executor:
+            futures = [executor.submit(function) for function in functions]
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                raise error
+
+    def _dataset_sync_gallery(self, gallery: List[GalleryItem]) -> None:
+        """Helper method to bring the gallery items in HDX into line with the supplied gallery items by diffing
+        against the gallery items read from HDX which are in self.gallery. Only the gallery items that need creating
+        or whose fields would change are written to HDX and these writes are made concurrently. Gallery items in HDX
+        but not in the supplied gallery are kept. Gallery items in HDX whose fields already match the supplied ones are
+        only read so that any snapshots of them keep sharing their metadata.
+
+        Args:
+            gallery (List[GalleryItem]): Gallery items that should be in HDX
+
+        Returns:
+            None
+        """
+        galleryitem_dataset_id = self.configuration['galleryitem']['dataset_id']
+        ignore_on_update = self.configuration['galleryitem'].get('ignore_on_update', [])
+        galleryitems_by_title = {galleryitem['title']: galleryitem for galleryitem in gallery}
+        writes = list()
+        for hdx_galleryitem in self.gallery:
+            galleryitem = galleryitems_by_title.pop(hdx_galleryitem['title'], None)
+            if galleryitem is None:
+                continue
+            if all(key in hdx_galleryitem and hdx_galleryitem._data[key] == value
+                   for key, value in galleryitem._data.items()):
+                continue
+            hdx_fingerprints = hdx_galleryitem._fingerprint_fields(hdx_galleryitem._data)
+            self._merge_dictionaries(hdx_galleryitem, galleryitem)
+            hdx_galleryitem.check_required_fields([galleryitem_dataset_id])
+            if hdx_galleryitem._fingerprint_fields(hdx_galleryitem._data) == hdx_fingerprints:
+                continue
+            logger.warning('Gallery item exists. Updating %s' % hdx_galleryitem['title'])
+            hdx_galleryitem.check_required_fields(ignore_on_update)
+            writes.append(partial(hdx_galleryitem._save_to_hdx, 'update', 'id'))
+        for galleryitem in galleryitems_by_title.values():
+            galleryitem[galleryitem_dataset_id] = self.data['id']
+            galleryitem.check_required_fields()
+            writes.append(partial(galleryitem._save_to_hdx, 'create', 'title'))
+            self.gallery.append(galleryitem)
+        self._run_concurrently(writes)
+
+    def _dataset_optimistic_update_in_hdx(self, update_resources: bool, update_gallery: bool) -> bool:
+        """Helper method to update dataset and its resources and gallery items in HDX without first reading them if
+        the dataset can be updated optimistically. Gallery items with ids are updated and those without are created.
+        If resources are not being updated or there are none, the dataset is patched so that its resources in HDX are
+        left as they are.
+
+        Args:
+            update_resources (bool): Whether to update resources
+            update_gallery (bool): Whether to update gallery
+
+        Returns:
+            bool: True if updated, False if the dataset must be read from HDX and merged before updating
+        """
+        if not self._can_update_optimistically('id'):
+            return False
+        send_resources = update_resources and len(self.resources) != 0
+        files_to_upload = self._dataset_files_to_upload(self.resources if send_resources else None)
+        if send_resources:
+            self.data['resources'] = self._convert_hdxobjects(self.resources)
+        try:
+            self._update_changed_in_hdx('dataset', 'id', patch_only=not send_resources)
+        except HDXError as e:
+            if not self._is_conflict(e):
+                raise
+            logger.warning('Update of dataset %s was rejected. Reading it from HDX and retrying' % self.data['id'])
+            self.data.pop('resources', None)
+            return False
+        self.init_resources()
+        self.separate_resources()
+        self._dataset_upload_files(files_to_upload)
+        if self.include_gallery and update_gallery:
+            if self.gallery_pending and any('id' not in galleryitem for galleryitem in self.gallery):
+                gallery = self.gallery
+                self.init_gallery()
+                if self._dataset_read_gallery_from_hdx():
+                    self._dataset_sync_gallery(gallery)
+                    return True
+                self.gallery = gallery
             galleryitem_dataset_id = self.configuration['galleryitem']['dataset_id']
-            for i, galleryitem in enumerate(self.gallery):
-                galleryitem_title = galleryitem['title']
-                galleryitem_titles.add(galleryitem_title)
-                for old_galleryitem in old_gallery:
-                    if galleryitem_title == old_galleryitem['title']:
-                        logger.warning('Gallery item exists. Updating %s' % galleryitem_title)
-                        merge_two_dictionaries(galleryitem, old_galleryitem)
-                        galleryitem.check_required_fields([galleryitem_dataset_id])
-                        galleryitem.update_in_hdx()
-            for old_galleryitem in old_gallery:
-                if not old_galleryitem['title'] in galleryitem_titles:
-                    old_galleryitem[galleryitem_dataset_id] = self.data['id']
-                    old_galleryitem.check_required_fields()
-                    old_galleryitem.create_in_hdx()
-                    self.gallery.append(old_galleryitem)
+            writes = list()
+            for galleryitem in self.gallery:
+                if 'id' in galleryitem:
+                    writes.append(galleryitem.update_in_hdx)
+                else:
+                    galleryitem[galleryitem_dataset_id] = self.data['id']
+                    writes.append(galleryitem.create_in_hdx)
+            self._run_concurrently(writes)
+        return True
 
     def update_in_hdx(self, update_resources: Optional[bool] = True, update_gallery: Optional[bool] = True) -> None:
         """Check if dataset exists in HDX and if so, update it
@@ -364,17 +661,14 @@ class Dataset(HDXObject):
         Returns:
             None
         """
-        loaded = False
         if 'id' in self.data:
             self._check_existing_object('dataset', 'id')
-            if self._dataset_load_from_hdx(self.data['id']):
-                loaded = True
-            else:
-                logger.warning('Failed to load dataset with id %s' % self.data['id'])
-        if not loaded:
+        else:
             self._check_existing_object('dataset', 'name')
-            if not self._dataset_load_from_hdx(self.data['name']):
-                raise HDXError('No existing dataset to update!')
+        if self._dataset_optimistic_update_in_hdx(update_resources, update_gallery):
+            return
+        if not self._dataset_load_existing_from_hdx():
+            raise HDXError('No existing dataset to update!')
         self._dataset_merge_hdx_update(update_resources, update_gallery)
 
     def create_in_hdx(self) -> None:
@@ -383,37 +677,87 @@ class Dataset(HDXObject):
         Returns:
             None
         """
+        self._dataset_create_in_hdx()
+
+    def _dataset_create_in_hdx(self) -> str:
+        """Helper method to check if dataset exists in HDX and if so, update it, otherwise create it
+
+        Returns:
+            str: What was done to the dataset: created, updated or unchanged
+        """
         self.check_required_fields()
-        loadedid = None
-        if 'id' in self.data:
-            if self._dataset_load_from_hdx(self.data['id']):
-                loadedid = self.data['id']
-            else:
-                logger.warning('Failed to load dataset with id %s' % self.data['id'])
-        if not loadedid:
-            if self._dataset_load_from_hdx(self.data['name']):
-                loadedid = self.data['name']
-        if loadedid:
-            logger.warning('Dataset exists. Updating %s' % loadedid)
+        if self._dataset_load_existing_from_hdx():
+            logger.warning('Dataset exists. Updating %s' % self.data['name'])
             self._dataset_merge_hdx_update(True, True)
-            return
+            if self.unchanged:
+                return 'unchanged'
+            return 'updated'
 
         resource_dataset_id = [self.configuration['resource']['dataset_id']]
+        files_to_upload = self._dataset_files_to_upload(self.resources)
         if self.resources:
             self.data['resources'] = self._convert_hdxobjects(self.resources)
             for resource in self.resources:
                 resource.check_required_fields(resource_dataset_id)
         self._save_to_hdx('create', 'name')
+        self.configuration.name_resolver().add(self.data['name'], self.data['id'])
         self.init_resources()
         self.separate_resources()
+        self._dataset_upload_files(files_to_upload)
 
         if self.include_gallery:
-            self.old_data['gallery'] = self._copy_hdxobjects(self.gallery, GalleryItem)
-            galleryitem_dataset_id = self.configuration['galleryitem']['dataset_id']
-            for i, galleryitem in enumerate(self.gallery):
-                galleryitem[galleryitem_dataset_id] = self.data['id']
-                galleryitem.check_required_fields()
-                galleryitem.create_in_hdx()
+            if self.old_data is not None:
+                self.old_data['gallery'] = self._copy_hdxobjects(self.gallery, GalleryItem)
+            gallery = self.gallery
+            self.init_gallery()
+            self._dataset_sync_gallery(gallery)
+        return 'created'
+
+    @staticmethod
+    def create_many_in_hdx(datasets: List['Dataset'], max_workers: Optional[int] = 10,
+                           fail_fast: Optional[bool] = False) -> dict:
+        """Check if each dataset exists in HDX and if so, update it, otherwise create it. Datasets are processed
+        concurrently by a bounded pool of worker threads.
+
+        Args:
+            datasets (List[Dataset]): Datasets to create or update
+            max_workers (Optional[int]): Maximum number of datasets processed at once. Defaults to 10.
+            fail_fast (Optional[bool]): Whether to cancel datasets not yet started after a failure. Defaults to False.
+
+        Returns:
+            dict: Report with keys created, updated, unchanged, failed and cancelled each holding a list of
+            dictionaries with the dataset name and the seconds taken (and the error for failed datasets) and key
+            seconds holding the total time taken
+        """
+        report = {'created': list(), 'updated': list(), 'unchanged': list(), 'failed': list(), 'cancelled': list()}
+        start_time = time.time()
+        stop = threading.Event()
+
+        def create_dataset(dataset: Dataset) -> Tuple[str, float, Optional[Exception]]:
+            if stop.is_set():
+                return 'cancelled', 0, None
+            dataset_start_time = time.time()
+            try:
+                outcome = dataset._dataset_create_in_hdx()
+                error = None
+            except Exception as e:
+                logger.error('Failed to create or update dataset %s: %s' % (dataset.get('name'), e))
+                if fail_fast:
+                    stop.set()
+                outcome = 'failed'
+                error = e
+            return outcome, time.time() - dataset_start_time, error
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(create_dataset, dataset) for dataset in datasets]
+            for dataset, future in zip(datasets, futures):
+                outcome, seconds, error = future.result()
+                entry = {'name': dataset.get('name'), 'seconds': seconds}
+                if error is not None:
+                    entry['error'] = error
+                report[outcome].append(entry)
+        report['seconds'] = time.time() - start_time
+        return report
 
     def delete_from_hdx(self) -> None:
         """Deletes a dataset from HDX.
@@ -421,4 +765,6 @@ class Dataset(HDXObject):
         Returns:
             None
         """
+        name = self.data.get('name')
         self._delete_from_hdx('dataset', 'id')
+        self.configuration.name_resolver().remove(name)
@@ -19,6 +19,8 @@ class GalleryItem(HDXObject):
         configuration (Configuration): HDX Configuration
         initial_data (Optional[dict]): Initial gallery item metadata dictionary. Defaults to None.
     """
+    __slots__ = ()
+
     def __init__(self, configuration: Configuration, initial_data: Optional[dict] = None):
         if not initial_data:
             initial_data = dict()
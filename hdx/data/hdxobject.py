@@ -4,22 +4,38 @@
 New HDX objects should extend this in similar fashion to Resource for example.
 """
 import abc
+import asyncio
 import copy
 import logging
+from bisect import bisect_left, insort
 from collections import UserDict
+from collections.abc import MutableSequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-import ckanapi
-from ckanapi.errors import NotFound
-from typing import Optional, List, Any, Tuple, TypeVar, Union
+from ckanapi.errors import NotFound, ValidationError
+from typing import Optional, List, Any, Tuple, TypeVar, Union, Callable, Dict, Iterable, Iterator
 
 from hdx.configuration import Configuration
-from hdx.utilities.dictionary import merge_two_dictionaries
+from hdx.utilities.dictionary import merge_two_dictionaries, dict_fingerprint, dict_diff, intern_keys
 from hdx.utilities.loader import load_yaml_into_existing_dict, load_json_into_existing_dict
 
 logger = logging.getLogger(__name__)
 
 HDXObjectUpperBound = TypeVar('T', bound='HDXObject')
 
+# Fields that HDX sets itself and so are ignored when deciding whether an update changes anything
+SERVER_FIELDS = ('revision_id', 'revision_timestamp', 'metadata_created', 'metadata_modified', 'tracking_summary',
+                 'num_resources', 'num_tags', 'total_res_downloads', 'isopen', 'created', 'last_modified',
+                 'cache_last_updated', 'webstore_last_updated')
+
+# Fields that show an object's data was read from HDX and so can be updated without reading it again
+REVISION_FIELDS = ('revision_id', 'metadata_modified', 'created')
+
+# Fields that HDX sets itself and recalculates on update so can be dropped from data read from HDX to save memory
+DROPPABLE_FIELDS = tuple(field for field in SERVER_FIELDS if field not in REVISION_FIELDS) + ('cache_url',
+                                                                                              'webstore_url')
+
 
 class HDXError(Exception):
     pass
@@ -29,11 +45,17 @@ class HDXObject(UserDict):
     """HDXObject abstract class containing helper functions for creating, checking, and updating HDX objects.
     New HDX objects should extend this in similar fashion to Resource for example.
 
+    The attributes of HDX objects are declared in __slots__ so that they are not also held in an instance dictionary.
+    UserDict does not declare __slots__, so HDX objects still have an (empty) instance dictionary. Subclasses with
+    their own attributes should declare them in __slots__ too.
+
     Args:
         configuration (Configuration): HDX Configuration
         initial_data (dict): Initial metadata dictionary
     """
     __metaclass__ = abc.ABCMeta
+    __slots__ = ('_data', 'collection', 'shared', 'configuration', 'old_data', 'hdx_fingerprints', 'unchanged',
+                 'hdxpostsite')
 
     @staticmethod
     @abc.abstractmethod
@@ -46,11 +68,135 @@ class HDXObject(UserDict):
         pass
 
     def __init__(self, configuration: Configuration, initial_data: dict):
+        self.collection = None
+        self.shared = None
         super(HDXObject, self).__init__(initial_data)
         self.configuration = configuration
         self.old_data = None
-        self.hdxpostsite = ckanapi.RemoteCKAN(configuration.get_hdx_site(),
-                                              apikey=configuration.get_api_key())
+        self.hdx_fingerprints = None
+        self.unchanged = False
+        self.hdxpostsite = configuration.remoteckan()
+
+    @property
+    def data(self) -> dict:
+        """Internal metadata dictionary. If it is shared with a snapshot, it is copied first since the caller may
+        change it.
+
+        Returns:
+            dict: Internal metadata dictionary
+        """
+        if self.shared is not None:
+            self._own()
+        return self._data
+
+    @data.setter
+    def data(self, data: dict) -> None:
+        if self.shared is not None:
+            self.shared[0] -= 1
+            self.shared = None
+        if self.collection is not None:
+            self.collection.rekey(self, self._data, data)
+        self._data = data
+
+    def _own(self) -> None:
+        """Stop sharing internal dictionary with snapshots by taking a deep copy of it, unless all the snapshots
+        sharing it have already taken their own copies
+
+        Returns:
+            None
+        """
+        shared = self.shared
+        if shared is None:
+            return
+        self.shared = None
+        shared[0] -= 1
+        if shared[0] > 0:
+            self._data = copy.deepcopy(self._data)
+
+    def snapshot(self) -> HDXObjectUpperBound:
+        """Get a copy of the HDX object that shares its internal dictionary until either of them is changed, at which
+        point the one being changed takes a deep copy. Changes are detected when made through the HDX object eg.
+        hdxobject['key'] = value or when a nested dictionary or list is read from it.
+
+        Returns:
+            T <= HDXObject: Copy of HDX object
+        """
+        hdxobject = self.__class__(self.configuration)
+        if self.shared is None:
+            self.shared = [1]
+        self.shared[0] += 1
+        hdxobject._data = self._data
+        hdxobject.shared = self.shared
+        return hdxobject
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._data[key]
+        if self.shared is not None and isinstance(value, (dict, list, UserDict)):
+            self._own()
+            value = self._data[key]
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if self.shared is not None:
+            self._own()
+        if self.collection is not None and key in self.collection.key_fields and self._data.get(key) != value:
+            self.collection.rekey(self, self._data, dict(self._data, **{key: value}))
+        self._data[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        if self.shared is not None:
+            self._own()
+        if self.collection is not None and key in self.collection.key_fields and key in self._data:
+            new_data = {field: value for field, value in self._data.items() if field != key}
+            self.collection.rekey(self, self._data, new_data)
+        del self._data[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+    def _attributes(self) -> Iterator[Tuple[str, Any]]:
+        """Get attributes of HDX object whether held in slots or in an instance dictionary
+
+        Returns:
+            Iterator[Tuple[str, Any]]: Iterator of (attribute name, value)
+        """
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if hasattr(self, name):
+                    yield name, getattr(self, name)
+        yield from getattr(self, '__dict__', {}).items()
+
+    def __copy__(self) -> HDXObjectUpperBound:
+        hdxobject = self.__class__.__new__(self.__class__)
+        for name, value in self._attributes():
+            setattr(hdxobject, name, value)
+        hdxobject.collection = None
+        hdxobject.shared = None
+        hdxobject._data = self.data.copy()
+        return hdxobject
+
+    def __deepcopy__(self, memo: dict) -> HDXObjectUpperBound:
+        hdxobject = self.__class__.__new__(self.__class__)
+        memo[id(self)] = hdxobject
+        for name, value in self._attributes():
+            if name not in ('configuration', 'hdxpostsite', 'collection', 'shared'):
+                value = copy.deepcopy(value, memo)
+            setattr(hdxobject, name, value)
+        hdxobject.collection = None
+        hdxobject.shared = None
+        return hdxobject
+
+    def copy(self) -> HDXObjectUpperBound:
+        return self.__copy__()
 
     def get_old_data_dict(self) -> None:
         """Get previous internal dictionary
@@ -97,14 +243,22 @@ class HDXObject(UserDict):
             raise HDXError("Empty %s identifier!" % object_type)
         if action is None:
             action = self.actions()['show']
+        cache = self.configuration.cache()
+        if cache is not None:
+            found, result = cache.get(action, id_field)
+            if found:
+                return True, result
         try:
             result = self.hdxpostsite.call_action(action, {'id': id_field},
                                                   requests_kwargs={'auth': ('dataproject', 'humdata')})
-            return True, result
         except NotFound as e:
             return False, "%s not found!" % id_field
         except Exception as e:
             raise HDXError('HTTP Get failed when trying to read %s' % id_field) from e
+        if cache is not None:
+            aliases = self._cache_identifiers(result) if isinstance(result, dict) else None
+            cache.set(action, id_field, result, aliases)
+        return True, result
 
     def _load_from_hdx(self, object_type: str, id_field: str) -> bool:
         """Helper method to load the HDX object given by identifier from HDX
@@ -119,7 +273,10 @@ class HDXObject(UserDict):
         success, result = self._read_from_hdx(object_type, id_field)
         if success:
             self.old_data = self.data
+            result = self._compact_metadata(result)
             self.data = result
+            if self.configuration.get('skip_unchanged', False) or self.configuration.get('patch_updates', False):
+                self.hdx_fingerprints = self._fingerprint_fields(result)
             return True
         return False
 
@@ -137,6 +294,66 @@ class HDXObject(UserDict):
         """
         return
 
+    @classmethod
+    def read_many_from_hdx(cls, configuration: Configuration, identifiers: Iterable[str],
+                           max_workers: Optional[int] = 10) -> Tuple[Dict[str, Optional[HDXObjectUpperBound]],
+                                                                     Dict[str, Exception]]:
+        """Reads the HDX objects given by identifiers from HDX concurrently using a bounded pool of worker threads.
+        A failure reading one object does not stop the others being read.
+
+        Args:
+            configuration (Configuration): HDX Configuration
+            identifiers (Iterable[str]): HDX object identifiers
+            max_workers (Optional[int]): Maximum number of reads in flight at once. Defaults to 10.
+
+        Returns:
+            (Dict[str, Optional[T <= HDXObject]], Dict[str, Exception]): (HDX object or None if not found keyed by
+            identifier, Error keyed by identifier)
+        """
+        results = dict()
+        errors = dict()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(identifier, executor.submit(cls.read_from_hdx, configuration, identifier))
+                       for identifier in identifiers]
+            for identifier, future in futures:
+                try:
+                    results[identifier] = future.result()
+                except Exception as e:
+                    logger.error('Failed to read %s: %s' % (identifier, e))
+                    errors[identifier] = e
+        return results, errors
+
+    @staticmethod
+    def _run_in_executor(configuration: Configuration, function: Callable[..., Any], *args,
+                         **kwargs) -> asyncio.Future:
+        """Helper method to run a blocking HDX operation on the configuration's thread pool without blocking the
+        event loop
+
+        Args:
+            configuration (Configuration): HDX Configuration
+            function (Callable[..., Any]): Blocking function to run
+            *args: Positional arguments to pass to function
+            **kwargs: Keyword arguments to pass to function
+
+        Returns:
+            asyncio.Future: Future that resolves to the return value of function
+        """
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(configuration.executor(), partial(function, *args, **kwargs))
+
+    @classmethod
+    async def read_from_hdx_async(cls, configuration: Configuration, identifier: str) -> Optional[HDXObjectUpperBound]:
+        """Asynchronously read the HDX object given by identifier from HDX and return it
+
+        Args:
+            configuration (Configuration): HDX Configuration
+            identifier (str): HDX object identifier
+
+        Returns:
+            Optional[T <= HDXObject]: HDX object if successful read, None if not
+        """
+        return await cls._run_in_executor(configuration, cls.read_from_hdx, configuration, identifier)
+
     def _check_existing_object(self, object_type: str, id_field_name: str):
         if not self.data:
             raise HDXError("No data in %s!" % object_type)
@@ -192,8 +409,125 @@ class HDXObject(UserDict):
         Returns:
             None
         """
-        merge_two_dictionaries(self.data, self.old_data)
+        self._merge_dictionaries(self.data, self.old_data)
         self.check_required_fields(self.configuration['%s' % object_type].get('ignore_on_update', []))
+        self._update_changed_in_hdx(object_type, id_field_name)
+
+    def _merge_dictionaries(self, a: dict, b: dict) -> dict:
+        """Helper method to merge HDX object metadata b into a. Lists are merged as a keyed union so that elements with
+        the same name or id, like tags and groups, are merged rather than duplicated, unless the merge_strategies
+        configuration option gives another strategy (append or replace) for the list's key eg. {'tags': 'replace'}.
+
+        Args:
+            a (dict): HDX object metadata to merge into
+            b (dict): HDX object metadata to merge from
+
+        Returns:
+            dict: Merged metadata
+        """
+        return merge_two_dictionaries(a, b, self.configuration.get('merge_strategies', None), 'union')
+
+    def _compact_metadata(self, data: Any) -> Any:
+        """Helper method to make metadata read from HDX take less memory if the intern_keys or drop_server_fields
+        configuration option is True by copying it with its keys interned so that the same keys in different HDX
+        objects are stored only once. If drop_server_fields is True, fields that HDX sets itself and recalculates on
+        update like tracking_summary are also removed, but not those needed to tell that the data was read from HDX
+        like revision_id. Otherwise metadata is returned as is, since copying it costs more than parsing it.
+
+        Args:
+            data (Any): HDX object metadata or list of it
+
+        Returns:
+            Any: Compacted metadata
+        """
+        if not isinstance(data, (dict, list)):
+            return data
+        drop_server_fields = self.configuration.get('drop_server_fields', False)
+        if not drop_server_fields and not self.configuration.get('intern_keys', False):
+            return data
+        return intern_keys(data, DROPPABLE_FIELDS if drop_server_fields else ())
+
+    def _retire_data(self, data: Optional[dict]) -> None:
+        """Helper method to keep data replaced by an update as the previous internal dictionary unless the
+        keep_old_data configuration option is False in which case it is discarded to save memory
+
+        Args:
+            data (Optional[dict]): Previous internal dictionary
+
+        Returns:
+            None
+        """
+        self.old_data = data if self.configuration.get('keep_old_data', True) else None
+
+    @staticmethod
+    def _fingerprint_fields(data: dict) -> dict:
+        """Helper method to fingerprint each field of the supplied data ignoring fields set by HDX
+
+        Args:
+            data (dict): HDX object metadata
+
+        Returns:
+            dict: Fingerprint of each field keyed by field name
+        """
+        return {key: dict_fingerprint(data[key], SERVER_FIELDS) for key in data if key not in SERVER_FIELDS}
+
+    def _changed_fields(self) -> Optional[dict]:
+        """Helper method to find which fields of the data to be sent in an update differ from those loaded from HDX
+        ignoring fields set by HDX. Fields are only compared if the skip_unchanged or patch_updates configuration
+        options are True.
+
+        Returns:
+            Optional[dict]: (HDX fingerprint, New fingerprint) keyed by field name, where fingerprint is None if field
+            is missing, or None if fields were not compared
+        """
+        if self.hdx_fingerprints is None:
+            return None
+        return dict_diff(self.hdx_fingerprints, self._fingerprint_fields(self.data), no_key=None)
+
+    def _update_changed_in_hdx(self, object_type: str, id_field_name: str, patch_only: Optional[bool] = False) -> None:
+        """Helper method to send an update of the HDX object to HDX. If the skip_unchanged configuration option is True,
+        no update is sent when nothing has changed and the object type and identifier are recorded in the
+        configuration's skipped_updates list. If the patch_updates configuration option is True and the object type
+        supports patching, only changed fields are sent falling back to a full update if patching fails, so nothing is
+        sent either when nothing has changed. If patch_only is True, a patch is always sent so that fields missing from
+        the data are left as they are in HDX.
+
+        Args:
+            object_type (str): Description of HDX object type (for messages)
+            id_field_name (str): Name of field containing HDX object identifier
+            patch_only (Optional[bool]): Whether to only send a patch. Defaults to False.
+
+        Returns:
+            None
+        """
+        changed_fields = self._changed_fields()
+        if patch_only and changed_fields is not None:
+            changed_fields = {key: fingerprints for key, fingerprints in changed_fields.items()
+                              if fingerprints[1] is not None}
+        patchable = patch_only or (self.configuration.get('patch_updates', False) and 'patch' in self.actions())
+        self.unchanged = changed_fields == dict() and (patchable or self.configuration.get('skip_unchanged', False))
+        if self.unchanged:
+            identifier = self.data[id_field_name]
+            logger.info('No changes to %s %s. Skipping update' % (object_type, identifier))
+            self.configuration.skipped_updates.append((object_type, identifier))
+            self._retire_data(self.old_data)
+            return
+        if patch_only:
+            patch = {key: self.data[key] for key in (self.data if changed_fields is None else changed_fields)}
+            patch[id_field_name] = self.data[id_field_name]
+            self._save_to_hdx('patch', id_field_name, patch)
+            return
+        if changed_fields is not None and patchable:
+            removed = [key for key, (_, new) in changed_fields.items() if new is None]
+            if not removed:
+                patch = {key: self.data[key] for key in changed_fields}
+                patch[id_field_name] = self.data[id_field_name]
+                try:
+                    self._save_to_hdx('patch', id_field_name, patch)
+                    return
+                except HDXError as e:
+                    logger.warning('Failed to patch %s %s (%s). Sending full update' %
+                                   (object_type, self.data[id_field_name], e))
         self._save_to_hdx('update', id_field_name)
 
     @abc.abstractmethod
@@ -205,6 +539,17 @@ class HDXObject(UserDict):
         """
         return
 
+    async def update_in_hdx_async(self, **kwargs) -> None:
+        """Asynchronously check if HDX object exists in HDX and if so, update it
+
+        Args:
+            **kwargs: Parameters to pass to update_in_hdx
+
+        Returns:
+            None
+        """
+        await self._run_in_executor(self.configuration, self.update_in_hdx, **kwargs)
+
     def _update_in_hdx(self, object_type: str, id_field_name: str) -> None:
         """Helper method to check if HDX object exists in HDX and if so, update it
 
@@ -216,46 +561,146 @@ class HDXObject(UserDict):
             None
         """
 
+        if self._optimistic_update_in_hdx(object_type, id_field_name):
+            return
         self._check_load_existing_object(object_type, id_field_name)
         self._merge_hdx_update(object_type, id_field_name)
 
-    def _write_to_hdx(self, action: str, data: dict, id_field_name: str) -> Union[Tuple[bool, dict], Tuple[bool, str]]:
+    def _can_update_optimistically(self, id_field_name: str) -> bool:
+        """Helper method to check if the optimistic_updates configuration option is True and the object's data was
+        read from HDX, shown by it having an identifier and a revision, so it can be updated without reading it again
+
+        Args:
+            id_field_name (str): Name of field containing HDX object identifier
+
+        Returns:
+            bool: True if object can be updated without reading it first
+        """
+        if not self.configuration.get('optimistic_updates', False) or id_field_name not in self.data:
+            return False
+        return any(field in self.data for field in REVISION_FIELDS)
+
+    @staticmethod
+    def _is_conflict(error: HDXError) -> bool:
+        """Helper method to check if a failed write was rejected because the object in HDX is not as expected ie. it
+        no longer exists or is no longer valid to update with the data sent
+
+        Args:
+            error (HDXError): Error raised by write
+
+        Returns:
+            bool: True if write was rejected by HDX as a conflict
+        """
+        return isinstance(error.__cause__, (NotFound, ValidationError))
+
+    def _optimistic_update_in_hdx(self, object_type: str, id_field_name: str) -> bool:
+        """Helper method to update HDX object in HDX without first reading it if it can be updated optimistically
+
+        Args:
+            object_type (str): Description of HDX object type (for messages)
+            id_field_name (str): Name of field containing HDX object identifier
+
+        Returns:
+            bool: True if updated, False if the object must be read from HDX and merged before updating
+        """
+        if not self._can_update_optimistically(id_field_name):
+            return False
+        self.check_required_fields(self.configuration['%s' % object_type].get('ignore_on_update', []))
+        try:
+            self._update_changed_in_hdx(object_type, id_field_name)
+        except HDXError as e:
+            if not self._is_conflict(e):
+                raise
+            logger.warning('Update of %s %s was rejected. Reading it from HDX and retrying' %
+                           (object_type, self.data[id_field_name]))
+            return False
+        return True
+
+    def _write_to_hdx(self, action: str, data: dict, id_field_name: str,
+                      files: Optional[dict] = None) -> Union[Tuple[bool, dict], Tuple[bool, str]]:
         """Creates or updates an HDX object in HDX and return HDX object metadata dict
 
         Args:
-            action (str): Action to perform: 'create' or 'update'
+            action (str): Action to perform: 'create', 'update', 'patch' or 'delete'
             data (dict): Data to write to HDX
             id_field_name (str): Name of field containing HDX object identifier
+            files (Optional[dict]): Paths of files to upload keyed by field name. Defaults to None.
 
         Returns:
             (bool, dict): (True/False, HDX object metadata/Error)
         """
         try:
-            result = self.hdxpostsite.call_action(self.actions()[action], data,
+            result = self.hdxpostsite.call_action(self.actions()[action], data, files=files,
                                                   requests_kwargs={'auth': ('dataproject', 'humdata')})
             return True, result
         except Exception as e:
             raise HDXError('HTTP Post failed when trying to %s %s' % (action, self.data[id_field_name])) from e
 
-    def _save_to_hdx(self, action: str, id_field_name: str) -> None:
+    def _save_to_hdx(self, action: str, id_field_name: str, data: Optional[dict] = None,
+                     files: Optional[dict] = None) -> None:
         """Creates or updates an HDX object in HDX, saving current data and replacing with returned HDX object data
         from HDX
 
         Args:
-            action (str): Action to perform: 'create' or 'update'
+            action (str): Action to perform: 'create', 'update', 'patch' or 'delete'
             id_field_name (str): Name of field containing HDX object identifier
+            data (Optional[dict]): Data to send if not the internal dictionary eg. changed fields for a patch.
+            Defaults to None.
+            files (Optional[dict]): Paths of files to upload keyed by field name. Defaults to None.
 
         Returns:
             None
         """
-        success, result = self._write_to_hdx(action, self.data, id_field_name)
+        if data is None:
+            data = self.data
+        self._invalidate_cache(self.data)
+        success, result = self._write_to_hdx(action, data, id_field_name, files)
 
         if success:
-            self.old_data = self.data
-            self.data = result
+            self._invalidate_cache(result)
+            if isinstance(result, dict) and self.configuration.get('optimistic_updates', False) and \
+                    (self.configuration.get('skip_unchanged', False) or
+                     self.configuration.get('patch_updates', False)):
+                self.hdx_fingerprints = self._fingerprint_fields(result)
+            else:
+                self.hdx_fingerprints = None
+            self._retire_data(self.data)
+            self.data = self._compact_metadata(result)
         else:
             raise HDXError('Failed to %s %s\n%s' % (action, self.data[id_field_name], result))
 
+    @staticmethod
+    def _cache_identifiers(data: dict) -> List[str]:
+        """Get identifiers under which responses affected by writing the supplied data may be cached
+
+        Args:
+            data (dict): Data written to HDX
+
+        Returns:
+            List[str]: Identifiers of the object and of the dataset containing it
+        """
+        identifiers = list()
+        for key in ('id', 'name', 'package_id', 'dataset_id'):
+            identifier = data.get(key)
+            if isinstance(identifier, str):
+                identifiers.append(identifier)
+        return identifiers
+
+    def _invalidate_cache(self, data: Any) -> None:
+        """Remove any cached responses that writing the supplied data makes stale
+
+        Args:
+            data (Any): Data written to or returned from HDX
+
+        Returns:
+            None
+        """
+        cache = self.configuration.cache()
+        if cache is None or not isinstance(data, (dict, UserDict)):
+            return
+        for identifier in self._cache_identifiers(data):
+            cache.invalidate(identifier)
+
     @abc.abstractmethod
     def create_in_hdx(self) -> None:
         """Abstract method to check if resource exists in HDX and if so, update it, otherwise create it
@@ -265,6 +710,14 @@ class HDXObject(UserDict):
         """
         return
 
+    async def create_in_hdx_async(self) -> None:
+        """Asynchronously check if HDX object exists in HDX and if so, update it, otherwise create it
+
+        Returns:
+            None
+        """
+        await self._run_in_executor(self.configuration, self.create_in_hdx)
+
     def _create_in_hdx(self, object_type: str, id_field_name: str, name_field_name: str) -> None:
         """Helper method to check if resource exists in HDX and if so, update it, otherwise create it
 
@@ -293,6 +746,14 @@ class HDXObject(UserDict):
         """
         return
 
+    async def delete_from_hdx_async(self) -> None:
+        """Asynchronously delete HDX object from HDX
+
+        Returns:
+            None
+        """
+        await self._run_in_executor(self.configuration, self.delete_from_hdx)
+
     def _delete_from_hdx(self, object_type: str, id_field_name: str) -> None:
         """Helper method to deletes a resource from HDX
 
@@ -334,14 +795,17 @@ class HDXObject(UserDict):
         Returns:
             None
         """
-        found = False
-        for hdxobject in hdxobjects:
-            if hdxobject[id_field] == new_hdxobject[id_field]:
-                merge_two_dictionaries(hdxobject, new_hdxobject)
-                found = True
-                break
-        if not found:
-            hdxobjects.append(hdxobjectclass(self.configuration, new_hdxobject))
+        if isinstance(hdxobjects, HDXObjectList):
+            hdxobject = hdxobjects.get(id_field, new_hdxobject[id_field])
+            if hdxobject is not None:
+                self._merge_dictionaries(hdxobject, new_hdxobject)
+                return
+        else:
+            for hdxobject in hdxobjects:
+                if hdxobject[id_field] == new_hdxobject[id_field]:
+                    self._merge_dictionaries(hdxobject, new_hdxobject)
+                    return
+        hdxobjects.append(hdxobjectclass(self.configuration, new_hdxobject))
 
     def _convert_hdxobjects(self, hdxobjects: List[HDXObjectUpperBound]) -> List[HDXObjectUpperBound]:
         """Helper function to convert supplied list of HDX objects to a list of dict
@@ -352,6 +816,8 @@ class HDXObject(UserDict):
         Returns:
             list[dict]: List of HDX objects converted to simple dictionaries
         """
+        if isinstance(hdxobjects, HDXObjectList):
+            return hdxobjects.data_list()
         newhdxobjects = list()
         for hdxobject in hdxobjects:
             newhdxobjects.append(hdxobject.data)
@@ -359,19 +825,22 @@ class HDXObject(UserDict):
 
     def _copy_hdxobjects(self, hdxobjects: List[HDXObjectUpperBound], hdxobjectclass: type) -> List[
         HDXObjectUpperBound]:
-        """Helper function to make a deep copy of a supplied list of HDX objects
+        """Helper function to copy a supplied list of HDX objects. Each copy is a copy-on-write snapshot so the
+        metadata is only deep copied if the copy or the original is later changed.
 
         Args:
             hdxobjects (list[T <= HDXObject]): List of HDX objects to copy
             hdxobjectclass (type): Type of the HDX Objects to be copied
 
         Returns:
-            list[T <= HDXObject]: Deep copy of list of HDX objects
+            list[T <= HDXObject]: Copy of list of HDX objects
         """
         newhdxobjects = list()
         for hdxobject in hdxobjects:
-            newhdxobjectdata = copy.deepcopy(hdxobject.data)
-            newhdxobjects.append(hdxobjectclass(self.configuration, newhdxobjectdata))
+            if isinstance(hdxobject, hdxobjectclass):
+                newhdxobjects.append(hdxobject.snapshot())
+            else:
+                newhdxobjects.append(hdxobjectclass(self.configuration, copy.deepcopy(hdxobject.data)))
         return newhdxobjects
 
     def _separate_hdxobjects(self, hdxobjects: List[HDXObjectUpperBound], hdxobjects_name: str, id_field: str,
@@ -390,16 +859,493 @@ class HDXObject(UserDict):
             None
         """
         new_hdxobjects = self.data.get(hdxobjects_name, None)
-        if new_hdxobjects:
+        if new_hdxobjects and isinstance(hdxobjects, HDXObjectList):
+            for new_hdxobject in new_hdxobjects:
+                hdxobject = hdxobjects.get(id_field, new_hdxobject[id_field])
+                if hdxobject is None:
+                    hdxobjects.append(hdxobjectclass(self.configuration, new_hdxobject))
+                else:
+                    self._merge_dictionaries(hdxobject, new_hdxobject)
+            del self.data[hdxobjects_name]
+        elif new_hdxobjects:
             hdxobject_names = set()
             for hdxobject in hdxobjects:
                 hdxobject_name = hdxobject[id_field]
                 hdxobject_names.add(hdxobject_name)
                 for new_hdxobject in new_hdxobjects:
                     if hdxobject_name == new_hdxobject[id_field]:
-                        merge_two_dictionaries(hdxobject, new_hdxobject)
+                        self._merge_dictionaries(hdxobject, new_hdxobject)
                         break
             for new_hdxobject in new_hdxobjects:
                 if not new_hdxobject[id_field] in hdxobject_names:
                     hdxobjects.append(hdxobjectclass(self.configuration, new_hdxobject))
             del self.data[hdxobjects_name]
+
+
+class _Ranks(object):
+    """Counts of live slots of a list with deleted slots (a Fenwick tree) so that the position of a slot among the
+    live ones and the slot at a position can be found in logarithmic time
+
+    Args:
+        size (int): Number of slots, all of which are live
+    """
+
+    def __init__(self, size: int):
+        self.tree = [0] + [i & -i for i in range(1, size + 1)]
+
+    def prefix(self, slot: int) -> int:
+        """Get number of live slots before slot
+
+        Args:
+            slot (int): Slot
+
+        Returns:
+            int: Number of live slots before slot
+        """
+        total = 0
+        while slot > 0:
+            total += self.tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def add(self, slot: int, delta: int) -> None:
+        """Change count of slot
+
+        Args:
+            slot (int): Slot
+            delta (int): 1 if slot becomes live, -1 if it is deleted
+
+        Returns:
+            None
+        """
+        slot += 1
+        while slot < len(self.tree):
+            self.tree[slot] += delta
+            slot += slot & -slot
+
+    def append(self) -> None:
+        """Add a live slot at the end
+
+        Returns:
+            None
+        """
+        slot = len(self.tree)
+        self.tree.append(1 + self.prefix(slot - 1) - self.prefix(slot - (slot & -slot)))
+
+    def pop(self) -> None:
+        """Remove the slot at the end
+
+        Returns:
+            None
+        """
+        self.tree.pop()
+
+    def slot(self, position: int) -> int:
+        """Get slot of the live slot at position
+
+        Args:
+            position (int): Position among live slots
+
+        Returns:
+            int: Slot
+        """
+        remaining = position + 1
+        slot = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if slot + step < len(self.tree) and self.tree[slot + step] < remaining:
+                slot += step
+                remaining -= self.tree[slot]
+            step >>= 1
+        return slot
+
+
+class HDXObjectList(MutableSequence):
+    """List of HDX objects that holds metadata dictionaries as given, eg. straight from a package_show response, and
+    only wraps each in an HDX object when it is first accessed. Reading one resource of a dataset with thousands of
+    resources therefore only builds one Resource object.
+
+    HDX objects can also be found by the value of a key field like name or id in constant time using an index that is
+    built when first needed. The index is kept up to date as objects are added, replaced or deleted and as the key
+    fields of HDX objects in the list change. Deleted objects leave a gap that is skipped until gaps outnumber the
+    objects, when the list is compacted, so that deleting is not proportional to the length of the list.
+
+    Args:
+        configuration (Configuration): HDX Configuration
+        hdxobjectclass (type): Type of the HDX objects in the list
+        hdxobjects (Optional[Iterable[Union[T <= HDXObject, dict]]]): Initial HDX objects or metadata dictionaries.
+        Defaults to None.
+        key_fields (Optional[Tuple[str, ...]]): Fields to index. Defaults to ('name', 'id').
+    """
+    DELETED = object()
+
+    def __init__(self, configuration: Configuration, hdxobjectclass: type,
+                 hdxobjects: Optional[Iterable[Union[HDXObjectUpperBound, dict]]] = None,
+                 key_fields: Optional[Tuple[str, ...]] = ('name', 'id')):
+        self.configuration = configuration
+        self.hdxobjectclass = hdxobjectclass
+        self.key_fields = key_fields
+        self.slots = list()
+        self.ranks = _Ranks(0)
+        self.deleted = 0
+        self.index = None
+        if hdxobjects:
+            self.extend(hdxobjects)
+
+    def __deepcopy__(self, memo: dict) -> 'HDXObjectList':
+        hdxobjectlist = HDXObjectList(self.configuration, self.hdxobjectclass, key_fields=self.key_fields)
+        memo[id(self)] = hdxobjectlist
+        hdxobjectlist.extend(copy.deepcopy(self._live_items(), memo))
+        return hdxobjectlist
+
+    def _live_items(self) -> List[Union[HDXObjectUpperBound, dict]]:
+        """Get HDX objects or metadata dictionaries in list skipping deleted slots
+
+        Returns:
+            List[Union[T <= HDXObject, dict]]: HDX objects or metadata dictionaries
+        """
+        if not self.deleted:
+            return list(self.slots)
+        return [item for item in self.slots if item is not self.DELETED]
+
+    def _track(self, item: Union[HDXObjectUpperBound, dict]) -> None:
+        """Make HDX object tell this list when its key fields change
+
+        Args:
+            item (Union[T <= HDXObject, dict]): HDX object or metadata dictionary
+
+        Returns:
+            None
+        """
+        if isinstance(item, HDXObject):
+            item.collection = self
+
+    def _index_item(self, index: dict, slot: int, item: Union[HDXObjectUpperBound, dict]) -> None:
+        """Add key field values of item to index keeping the slots of each value in ascending order
+
+        Args:
+            index (dict): Index of slots keyed by (key field, value)
+            slot (int): Slot of item in list
+            item (Union[T <= HDXObject, dict]): HDX object or metadata dictionary
+
+        Returns:
+            None
+        """
+        data = item._data if isinstance(item, HDXObject) else item
+        for field in self.key_fields:
+            value = data.get(field)
+            if value is not None:
+                insort(index.setdefault((field, value), list()), slot)
+
+    def _unindex_item(self, slot: int, item: Union[HDXObjectUpperBound, dict]) -> None:
+        """Remove key field values of item from index
+
+        Args:
+            slot (int): Slot of item in list
+            item (Union[T <= HDXObject, dict]): HDX object or metadata dictionary
+
+        Returns:
+            None
+        """
+        data = item._data if isinstance(item, HDXObject) else item
+        if self.index is None or data is None:
+            return
+        for field in self.key_fields:
+            value = data.get(field)
+            if value is not None:
+                self._remove_slot((field, value), slot)
+
+    def _remove_slot(self, key: Tuple[str, Any], slot: int) -> None:
+        """Remove slot from the slots of key in index
+
+        Args:
+            key (Tuple[str, Any]): (Key field, value)
+            slot (int): Slot of item in list
+
+        Returns:
+            None
+        """
+        slots = self.index.get(key)
+        if slots is None:
+            return
+        position = bisect_left(slots, slot)
+        if position < len(slots) and slots[position] == slot:
+            del slots[position]
+            if not slots:
+                del self.index[key]
+
+    def _find_slot(self, item: HDXObjectUpperBound, keys: Iterable[Tuple[str, Any]]) -> Optional[int]:
+        """Find slot of HDX object using the index entries of keys it is known to have
+
+        Args:
+            item (T <= HDXObject): HDX object
+            keys (Iterable[Tuple[str, Any]]): (Key field, value) pairs under which item is indexed
+
+        Returns:
+            Optional[int]: Slot of item or None if not found
+        """
+        for key in keys:
+            for slot in self.index.get(key, ()):
+                if self.slots[slot] is item:
+                    return slot
+        return None
+
+    def rekey(self, item: HDXObjectUpperBound, old_data: Optional[dict], new_data: Optional[dict]) -> None:
+        """Update index for a change of the key fields of an HDX object in the list
+
+        Args:
+            item (T <= HDXObject): HDX object
+            old_data (Optional[dict]): Metadata before the change (only key fields are needed)
+            new_data (Optional[dict]): Metadata after the change (only key fields are needed)
+
+        Returns:
+            None
+        """
+        if self.index is None:
+            return
+        old_data = old_data or dict()
+        new_data = new_data or dict()
+        old_keys = [(field, old_data.get(field)) for field in self.key_fields if old_data.get(field) is not None]
+        new_keys = [(field, new_data.get(field)) for field in self.key_fields if new_data.get(field) is not None]
+        if old_keys == new_keys:
+            return
+        slot = self._find_slot(item, old_keys)
+        if slot is None:
+            self.index = None
+            return
+        for key in old_keys:
+            self._remove_slot(key, slot)
+        for key in new_keys:
+            insort(self.index.setdefault(key, list()), slot)
+
+    def invalidate(self) -> None:
+        """Discard index so that it is rebuilt on next lookup
+
+        Returns:
+            None
+        """
+        self.index = None
+
+    def _slot(self, position: int) -> int:
+        """Get slot of position allowing negative positions counted from the end
+
+        Args:
+            position (int): Position in list
+
+        Returns:
+            int: Slot in list
+        """
+        length = len(self)
+        if position < 0:
+            position += length
+        if not 0 <= position < length:
+            raise IndexError('list index out of range')
+        if not self.deleted:
+            return position
+        return self.ranks.slot(position)
+
+    def _position(self, slot: int) -> int:
+        """Get position of slot
+
+        Args:
+            slot (int): Slot in list
+
+        Returns:
+            int: Position in list
+        """
+        if not self.deleted:
+            return slot
+        return self.ranks.prefix(slot)
+
+    def _reset(self, items: List[Union[HDXObjectUpperBound, dict]], index: Optional[dict] = None) -> None:
+        """Replace contents of list with items without any deleted slots
+
+        Args:
+            items (List[Union[T <= HDXObject, dict]]): HDX objects or metadata dictionaries
+            index (Optional[dict]): Index of the items. Defaults to None (build on next lookup).
+
+        Returns:
+            None
+        """
+        self.slots = items
+        self.ranks = _Ranks(len(items))
+        self.deleted = 0
+        self.index = index
+
+    def _compact(self) -> None:
+        """Remove deleted slots moving the slots in the index accordingly
+
+        Returns:
+            None
+        """
+        new_slots = dict()
+        items = list()
+        for slot, item in enumerate(self.slots):
+            if item is not self.DELETED:
+                new_slots[slot] = len(items)
+                items.append(item)
+        index = None
+        if self.index is not None:
+            index = {key: [new_slots[slot] for slot in slots] for key, slots in self.index.items()}
+        self._reset(items, index)
+
+    def find(self, field: str, value: Any) -> Optional[int]:
+        """Find position of first HDX object whose key field has value
+
+        Args:
+            field (str): Key field eg. name
+            value (Any): Value of key field
+
+        Returns:
+            Optional[int]: Position in list or None if not found
+        """
+        if self.index is None:
+            index = dict()
+            for slot, item in enumerate(self.slots):
+                if item is not self.DELETED:
+                    self._index_item(index, slot, item)
+            self.index = index
+        slots = self.index.get((field, value))
+        if not slots:
+            return None
+        return self._position(slots[0])
+
+    def get(self, field: str, value: Any) -> Optional[HDXObjectUpperBound]:
+        """Get first HDX object whose key field has value
+
+        Args:
+            field (str): Key field eg. name
+            value (Any): Value of key field
+
+        Returns:
+            Optional[T <= HDXObject]: HDX object or None if not found
+        """
+        position = self.find(field, value)
+        if position is None:
+            return None
+        return self._materialise(self._slot(position))
+
+    def _materialise(self, slot: int) -> HDXObjectUpperBound:
+        """Get HDX object in slot, wrapping its metadata dictionary in an HDX object if not done already
+
+        Args:
+            slot (int): Slot in list
+
+        Returns:
+            T <= HDXObject: HDX object
+        """
+        item = self.slots[slot]
+        if not isinstance(item, HDXObject):
+            item = self.hdxobjectclass(self.configuration, item)
+            item.collection = self
+            self.slots[slot] = item
+        return item
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[HDXObjectUpperBound, List[HDXObjectUpperBound]]:
+        if isinstance(index, slice):
+            return [self._materialise(self._slot(i)) for i in range(*index.indices(len(self)))]
+        return self._materialise(self._slot(index))
+
+    def __iter__(self) -> Iterator[HDXObjectUpperBound]:
+        for slot in range(len(self.slots)):
+            if self.slots[slot] is not self.DELETED:
+                yield self._materialise(slot)
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            items = self._live_items()
+            items[index] = value
+            for item in value:
+                self._track(item)
+            self._reset(items)
+            return
+        slot = self._slot(index)
+        self._unindex_item(slot, self.slots[slot])
+        self.slots[slot] = value
+        self._track(value)
+        if self.index is not None:
+            self._index_item(self.index, slot, value)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        if isinstance(index, slice):
+            items = self._live_items()
+            del items[index]
+            self._reset(items)
+            return
+        slot = self._slot(index)
+        self._unindex_item(slot, self.slots[slot])
+        if slot == len(self.slots) - 1:
+            self.slots.pop()
+            self.ranks.pop()
+            return
+        self.slots[slot] = self.DELETED
+        self.ranks.add(slot, -1)
+        self.deleted += 1
+        if self.deleted > len(self.slots) // 2:
+            self._compact()
+
+    def __len__(self) -> int:
+        return len(self.slots) - self.deleted
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, HDXObjectList)):
+            return NotImplemented
+        if isinstance(other, HDXObjectList):
+            other = other._live_items()
+        other = [item._data if isinstance(item, HDXObject) else item for item in other]
+        return self.data_list() == [item.data if isinstance(item, UserDict) else item for item in other]
+
+    def __repr__(self) -> str:
+        return repr(self.data_list())
+
+    def _append(self, value: Union[HDXObjectUpperBound, dict]) -> None:
+        """Add HDX object or metadata dictionary at the end of the list
+
+        Args:
+            value (Union[T <= HDXObject, dict]): HDX object or metadata dictionary
+
+        Returns:
+            None
+        """
+        self.slots.append(value)
+        self.ranks.append()
+        self._track(value)
+        if self.index is not None:
+            self._index_item(self.index, len(self.slots) - 1, value)
+
+    def insert(self, index: int, value: Union[HDXObjectUpperBound, dict]) -> None:
+        if index >= len(self):
+            self._append(value)
+            return
+        if index < 0:
+            index = max(index + len(self), 0)
+        if self.deleted:
+            self._compact()
+        self.slots.insert(index, value)
+        self.ranks = _Ranks(len(self.slots))
+        self._track(value)
+        if self.index is not None:
+            self.index = {key: [slot + 1 if slot >= index else slot for slot in slots]
+                          for key, slots in self.index.items()}
+            self._index_item(self.index, index, value)
+
+    def extend(self, values: Iterable[Union[HDXObjectUpperBound, dict]]) -> None:
+        for value in values:
+            self._append(value)
+
+    def data_list(self) -> List[dict]:
+        """Get metadata dictionaries of HDX objects without wrapping any in HDX objects or copying any shared with
+        snapshots, so they should only be read
+
+        Returns:
+            List[dict]: List of metadata dictionaries
+        """
+        return [item._data if isinstance(item, HDXObject) else item for item in self._live_items()]
+
+    def materialised(self) -> int:
+        """Get number of HDX objects that have been wrapped in HDX objects
+
+        Returns:
+            int: Number of HDX objects built
+        """
+        return sum(1 for item in self.slots if isinstance(item, HDXObject))
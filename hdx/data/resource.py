@@ -4,10 +4,14 @@
 import logging
 from os.path import join
 
-from typing import Optional, List
+from typing import Any, Optional, List, Union
+
+from ckanapi import NotFound
 
 from hdx.configuration import Configuration
-from .hdxobject import HDXObject
+from hdx.utilities.datastore import BatchError, batched, read_csv_records, run_batches
+from hdx.utilities.upload import file_digest
+from .hdxobject import HDXObject, HDXError
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +23,13 @@ class Resource(HDXObject):
         configuration (Configuration): HDX Configuration
         initial_data (Optional[dict]): Initial resource metadata dictionary. Defaults to None.
     """
+    __slots__ = ('file_to_upload',)
+
     def __init__(self, configuration: Configuration, initial_data: Optional[dict] = None):
         if not initial_data:
             initial_data = dict()
         super(Resource, self).__init__(configuration, initial_data)
+        self.file_to_upload = None
 
     @staticmethod
     def actions() -> dict:
@@ -34,6 +41,7 @@ class Resource(HDXObject):
         return {
             'show': 'resource_show',
             'update': 'resource_update',
+            'patch': 'resource_patch',
             'create': 'resource_create',
             'delete': 'resource_delete'
         }
@@ -87,8 +95,81 @@ class Resource(HDXObject):
         Returns:
             None
         """
+        if self.file_to_upload is not None:
+            ignore_fields = list(ignore_fields) + ['url']
         self._check_required_fields('resource', ignore_fields)
 
+    def set_file_to_upload(self, file_to_upload: str) -> None:
+        """Delete any existing url and set the file to upload to the resource when it is created or updated in HDX.
+        The file is streamed from disk in chunks. On update, the upload is skipped if the SHA256 hash and size of the
+        file match the hash and size of the resource in HDX.
+
+        Args:
+            file_to_upload (str): Local path to file to upload
+
+        Returns:
+            None
+        """
+        if 'url' in self.data:
+            del self.data['url']
+        self.file_to_upload = file_to_upload
+
+    def _set_file_hash(self) -> bool:
+        """Helper method to set hash and size of resource from file to upload
+
+        Returns:
+            bool: True if hash or size differs from the resource's existing hash and size, False if not
+        """
+        file_hash, size = file_digest(self.file_to_upload)
+        if self.data.get('hash') == file_hash and str(self.data.get('size')) == str(size):
+            return False
+        self.data['hash'] = file_hash
+        self.data['size'] = size
+        return True
+
+    def _update_changed_in_hdx(self, object_type: str, id_field_name: str, patch_only: Optional[bool] = False) -> None:
+        """Helper method to send an update of the resource to HDX, uploading any file to upload unless it is the
+        same as the file in HDX
+
+        Args:
+            object_type (str): Description of HDX object type (for messages)
+            id_field_name (str): Name of field containing HDX object identifier
+            patch_only (Optional[bool]): Whether to only send a patch. Defaults to False.
+
+        Returns:
+            None
+        """
+        if self.file_to_upload is not None and not self._set_file_hash():
+            logger.info('File %s is unchanged in resource %s. Skipping upload' %
+                        (self.file_to_upload, self.data[id_field_name]))
+            self.file_to_upload = None
+        super(Resource, self)._update_changed_in_hdx(object_type, id_field_name, patch_only)
+
+    def _save_to_hdx(self, action: str, id_field_name: str, data: Optional[dict] = None,
+                     files: Optional[dict] = None) -> None:
+        """Creates or updates resource in HDX uploading any file to upload
+
+        Args:
+            action (str): Action to perform: 'create', 'update', 'patch' or 'delete'
+            id_field_name (str): Name of field containing HDX object identifier
+            data (Optional[dict]): Data to send if not the internal dictionary eg. changed fields for a patch.
+            Defaults to None.
+            files (Optional[dict]): Paths of files to upload keyed by field name. Defaults to None.
+
+        Returns:
+            None
+        """
+        if self.file_to_upload is not None and action != 'delete' and files is None:
+            if action == 'create':
+                self._set_file_hash()
+            if data is not None:
+                data['hash'] = self.data['hash']
+                data['size'] = self.data['size']
+            files = {'upload': self.file_to_upload}
+        super(Resource, self)._save_to_hdx(action, id_field_name, data, files)
+        if files is not None:
+            self.file_to_upload = None
+
     def update_in_hdx(self) -> None:
         """Check if resource exists in HDX and if so, update it
 
@@ -113,6 +194,131 @@ class Resource(HDXObject):
         """
         self._delete_from_hdx('resource', 'id')
 
-    def create_datastore(self) -> None:
-        """TODO"""
-        pass
+    def _datastore_action(self, action: str, data: dict) -> Any:
+        """Helper method to call a datastore action on the resource
+
+        Args:
+            action (str): Datastore action eg. datastore_create
+            data (dict): Data to send. The resource id is added to it.
+
+        Returns:
+            Any: Result of action
+        """
+        data['resource_id'] = self.data['id']
+        try:
+            return self.hdxpostsite.call_action(action, data, requests_kwargs={'auth': ('dataproject', 'humdata')})
+        except Exception as e:
+            raise HDXError('HTTP Post failed when trying to %s %s' % (action, self.data['id'])) from e
+
+    def delete_datastore(self) -> None:
+        """Delete the resource's datastore table if it has one
+
+        Returns:
+            None
+        """
+        try:
+            self._datastore_action('datastore_delete', {'force': True})
+        except HDXError as e:
+            if not isinstance(e.__cause__, NotFound):
+                raise
+        self._invalidate_cache(self.data)
+
+    def _load_datastore(self, path: str, fields: Optional[List[dict]], primary_key: Optional[Union[str, List[str]]],
+                        indexes: Optional[Union[str, List[str]]], method: str, batch_size: Optional[int],
+                        max_workers: Optional[int]) -> None:
+        """Helper method to create or alter the resource's datastore table and send the rows of a CSV file to it in
+        batches
+
+        Args:
+            path (str): Path to CSV file
+            fields (Optional[List[dict]]): Datastore fields each with id and type keys. None to infer.
+            primary_key (Optional[Union[str, List[str]]]): Fields making up primary key. None to leave unchanged.
+            indexes (Optional[Union[str, List[str]]]): Fields to index. None to leave unchanged.
+            method (str): datastore_upsert method: insert or upsert
+            batch_size (Optional[int]): Number of rows in each batch. None for configuration value.
+            max_workers (Optional[int]): Maximum number of batches to send concurrently. None for configuration value.
+
+        Returns:
+            None
+        """
+        if 'id' not in self.data:
+            raise HDXError('No id field (mandatory) in resource!')
+        datastore_config = self.configuration.get('datastore', dict())
+        if batch_size is None:
+            batch_size = datastore_config.get('batch_size', 10000)
+        if max_workers is None:
+            max_workers = datastore_config.get('max_workers', 1)
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            fields, records = read_csv_records(f, fields, datastore_config.get('sample_size', 100))
+            data = {'fields': fields, 'force': True}
+            if primary_key is not None:
+                data['primary_key'] = primary_key
+            if indexes is not None:
+                data['indexes'] = indexes
+            try:
+                self._datastore_action('datastore_create', data)
+                no_batches = run_batches(lambda batch: self._datastore_action('datastore_upsert',
+                                                                              {'records': batch, 'method': method,
+                                                                               'force': True}),
+                                         batched(records, batch_size), max_workers)
+            except BatchError as e:
+                raise HDXError('Failed to load rows of %s into datastore of resource %s: %s' %
+                               (path, self.data['id'], '; '.join('rows %d-%d (%s)' %
+                                                                  (error['start'] + 1, error['start'] + error['size'],
+                                                                   error['error'].__cause__ or error['error'])
+                                                                  for error in e.errors))) from e
+            finally:
+                self._invalidate_cache(self.data)
+        logger.info('Loaded %s into datastore of resource %s in %d batches' % (path, self.data['id'], no_batches))
+
+    def create_datastore(self, path: str, fields: Optional[List[dict]] = None,
+                         primary_key: Optional[Union[str, List[str]]] = None,
+                         indexes: Optional[Union[str, List[str]]] = None, batch_size: Optional[int] = None,
+                         max_workers: Optional[int] = None) -> None:
+        """Replace the resource's datastore table with the rows of a CSV file with a header row. The file is read one
+        row at a time and the rows are inserted in batches, so only the batches being sent are held in memory. If
+        fields are not given, column types are inferred from the first rows. If loading fails, HDXError is raised
+        listing the rows of every failed batch in file order.
+
+        Args:
+            path (str): Path to CSV file
+            fields (Optional[List[dict]]): Datastore fields each with id and type keys. Defaults to None (infer).
+            primary_key (Optional[Union[str, List[str]]]): Fields making up primary key. Defaults to None.
+            indexes (Optional[Union[str, List[str]]]): Fields to index. Defaults to None.
+            batch_size (Optional[int]): Number of rows in each batch. Defaults to None (datastore configuration
+            batch_size or 10000).
+            max_workers (Optional[int]): Maximum number of batches to send concurrently. Defaults to None (datastore
+            configuration max_workers or 1).
+
+        Returns:
+            None
+        """
+        if 'id' not in self.data:
+            raise HDXError('No id field (mandatory) in resource!')
+        self.delete_datastore()
+        self._load_datastore(path, fields, primary_key, indexes, 'insert', batch_size, max_workers)
+
+    def update_datastore(self, path: str, fields: Optional[List[dict]] = None,
+                         primary_key: Optional[Union[str, List[str]]] = None,
+                         indexes: Optional[Union[str, List[str]]] = None, batch_size: Optional[int] = None,
+                         max_workers: Optional[int] = None) -> None:
+        """Upsert the rows of a CSV file with a header row into the resource's datastore table by primary key,
+        creating the table if it does not exist. Rows with keys already in the table are updated and others are
+        inserted, so a file of only the new or changed rows can be loaded without reloading the whole table. The
+        primary key and indexes of the table are set if given. Otherwise the table must already have a primary key.
+        Loading works as for create_datastore.
+
+        Args:
+            path (str): Path to CSV file
+            fields (Optional[List[dict]]): Datastore fields each with id and type keys. Defaults to None (infer).
+            primary_key (Optional[Union[str, List[str]]]): Fields making up primary key. Defaults to None (unchanged).
+            indexes (Optional[Union[str, List[str]]]): Fields to index. Defaults to None (unchanged).
+            batch_size (Optional[int]): Number of rows in each batch. Defaults to None (datastore configuration
+            batch_size or 10000).
+            max_workers (Optional[int]): Maximum number of batches to send concurrently. Defaults to None (datastore
+            configuration max_workers or 1).
+
+        Returns:
+            None
+        """
+        self._load_datastore(path, fields, primary_key, indexes, 'upsert', batch_size, max_workers)
@@ -36,6 +36,7 @@ def facade(projectmainfn: Callable[[Configuration], None], **kwargs) -> bool:
         logger.info('> HDX Site: %s' % configuration.get_hdx_site())
 
         projectmainfn(configuration)
+        configuration.metrics().log_summary(logger)
 
     except Exception as e:
         logger.critical(e, exc_info=True)
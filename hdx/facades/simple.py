@@ -33,3 +33,4 @@ def facade(projectmainfn: Callable[[Configuration], None], **kwargs) -> None:
     logger.info('> HDX Site: %s' % configuration.get_hdx_site())
 
     projectmainfn(configuration)
+    configuration.metrics().log_summary(logger)
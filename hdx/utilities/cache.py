@@ -0,0 +1,129 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Response cache utilities"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from typing import Any, Iterable, Optional, Tuple
+
+
+class ResponseCache(object):
+    """Thread safe least recently used cache of action responses keyed by action and identifier. Responses are stored
+    serialised as JSON so that callers always get a fresh copy that they are free to modify. Entries expire after a
+    time to live and the least recently used are evicted when the cache exceeds its entry count or size in bytes.
+
+    Args:
+        max_entries (Optional[int]): Maximum number of entries. Defaults to 1000.
+        max_bytes (Optional[int]): Maximum total size of serialised responses. Defaults to None (unbounded).
+        ttl (Optional[float]): Time to live of entries in seconds. Defaults to 300.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 1000, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.keys_by_identifier = dict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, action: str, identifier: str) -> Tuple[bool, Any]:
+        """Get cached response
+
+        Args:
+            action (str): Action name eg. package_show
+            identifier (str): Identifier passed to action
+
+        Returns:
+            (bool, Any): (True/False, Cached response/None)
+        """
+        key = (action, identifier)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expiry, text, _ = entry
+                if expiry > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, json.loads(text)
+                self._remove(key)
+            self.misses += 1
+        return False, None
+
+    def set(self, action: str, identifier: str, response: Any, aliases: Optional[Iterable[str]] = None) -> None:
+        """Store response in cache, evicting least recently used entries if necessary. The response is invalidated
+        by its identifier and by any aliases eg. a dataset read by name can be given its id as an alias so that writes
+        that only know the id invalidate it.
+
+        Args:
+            action (str): Action name eg. package_show
+            identifier (str): Identifier passed to action
+            response (Any): Response to store
+            aliases (Optional[Iterable[str]]): Other identifiers that invalidate response. Defaults to None.
+
+        Returns:
+            None
+        """
+        key = (action, identifier)
+        text = json.dumps(response)
+        identifiers = {identifier}
+        identifiers.update(aliases or ())
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, text, identifiers)
+            for entry_identifier in identifiers:
+                self.keys_by_identifier.setdefault(entry_identifier, set()).add(key)
+            self.bytes += len(text)
+            while self.entries and (len(self.entries) > self.max_entries or
+                                    (self.max_bytes is not None and self.bytes > self.max_bytes)):
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, identifier: str) -> None:
+        """Remove all cached responses for an identifier
+
+        Args:
+            identifier (str): Identifier passed to actions
+
+        Returns:
+            None
+        """
+        with self.lock:
+            for key in list(self.keys_by_identifier.get(identifier, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all cached responses
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_identifier.clear()
+            self.bytes = 0
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        """Remove entry from cache. Must be called with lock held.
+
+        Args:
+            key (Tuple[str, str]): Key of entry to remove
+
+        Returns:
+            None
+        """
+        _, text, identifiers = self.entries.pop(key)
+        self.bytes -= len(text)
+        for identifier in identifiers:
+            keys = self.keys_by_identifier[identifier]
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_identifier[identifier]
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Recording and replaying of requests to HDX"""
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+
+import requests
+from requests.adapters import BaseAdapter
+from typing import Any, Optional
+
+from .session import make_response
+
+logger = logging.getLogger(__name__)
+
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+
+
+def open_cassette(path: str) -> Any:
+    """Open cassette file for reading text, decompressing it with gzip if path ends with .gz
+
+    Args:
+        path (str): Path to cassette
+
+    Returns:
+        Any: Text file object
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def request_digest(request: requests.PreparedRequest) -> str:
+    """Get digest of the body of a request used to match it on replay. Streamed bodies are not read so they all have
+    the digest of an empty body.
+
+    Args:
+        request (requests.PreparedRequest): Request
+
+    Returns:
+        str: Hexadecimal SHA1 digest of request body
+    """
+    body = request.body
+    if not isinstance(body, (bytes, str)):
+        body = b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha1(body).hexdigest()
+
+
+class CassetteRecorder(BaseAdapter):
+    """Transport adapter that sends requests with another adapter and records each request and response to a cassette
+    file with one JSON object per line. Only the action, a digest of the request body, the response status, headers
+    and text and the time taken are recorded so API keys sent in headers are not written to the cassette. Each line is
+    written straight to disk and, if compressed, as a complete gzip member so that the cassette can be replayed even
+    if the recorder is never closed.
+
+    Args:
+        path (str): Path to cassette. Compressed with gzip if it ends with .gz.
+        adapter (BaseAdapter): Adapter that sends requests
+    """
+
+    def __init__(self, path: str, adapter: BaseAdapter):
+        super(CassetteRecorder, self).__init__()
+        self.path = path
+        self.adapter = adapter
+        self.compress = path.endswith('.gz')
+        self.file = open(path, 'wb')
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        start_time = time.perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        interaction = {'action': request.url.rsplit('/', 1)[-1], 'digest': request_digest(request),
+                       'status_code': response.status_code,
+                       'headers': {key: response.headers[key] for key in RECORDED_HEADERS if key in response.headers},
+                       'text': response.text, 'seconds': round(time.perf_counter() - start_time, 6)}
+        line = ('%s\n' % json.dumps(interaction, separators=(',', ':'))).encode('utf-8')
+        if self.compress:
+            line = gzip.compress(line)
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+        return response
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+        self.adapter.close()
+
+
+class CassettePlayer(BaseAdapter):
+    """Transport adapter that serves responses from a cassette file recorded by CassetteRecorder without network
+    access. A request is matched to the first unused interaction with the same action and request body, or failing
+    that the first unused interaction with the same action, so that repeated requests get responses in the order they
+    were recorded. An incomplete last line, eg. from a recording that was interrupted, is ignored.
+
+    Args:
+        path (str): Path to cassette. Compressed with gzip if it ends with .gz.
+        latency (Optional[bool]): Whether to wait for the time each recorded request took. Defaults to False.
+    """
+
+    def __init__(self, path: str, latency: Optional[bool] = False):
+        super(CassettePlayer, self).__init__()
+        self.latency = latency
+        self.interactions = list()
+        self.by_digest = dict()
+        self.by_action = dict()
+        self.used = set()
+        self.lock = threading.Lock()
+        with open_cassette(path) as f:
+            try:
+                for line in f:
+                    if not line.endswith('\n'):
+                        raise EOFError('Last line has no line ending')
+                    if not line.strip():
+                        continue
+                    self._add(json.loads(line))
+            except (EOFError, OSError, zlib.error) as e:
+                logger.warning('Cassette %s is truncated (%s). Ignoring its incomplete last line' % (path, e))
+
+    def _add(self, interaction: dict) -> None:
+        """Add recorded interaction to those that can be replayed
+
+        Args:
+            interaction (dict): Recorded interaction
+
+        Returns:
+            None
+        """
+        index = len(self.interactions)
+        self.interactions.append(interaction)
+        key = (interaction['action'], interaction['digest'])
+        self.by_digest.setdefault(key, deque()).append(index)
+        self.by_action.setdefault(interaction['action'], deque()).append(index)
+
+    def _next_unused(self, indices: Optional[deque]) -> Optional[int]:
+        """Get the next unused interaction index from a queue, discarding used ones. Must be called with lock held.
+
+        Args:
+            indices (Optional[deque]): Queue of interaction indices
+
+        Returns:
+            Optional[int]: Index of interaction or None if there are none left
+        """
+        while indices:
+            index = indices.popleft()
+            if index not in self.used:
+                return index
+        return None
+
+    def send(self, request, **kwargs):
+        action = request.url.rsplit('/', 1)[-1]
+        with self.lock:
+            index = self._next_unused(self.by_digest.get((action, request_digest(request))))
+            if index is None:
+                index = self._next_unused(self.by_action.get(action))
+            if index is not None:
+                self.used.add(index)
+        if index is None:
+            raise requests.ConnectionError('No recorded response left for %s in cassette' % action, request=request)
+        interaction = self.interactions[index]
+        if self.latency:
+            time.sleep(interaction['seconds'])
+        return make_response(request, interaction['status_code'], interaction['text'], interaction['headers'])
+
+    def close(self):
+        pass
+
+    def remaining(self) -> int:
+        """Get number of recorded interactions that have not been replayed
+
+        Returns:
+            int: Number of interactions not replayed
+        """
+        with self.lock:
+            return len(self.interactions) - len(self.used)
+
+
+def install_cassette(session: requests.Session, url: str, path: str, mode: str,
+                     latency: Optional[bool] = False) -> BaseAdapter:
+    """Record requests to url made with session to a cassette or replay them from it
+
+    Args:
+        session (requests.Session): Session to install cassette on
+        url (str): Prefix of urls to record or replay eg. HDX site
+        path (str): Path to cassette. Compressed with gzip if it ends with .gz.
+        mode (str): record or replay
+        latency (Optional[bool]): Whether to wait for recorded time taken when replaying. Defaults to False.
+
+    Returns:
+        BaseAdapter: CassetteRecorder or CassettePlayer installed on session
+    """
+    if mode == 'record':
+        adapter = CassetteRecorder(path, session.get_adapter(url))
+        logger.info('Recording requests to %s in %s' % (url, path))
+    elif mode == 'replay':
+        adapter = CassettePlayer(path, latency)
+        logger.info('Replaying requests to %s from %s' % (url, path))
+    else:
+        raise ValueError('Cassette mode must be record or replay not %s!' % mode)
+    session.mount(url, adapter)
+    return adapter
@@ -0,0 +1,202 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Datastore loading utilities"""
+import csv
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+INT_PATTERN = re.compile(r'^[+-]?\d+$')
+NUMERIC_PATTERN = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$')
+MAX_INT = 2 ** 31
+
+
+def infer_type(values: Iterable[str]) -> str:
+    """Infer the datastore type of a column from a sample of its values ignoring empty values
+
+    Args:
+        values (Iterable[str]): Values of column
+
+    Returns:
+        str: Datastore type: int, bigint, numeric, timestamp or text
+    """
+    types = set()
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        if INT_PATTERN.match(value):
+            types.add('int' if abs(int(value)) < MAX_INT else 'bigint')
+        elif NUMERIC_PATTERN.match(value):
+            types.add('numeric')
+        elif TIMESTAMP_PATTERN.match(value):
+            types.add('timestamp')
+        else:
+            return 'text'
+    if not types:
+        return 'text'
+    if len(types) == 1:
+        return types.pop()
+    if types <= {'int', 'bigint'}:
+        return 'bigint'
+    if types <= {'int', 'bigint', 'numeric'}:
+        return 'numeric'
+    return 'text'
+
+
+def infer_fields(headers: List[str], rows: List[List[str]]) -> List[dict]:
+    """Infer datastore fields from the headers and a sample of rows of a table
+
+    Args:
+        headers (List[str]): Column names
+        rows (List[List[str]]): Sample of rows
+
+    Returns:
+        List[dict]: Datastore fields each with id and type keys
+    """
+    return [{'id': header, 'type': infer_type(row[index] for row in rows if index < len(row))}
+            for index, header in enumerate(headers)]
+
+
+def convert_value(value: Optional[str], field_type: str) -> Any:
+    """Convert a value read from a CSV to the datastore type of its field. Empty values become None and values that
+    cannot be converted are returned unchanged.
+
+    Args:
+        value (Optional[str]): Value
+        field_type (str): Datastore type of field
+
+    Returns:
+        Any: Converted value
+    """
+    if value is None or not value.strip():
+        return None
+    try:
+        if field_type in ('int', 'bigint'):
+            return int(value)
+        if field_type == 'numeric':
+            return float(value)
+    except ValueError:
+        pass
+    return value
+
+
+def read_csv_records(f: TextIO, fields: Optional[List[dict]] = None,
+                     sample_size: Optional[int] = 100) -> Tuple[List[dict], Iterator[dict]]:
+    """Read a CSV file with a header row as datastore records one row at a time. If fields are not given, they are
+    inferred from the first rows. Only those rows are held in memory. The file is not closed so the caller should open
+    it in a with block eg. with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+
+    Args:
+        f (TextIO): Open CSV file
+        fields (Optional[List[dict]]): Datastore fields. Defaults to None (infer from sample).
+        sample_size (Optional[int]): Number of rows to infer fields from. Defaults to 100.
+
+    Returns:
+        (List[dict], Iterator[dict]): (Datastore fields, Iterator of records)
+    """
+    reader = csv.reader(f)
+    headers = next(reader, list())
+    sample = list(islice(reader, sample_size))
+    if fields is None:
+        fields = infer_fields(headers, sample)
+    field_types = [(field['id'], field.get('type', 'text')) for field in fields]
+
+    def records() -> Iterator[dict]:
+        for row in chain(sample, reader):
+            if not row:
+                continue
+            yield {name: convert_value(row[index] if index < len(row) else None, field_type)
+                   for index, (name, field_type) in enumerate(field_types)}
+
+    return fields, records()
+
+
+def batched(iterable: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Split iterable into lists of at most batch_size items without reading ahead
+
+    Args:
+        iterable (Iterable[Any]): Items
+        batch_size (int): Maximum number of items in a batch
+
+    Returns:
+        Iterator[List[Any]]: Batches of items
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class BatchError(Exception):
+    """Error raised when calls on batches fail
+
+    Args:
+        errors (List[dict]): Failures in batch order each with keys batch (index of batch), start (index of first item
+        in batch), size (number of items in batch) and error (exception raised)
+    """
+
+    def __init__(self, errors: List[dict]):
+        self.errors = errors
+        super(BatchError, self).__init__('; '.join('batch %d (items %d-%d): %s' %
+                                                   (error['batch'], error['start'],
+                                                    error['start'] + error['size'] - 1, error['error'])
+                                                   for error in errors))
+
+
+def run_batches(function: Callable[[List[Any]], Any], batches: Iterable[List[Any]],
+                max_workers: Optional[int] = 1) -> int:
+    """Call function on each batch using up to max_workers threads. Batches are only read from the iterable when a
+    thread is free to send them so at most max_workers batches are in memory at once. If a call fails, no more
+    batches are started and once the calls in flight finish, all failures are raised together in batch order.
+
+    Args:
+        function (Callable[[List[Any]], Any]): Function to call on each batch
+        batches (Iterable[List[Any]]): Batches
+        max_workers (Optional[int]): Maximum number of batches to send concurrently. Defaults to 1.
+
+    Returns:
+        int: Number of batches sent
+    """
+    errors = list()
+    count = 0
+    start = 0
+    if max_workers <= 1:
+        for batch in batches:
+            try:
+                function(batch)
+            except Exception as e:
+                raise BatchError([{'batch': count, 'start': start, 'size': len(batch), 'error': e}]) from e
+            count += 1
+            start += len(batch)
+        return count
+
+    def collect(entry: dict) -> None:
+        error = entry.pop('future').exception()
+        if error is not None:
+            entry['error'] = error
+            errors.append(entry)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+        for batch in batches:
+            if len(in_flight) >= max_workers:
+                collect(in_flight.popleft())
+            if errors:
+                break
+            in_flight.append({'batch': count, 'start': start, 'size': len(batch),
+                              'future': executor.submit(function, batch)})
+            count += 1
+            start += len(batch)
+        while in_flight:
+            collect(in_flight.popleft())
+    if errors:
+        errors.sort(key=lambda error: error['batch'])
+        raise BatchError(errors) from errors[0]['error']
+    return count
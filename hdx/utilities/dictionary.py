@@ -1,23 +1,111 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 """Dict utilities"""
+import hashlib
+import json
+import sys
 from collections import UserDict
 
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
-def merge_two_dictionaries(a: dict, b: dict) -> dict:
-    """Merges b into a and returns merged result
+MERGE_STRATEGIES = ('append', 'replace', 'union')
+UNION_KEY_FIELDS = ('name', 'id')
+
+
+def _union_key(element: Any) -> Any:
+    """Get the key identifying an element of a list in a keyed union: its name or id if it is a dictionary that has
+    one, otherwise the element itself if hashable or its fingerprint if not
+
+    Args:
+        element (Any): List element
+
+    Returns:
+        Any: Key of element
+    """
+    if isinstance(element, (dict, UserDict)):
+        for field in UNION_KEY_FIELDS:
+            value = element.get(field)
+            if value is not None:
+                return field, value
+        return dict_fingerprint(element)
+    try:
+        hash(element)
+        return element
+    except TypeError:
+        return dict_fingerprint(element)
+
+
+def _merge_lists(a: list, b: list, strategy: str, merge_strategies: Optional[Dict[str, str]],
+                 default_strategy: str) -> list:
+    """Merges list b into list a using strategy and returns merged result
+
+    Args:
+        a (list): list to merge into
+        b (list): list to merge from
+        strategy (str): append, replace or union
+        merge_strategies (Optional[Dict[str, str]]): Strategies for merging lists keyed by dictionary key
+        default_strategy (str): Strategy for merging lists whose key is not in merge_strategies
+
+    Returns:
+        list: Merged list
+    """
+    if strategy == 'append':
+        a.extend(b)
+    elif strategy == 'replace':
+        a[:] = b
+    elif strategy == 'union':
+        positions = dict()
+        for index, element in enumerate(a):
+            positions.setdefault(_union_key(element), index)
+        for element in b:
+            key = _union_key(element)
+            index = positions.get(key)
+            if index is None:
+                positions[key] = len(a)
+                a.append(element)
+            elif isinstance(element, (dict, UserDict)):
+                a[index] = merge_two_dictionaries(a[index], element, merge_strategies, default_strategy)
+    else:
+        raise ValueError('Merge strategy must be one of %s not %s!' % (', '.join(MERGE_STRATEGIES), strategy))
+    return a
+
+
+def merge_two_dictionaries(a: dict, b: dict, merge_strategies: Optional[Dict[str, str]] = None,
+                           default_strategy: Optional[str] = 'append') -> dict:
+    """Merges b into a and returns merged result. How lists are merged is given by a strategy: append adds the
+    elements of b to a, replace replaces the elements of a with those of b and union adds the elements of b that are
+    not already in a, merging dictionaries with the same name or id, in time proportional to the lengths of the lists.
 
     NOTE: tuples and arbitrary objects are not handled as it is totally ambiguous what should happen
 
     Args:
         a (dict): dictionary to merge into
         b: (dict): dictionary to merge from
+        merge_strategies (Optional[Dict[str, str]]): Strategies for merging lists keyed by dictionary key eg.
+        {'tags': 'union'}. Defaults to None.
+        default_strategy (Optional[str]): Strategy for merging lists whose key is not in merge_strategies. Defaults to
+        append.
 
     Returns:
         dict: Merged dictionary
     """
+    return _merge(a, b, default_strategy, merge_strategies, default_strategy)
+
+
+def _merge(a: Any, b: Any, strategy: str, merge_strategies: Optional[Dict[str, str]], default_strategy: str) -> Any:
+    """Merges b into a and returns merged result merging any lists using strategy
+
+    Args:
+        a (Any): value to merge into
+        b: (Any): value to merge from
+        strategy (str): Strategy for merging if a and b are lists
+        merge_strategies (Optional[Dict[str, str]]): Strategies for merging lists keyed by dictionary key
+        default_strategy (str): Strategy for merging lists whose key is not in merge_strategies
+
+    Returns:
+        Any: Merged value
+    """
     key = None
     # ## debug output
     # sys.stderr.write("DEBUG: %s to %s\n" %(b,a))
@@ -27,10 +115,9 @@ def merge_two_dictionaries(a: dict, b: dict) -> dict:
             # border case for first run or if a is a primitive
             a = b
         elif isinstance(a, list):
-            # lists can be only appended
             if isinstance(b, list):
                 # merge lists
-                a.extend(b)
+                a = _merge_lists(a, b, strategy, merge_strategies, default_strategy)
             else:
                 # append to list
                 a.append(b)
@@ -39,7 +126,10 @@ def merge_two_dictionaries(a: dict, b: dict) -> dict:
             if isinstance(b, dict) or isinstance(b, UserDict):
                 for key in b:
                     if key in a:
-                        a[key] = merge_two_dictionaries(a[key], b[key])
+                        key_strategy = default_strategy
+                        if merge_strategies:
+                            key_strategy = merge_strategies.get(key, default_strategy)
+                        a[key] = _merge(a[key], b[key], key_strategy, merge_strategies, default_strategy)
                     else:
                         a[key] = b[key]
             else:
@@ -86,3 +176,166 @@ def dict_diff(d1: dict, d2: dict, no_key: Optional[str] = '<KEYNOTFOUND>') -> di
     diff.update({k: (d1[k], no_key) for k in d1keys - both})
     diff.update({k: (no_key, d2[k]) for k in d2keys - both})
     return diff
+
+
+def _list_key(element: Any, key_fields: Iterable[str]) -> Optional[str]:
+    """Get the path component identifying a dictionary in a list from the first of key_fields it has eg. [name=a]
+
+    Args:
+        element (Any): List element
+        key_fields (Iterable[str]): Fields that identify dictionaries in lists
+
+    Returns:
+        Optional[str]: Path component or None if element is not a dictionary with a key field
+    """
+    if isinstance(element, (dict, UserDict)):
+        for field in key_fields:
+            value = element.get(field)
+            if value is not None:
+                return '[%s=%s]' % (field, value)
+    return None
+
+
+def _keyed_list(value: list, key_fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """Get the elements of a list keyed by their path components if every element has a unique one
+
+    Args:
+        value (list): List
+        key_fields (Iterable[str]): Fields that identify dictionaries in lists
+
+    Returns:
+        Optional[Dict[str, Any]]: Elements keyed by path component or None if they cannot all be keyed
+    """
+    elements = dict()
+    for element in value:
+        key = _list_key(element, key_fields)
+        if key is None or key in elements:
+            return None
+        elements[key] = element
+    return elements
+
+
+def iter_dict_changes(d1: dict, d2: dict, no_key: Optional[str] = '<KEYNOTFOUND>',
+                      ignore_keys: Optional[Iterable[str]] = None,
+                      key_fields: Optional[Iterable[str]] = UNION_KEY_FIELDS) -> Iterator[Tuple[str, Any, Any]]:
+    """Compares two dictionaries recursively yielding each change with the path to where it is eg.
+    resources[name=Resource1].url. Nested dictionaries are compared key by key and lists of dictionaries that each
+    have a different name or id (or other field in key_fields) are compared element by element regardless of order.
+    Other lists that differ are yielded whole. Subtrees that are the same object or equal are skipped without being
+    walked, so comparing large mostly unchanged metadata is fast. Keys in ignore_keys are not compared wherever they
+    occur.
+
+    Args:
+        d1 (dict): First dictionary to compare
+        d2 (dict): Second dictionary to compare
+        no_key (Optional[str]): What value to use if key or list element is not found. Defaults to '<KEYNOTFOUND>'.
+        ignore_keys (Optional[Iterable[str]]): Keys to leave out. Defaults to None.
+        key_fields (Optional[Iterable[str]]): Fields that identify dictionaries in lists. Defaults to ('name', 'id').
+
+    Returns:
+        Iterator[Tuple[str, Any, Any]]: Iterator of (path, value in first dictionary, value in second dictionary)
+    """
+    ignore_keys = frozenset(ignore_keys or ())
+    key_fields = tuple(key_fields)
+
+    def compare(path: str, a: Any, b: Any) -> Iterator[Tuple[str, Any, Any]]:
+        if a is b or a == b:
+            return
+        if isinstance(a, (dict, UserDict)) and isinstance(b, (dict, UserDict)):
+            for key in a:
+                if key in ignore_keys:
+                    continue
+                keypath = '%s.%s' % (path, key) if path else str(key)
+                if key in b:
+                    yield from compare(keypath, a[key], b[key])
+                else:
+                    yield keypath, a[key], no_key
+            for key in b:
+                if key not in a and key not in ignore_keys:
+                    yield ('%s.%s' % (path, key) if path else str(key)), no_key, b[key]
+            return
+        if isinstance(a, list) and isinstance(b, list):
+            elements1 = _keyed_list(a, key_fields)
+            elements2 = _keyed_list(b, key_fields) if elements1 is not None else None
+            if elements2 is not None:
+                for key, element in elements1.items():
+                    if key in elements2:
+                        yield from compare(path + key, element, elements2[key])
+                    else:
+                        yield path + key, element, no_key
+                for key, element in elements2.items():
+                    if key not in elements1:
+                        yield path + key, no_key, element
+                return
+            if ignore_keys and dict_fingerprint(a, ignore_keys) == dict_fingerprint(b, ignore_keys):
+                return
+        yield path, a, b
+
+    return compare('', d1, d2)
+
+
+def nested_dict_diff(d1: dict, d2: dict, no_key: Optional[str] = '<KEYNOTFOUND>',
+                     ignore_keys: Optional[Iterable[str]] = None,
+                     key_fields: Optional[Iterable[str]] = UNION_KEY_FIELDS) -> Dict[str, Tuple[Any, Any]]:
+    """Compares two dictionaries recursively as described in iter_dict_changes
+
+    Args:
+        d1 (dict): First dictionary to compare
+        d2 (dict): Second dictionary to compare
+        no_key (Optional[str]): What value to use if key or list element is not found. Defaults to '<KEYNOTFOUND>'.
+        ignore_keys (Optional[Iterable[str]]): Keys to leave out. Defaults to None.
+        key_fields (Optional[Iterable[str]]): Fields that identify dictionaries in lists. Defaults to ('name', 'id').
+
+    Returns:
+        Dict[str, Tuple[Any, Any]]: Comparison dictionary keyed by path eg. {'resources[name=a].url': (old, new)}
+    """
+    return {path: (value1, value2) for path, value1, value2 in
+            iter_dict_changes(d1, d2, no_key, ignore_keys, key_fields)}
+
+
+def dict_fingerprint(data: Any, ignore_keys: Optional[Iterable[str]] = None) -> str:
+    """Get a fingerprint of a dictionary that is the same for dictionaries with equal content. Keys in ignore_keys are
+    left out wherever they occur in nested dictionaries.
+
+    Args:
+        data (Any): Dictionary (or list or value) to fingerprint
+        ignore_keys (Optional[Iterable[str]]): Keys to leave out. Defaults to None.
+
+    Returns:
+        str: Hex digest of the dictionary's content
+    """
+    ignore_keys = frozenset(ignore_keys or ())
+
+    def strip(value):
+        if isinstance(value, (dict, UserDict)):
+            return {str(key): strip(value[key]) for key in value if key not in ignore_keys}
+        if isinstance(value, (list, tuple)):
+            return [strip(element) for element in value]
+        return value
+
+    text = json.dumps(strip(data), sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def intern_keys(data: Any, drop_keys: Optional[Iterable[str]] = None) -> Any:
+    """Copy a dictionary interning its string keys, including those of nested dictionaries, so that dictionaries with
+    the same keys share them rather than each holding its own copy. Keys in drop_keys are left out wherever they occur.
+
+    Args:
+        data (Any): Dictionary (or list or value) to copy
+        drop_keys (Optional[Iterable[str]]): Keys to leave out. Defaults to None.
+
+    Returns:
+        Any: Copy of dictionary with interned keys
+    """
+    drop_keys = frozenset(drop_keys or ())
+
+    def compact(value):
+        if isinstance(value, dict):
+            return {sys.intern(key) if isinstance(key, str) else key: compact(element)
+                    for key, element in value.items() if key not in drop_keys}
+        if isinstance(value, list):
+            return [compact(element) for element in value]
+        return value
+
+    return compact(data)
@@ -0,0 +1,416 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""In-process stand-in for the CKAN action API for offline testing and benchmarking"""
+import copy
+import datetime
+import json
+from email.parser import BytesParser
+import random
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import BaseAdapter
+from typing import Any, Callable, Optional, Union
+
+from .session import make_response
+
+ACTION_PREFIXES = ('package_', 'resource_', 'related_', 'datastore_')
+
+
+class FakeCKANError(Exception):
+    """Error raised by a fake action which is returned to the client as a CKAN error response
+
+    Args:
+        status_code (int): HTTP status code
+        error_type (str): CKAN error type eg. Not Found Error
+        message (str): Error message
+    """
+
+    def __init__(self, status_code: int, error_type: str, message: str):
+        super(FakeCKANError, self).__init__(message)
+        self.status_code = status_code
+        self.error_type = error_type
+        self.message = message
+
+
+def not_found(message: str) -> FakeCKANError:
+    return FakeCKANError(404, 'Not Found Error', message)
+
+
+def validation_error(message: str) -> FakeCKANError:
+    return FakeCKANError(409, 'Validation Error', message)
+
+
+class FakeCKAN(BaseAdapter):
+    """In-process stand-in for a CKAN site implementing the package, resource, related and datastore actions used by
+    the library. It is a requests transport adapter so requests go through the same session, retry, rate limiting and
+    metrics code as requests to a real site. Latency and transient errors (HTTP 503) can be injected. Files uploaded to
+    resources are kept in the uploads dictionary keyed by resource id.
+
+    Args:
+        latency (Union[float, Callable[[str], float]]): Seconds to wait before responding, or function taking action
+        name and returning seconds. Defaults to 0.
+        error_rate (Optional[float]): Probability that a request fails with HTTP 503. Defaults to 0.
+        seed (Optional[int]): Seed for random number generator used to inject errors. Defaults to None.
+    """
+
+    def __init__(self, latency: Union[float, Callable[[str], float]] = 0, error_rate: Optional[float] = 0,
+                 seed: Optional[int] = None):
+        super(FakeCKAN, self).__init__()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        self.packages = dict()
+        self.package_names = dict()
+        self.resources = dict()
+        self.related = dict()
+        self.datastores = dict()
+        self.uploads = dict()
+        self.calls = dict()
+
+    def install(self, configuration: Any) -> None:
+        """Route all requests made with configuration to this fake CKAN site
+
+        Args:
+            configuration (Configuration): HDX Configuration
+
+        Returns:
+            None
+        """
+        configuration.remoteckan().session.mount(configuration.get_hdx_site(), self)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        action = request.url.rsplit('/', 1)[-1]
+        with self.lock:
+            self.calls[action] = self.calls.get(action, 0) + 1
+            error = self.error_rate and self.random.random() < self.error_rate
+        latency = self.latency(action) if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        if error:
+            return make_response(request, 503, 'Service Unavailable')
+        function = getattr(self, action, None) if action.startswith(ACTION_PREFIXES) else None
+        if function is None:
+            return self._error(request, FakeCKANError(400, 'Bad Request', 'Action %s not found' % action))
+        try:
+            data = self._request_data(request)
+            with self.lock:
+                result = function(data)
+                body = json.dumps({'success': True, 'result': result})
+        except FakeCKANError as e:
+            return self._error(request, e)
+        except (KeyError, ValueError, TypeError) as e:
+            return self._error(request, validation_error('%s: %s' % (type(e).__name__, e)))
+        return make_response(request, 200, body)
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _request_data(request: requests.PreparedRequest) -> dict:
+        """Get data sent in a JSON or multipart request. A file sent in a multipart request is returned as a tuple of
+        file name and content.
+        """
+        body = request.body
+        if hasattr(body, 'read'):
+            body = body.read()
+        content_type = request.headers.get('Content-Type', '')
+        if not content_type.startswith('multipart/form-data'):
+            if isinstance(body, bytes):
+                body = body.decode('utf-8')
+            return json.loads(body) if body else dict()
+        message = BytesParser().parsebytes(b'Content-Type: ' + content_type.encode('utf-8') + b'\r\n\r\n' + body)
+        data = dict()
+        for part in message.get_payload():
+            name = part.get_param('name', header='content-disposition')
+            content = part.get_payload(decode=True)
+            filename = part.get_filename()
+            if filename is None:
+                data[name] = content.decode('utf-8')
+            else:
+                data[name] = (filename, content)
+        return data
+
+    def _store_upload(self, resource_id: str, upload: Optional[tuple]) -> None:
+        if upload is None:
+            return
+        filename, content = upload
+        resource = self.resources[resource_id]
+        resource['url'] = 'http://fakeckan/dataset/%s/resource/%s/download/%s' % (resource['package_id'], resource_id,
+                                                                                 filename)
+        resource['url_type'] = 'upload'
+        resource['size'] = len(content)
+        self.uploads[resource_id] = content
+
+    @staticmethod
+    def _error(request, error: FakeCKANError) -> requests.Response:
+        body = json.dumps({'success': False, 'error': {'__type': error.error_type, 'message': error.message}})
+        return make_response(request, error.status_code, body)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.utcnow().isoformat()
+
+    def _get_package(self, id_or_name: str) -> dict:
+        package_id = self.package_names.get(id_or_name, id_or_name)
+        package = self.packages.get(package_id)
+        if package is None:
+            raise not_found('Dataset %s not found' % id_or_name)
+        return package
+
+    def _package_result(self, package: dict) -> dict:
+        result = copy.deepcopy(package)
+        result['resources'] = [copy.deepcopy(self.resources[resource_id]) for resource_id in package['resources']]
+        result['num_resources'] = len(result['resources'])
+        result['num_tags'] = len(result.get('tags', list()))
+        return result
+
+    def _store_resource(self, package: dict, resource: dict, position: int) -> str:
+        resource = copy.deepcopy(resource)
+        resource_id = resource.get('id') or str(uuid.uuid4())
+        existing = self.resources.get(resource_id, dict())
+        resource['id'] = resource_id
+        resource['package_id'] = package['id']
+        resource['position'] = position
+        resource['created'] = existing.get('created', self._now())
+        resource['revision_id'] = str(uuid.uuid4())
+        resource.setdefault('state', 'active')
+        self.resources[resource_id] = resource
+        return resource_id
+
+    def _store_package(self, package: dict, data: dict) -> dict:
+        old_name = package.get('name')
+        name = data.get('name', old_name)
+        if self.package_names.get(name, package['id']) != package['id']:
+            raise validation_error('That URL is already in use: %s' % name)
+        for key, value in data.items():
+            if key != 'resources':
+                package[key] = copy.deepcopy(value)
+        if 'resources' in data:
+            old_resource_ids = set(package.get('resources', list()))
+            package['resources'] = [self._store_resource(package, resource, position)
+                                    for position, resource in enumerate(data['resources'])]
+            for resource_id in old_resource_ids - set(package['resources']):
+                del self.resources[resource_id]
+        package['metadata_modified'] = self._now()
+        package['revision_id'] = str(uuid.uuid4())
+        if old_name is not None and old_name != package['name']:
+            del self.package_names[old_name]
+        self.package_names[package['name']] = package['id']
+        return self._package_result(package)
+
+    def package_show(self, data: dict) -> dict:
+        return self._package_result(self._get_package(data['id']))
+
+    def package_create(self, data: dict) -> dict:
+        name = data.get('name')
+        if not name:
+            raise validation_error('Missing value: name')
+        if name in self.package_names:
+            raise validation_error('That URL is already in use: %s' % name)
+        package = {'id': str(uuid.uuid4()), 'metadata_created': self._now(), 'state': 'active', 'resources': list()}
+        self.packages[package['id']] = package
+        data = dict(data)
+        data.pop('id', None)
+        data.setdefault('resources', list())
+        return self._store_package(package, data)
+
+    def package_update(self, data: dict) -> dict:
+        package = self._get_package(data.get('id') or data['name'])
+        for key in list(package.keys()):
+            if key not in ('id', 'metadata_created', 'state', 'resources'):
+                del package[key]
+        data = dict(data)
+        data.pop('id', None)
+        data.setdefault('resources', list())
+        return self._store_package(package, data)
+
+    def package_patch(self, data: dict) -> dict:
+        package = self._get_package(data.get('id') or data['name'])
+        data = dict(data)
+        data.pop('id', None)
+        return self._store_package(package, data)
+
+    def package_delete(self, data: dict) -> None:
+        package = self._get_package(data['id'])
+        package['state'] = 'deleted'
+
+    def package_search(self, data: dict) -> dict:
+        query = data.get('q', '*:*')
+        filters = dict()
+        if data.get('fq'):
+            for term in data['fq'].split():
+                key, _, value = term.partition(':')
+                filters[key] = value.strip('"')
+        results = list()
+        for package in self.packages.values():
+            if package['state'] != 'active':
+                continue
+            if query not in ('*:*', '') and not any(query.lower() in str(package.get(key, '')).lower()
+                                                    for key in ('name', 'title', 'notes')):
+                continue
+            if any(str(package.get(key)) != value for key, value in filters.items()):
+                continue
+            results.append(package)
+        results.sort(key=lambda package: package['name'])
+        start = int(data.get('start', 0))
+        rows = int(data.get('rows', 10))
+        return {'count': len(results),
+                'results': [self._package_result(package) for package in results[start:start + rows]]}
+
+    def resource_show(self, data: dict) -> dict:
+        resource = self.resources.get(data['id'])
+        if resource is None:
+            raise not_found('Resource %s not found' % data['id'])
+        return copy.deepcopy(resource)
+
+    def resource_create(self, data: dict) -> dict:
+        package = self._get_package(data['package_id'])
+        resource = dict(data)
+        resource.pop('id', None)
+        upload = resource.pop('upload', None)
+        resource_id = self._store_resource(package, resource, len(package['resources']))
+        package['resources'].append(resource_id)
+        self._store_upload(resource_id, upload)
+        return copy.deepcopy(self.resources[resource_id])
+
+    def resource_update(self, data: dict) -> dict:
+        existing = self.resource_show(data)
+        package = self._get_package(existing['package_id'])
+        data = dict(data)
+        upload = data.pop('upload', None)
+        self._store_resource(package, data, existing['position'])
+        self._store_upload(data['id'], upload)
+        return copy.deepcopy(self.resources[data['id']])
+
+    def resource_patch(self, data: dict) -> dict:
+        resource = self.resource_show(data)
+        resource.update(data)
+        return self.resource_update(resource)
+
+    def resource_delete(self, data: dict) -> None:
+        resource = self.resource_show(data)
+        package = self._get_package(resource['package_id'])
+        package['resources'].remove(resource['id'])
+        for position, resource_id in enumerate(package['resources']):
+            self.resources[resource_id]['position'] = position
+        del self.resources[resource['id']]
+        self.datastores.pop(resource['id'], None)
+
+    def related_show(self, data: dict) -> dict:
+        related = self.related.get(data['id'])
+        if related is None:
+            raise not_found('Related item %s not found' % data['id'])
+        return copy.deepcopy(related)
+
+    def related_create(self, data: dict) -> dict:
+        if 'dataset_id' in data:
+            data = dict(data)
+            data['dataset_id'] = self._get_package(data['dataset_id'])['id']
+        related = copy.deepcopy(data)
+        related['id'] = str(uuid.uuid4())
+        related['created'] = self._now()
+        related.setdefault('view_count', 0)
+        related.setdefault('featured', 0)
+        self.related[related['id']] = related
+        return copy.deepcopy(related)
+
+    def related_update(self, data: dict) -> dict:
+        related = self.related_show(data)
+        related.update(copy.deepcopy(data))
+        self.related[related['id']] = related
+        return copy.deepcopy(related)
+
+    def related_delete(self, data: dict) -> None:
+        self.related_show(data)
+        del self.related[data['id']]
+
+    def related_list(self, data: dict) -> list:
+        package_id = self._get_package(data['id'])['id']
+        return [copy.deepcopy(related) for related in self.related.values() if related.get('dataset_id') == package_id]
+
+    def _get_datastore(self, resource_id: str) -> dict:
+        datastore = self.datastores.get(resource_id)
+        if datastore is None:
+            raise not_found('Datastore for resource %s not found' % resource_id)
+        return datastore
+
+    def _check_writable(self, data: dict) -> None:
+        resource = self.resource_show({'id': data['resource_id']})
+        if resource.get('url_type') != 'datastore' and not data.get('force', False):
+            raise validation_error('read-only: Cannot edit read-only resource. Either pass "force=True" or change '
+                                   'url_type to "datastore"')
+
+    def datastore_create(self, data: dict) -> dict:
+        resource_id = data['resource_id']
+        self._check_writable(data)
+        primary_key = data.get('primary_key')
+        if isinstance(primary_key, str):
+            primary_key = [primary_key]
+        datastore = self.datastores.get(resource_id)
+        if datastore is None:
+            datastore = {'fields': list(), 'primary_key': list(), 'indexes': list(), 'records': list(), 'keys': dict()}
+            self.datastores[resource_id] = datastore
+        field_ids = {field['id'] for field in datastore['fields']}
+        datastore['fields'].extend(field for field in data.get('fields', list()) if field['id'] not in field_ids)
+        if primary_key is not None:
+            keys = dict()
+            for index, record in enumerate(datastore['records']):
+                key = tuple(record.get(field) for field in primary_key)
+                if key in keys:
+                    raise validation_error('Key %s is not unique' % (key,))
+                keys[key] = index
+            datastore['primary_key'] = primary_key
+            datastore['keys'] = keys
+        if 'indexes' in data:
+            datastore['indexes'] = data['indexes']
+        self.resources[resource_id]['datastore_active'] = True
+        records = data.get('records')
+        if records:
+            self._upsert(datastore, records, 'insert')
+        return {'resource_id': resource_id, 'fields': datastore['fields'], 'primary_key': datastore['primary_key']}
+
+    @staticmethod
+    def _upsert(datastore: dict, records: list, method: str) -> None:
+        primary_key = datastore['primary_key']
+        for record in records:
+            if not primary_key:
+                if method != 'insert':
+                    raise validation_error('Table does not have a unique key defined')
+                datastore['records'].append(dict(record))
+                continue
+            key = tuple(record.get(field) for field in primary_key)
+            index = datastore['keys'].get(key)
+            if index is None:
+                if method == 'update':
+                    raise validation_error('Key %s not found' % (key,))
+                datastore['keys'][key] = len(datastore['records'])
+                datastore['records'].append(dict(record))
+            elif method == 'insert':
+                raise validation_error('Key %s already exists' % (key,))
+            else:
+                datastore['records'][index].update(record)
+
+    def datastore_upsert(self, data: dict) -> dict:
+        self._check_writable(data)
+        datastore = self._get_datastore(data['resource_id'])
+        self._upsert(datastore, data.get('records', list()), data.get('method', 'upsert'))
+        return {'resource_id': data['resource_id']}
+
+    def datastore_delete(self, data: dict) -> dict:
+        self._check_writable(data)
+        self._get_datastore(data['resource_id'])
+        del self.datastores[data['resource_id']]
+        self.resources[data['resource_id']]['datastore_active'] = False
+        return {'resource_id': data['resource_id']}
+
+    def datastore_search(self, data: dict) -> dict:
+        datastore = self._get_datastore(data['resource_id'])
+        offset = int(data.get('offset', 0))
+        limit = int(data.get('limit', 100))
+        records = datastore['records'][offset:offset + limit]
+        return {'resource_id': data['resource_id'], 'fields': datastore['fields'], 'total': len(datastore['records']),
+                'records': copy.deepcopy(records)}
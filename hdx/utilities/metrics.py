@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Request metrics utilities"""
+import logging
+import random
+import threading
+
+from typing import Callable, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Get percentile of values using the nearest rank method
+
+    Args:
+        sorted_values (List[float]): Values sorted in ascending order
+        fraction (float): Percentile as a fraction eg. 0.95
+
+    Returns:
+        Optional[float]: Percentile or None if there are no values
+    """
+    if not sorted_values:
+        return None
+    rank = max(int(-(-fraction * len(sorted_values) // 1)), 1)
+    return sorted_values[rank - 1]
+
+
+class RequestMetrics(object):
+    """Thread safe collector of metrics for every request made to HDX. Each request is passed as a dictionary to any
+    hooks that have been added and is aggregated per action into counts, outcomes, bytes and latency percentiles.
+
+    Each request dictionary has keys: action, identifier, seconds, payload_bytes, response_bytes, retries and
+    outcome (success or the name of the exception raised eg. NotFound).
+
+    So that a long running process does not keep every latency, at most max_latencies latencies are kept per action as
+    a uniform random sample of all requests from which the percentiles are calculated. Counts and totals are exact.
+
+    Args:
+        max_latencies (Optional[int]): Maximum number of latencies to keep per action. Defaults to 10000.
+    """
+
+    def __init__(self, max_latencies: Optional[int] = 10000):
+        self.max_latencies = max_latencies
+        self.hooks = list()
+        self.actions = dict()
+        self.lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[dict], None]) -> None:
+        """Add a function to be called with the metrics of every request
+
+        Args:
+            hook (Callable[[dict], None]): Function taking request metrics dictionary
+
+        Returns:
+            None
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[dict], None]) -> None:
+        """Remove a function previously added with add_hook
+
+        Args:
+            hook (Callable[[dict], None]): Function taking request metrics dictionary
+
+        Returns:
+            None
+        """
+        self.hooks.remove(hook)
+
+    def record(self, action: str, identifier: Optional[str], seconds: float, payload_bytes: int,
+               response_bytes: int, retries: int, outcome: str) -> None:
+        """Record the metrics of a request. Exceptions raised by hooks are logged rather than raised so that they do
+        not affect the request.
+
+        Args:
+            action (str): Action name eg. package_show
+            identifier (Optional[str]): Identifier of HDX object if any
+            seconds (float): Time taken in seconds including retries
+            payload_bytes (int): Size of request body
+            response_bytes (int): Size of response body
+            retries (int): Number of retries
+            outcome (str): success or the name of the exception raised
+
+        Returns:
+            None
+        """
+        request = {'action': action, 'identifier': identifier, 'seconds': seconds, 'payload_bytes': payload_bytes,
+                   'response_bytes': response_bytes, 'retries': retries, 'outcome': outcome}
+        with self.lock:
+            aggregate = self.actions.get(action)
+            if aggregate is None:
+                aggregate = {'count': 0, 'total_seconds': 0.0, 'latencies': list(), 'outcomes': dict(),
+                             'payload_bytes': 0, 'response_bytes': 0, 'retries': 0}
+                self.actions[action] = aggregate
+            aggregate['count'] += 1
+            aggregate['total_seconds'] += seconds
+            latencies = aggregate['latencies']
+            if len(latencies) < self.max_latencies:
+                latencies.append(seconds)
+            else:
+                index = random.randrange(aggregate['count'])
+                if index < self.max_latencies:
+                    latencies[index] = seconds
+            aggregate['outcomes'][outcome] = aggregate['outcomes'].get(outcome, 0) + 1
+            aggregate['payload_bytes'] += payload_bytes
+            aggregate['response_bytes'] += response_bytes
+            aggregate['retries'] += retries
+        for hook in self.hooks:
+            try:
+                hook(request)
+            except Exception:
+                logger.exception('Metrics hook %s failed for %s' % (hook, action))
+
+    def summary(self) -> dict:
+        """Get summary of requests made so far per action
+
+        Returns:
+            dict: Dictionary keyed by action of dictionaries with keys count, outcomes, payload_bytes, response_bytes,
+            retries, total_seconds, p50, p95 and p99
+        """
+        summary = dict()
+        with self.lock:
+            for action, aggregate in self.actions.items():
+                latencies = sorted(aggregate['latencies'])
+                summary[action] = {'count': aggregate['count'], 'outcomes': dict(aggregate['outcomes']),
+                                   'payload_bytes': aggregate['payload_bytes'],
+                                   'response_bytes': aggregate['response_bytes'], 'retries': aggregate['retries'],
+                                   'total_seconds': aggregate['total_seconds'], 'p50': percentile(latencies, 0.5),
+                                   'p95': percentile(latencies, 0.95), 'p99': percentile(latencies, 0.99)}
+        return summary
+
+    def log_summary(self, summary_logger: Optional[logging.Logger] = None) -> None:
+        """Log summary of requests made so far with one line per action
+
+        Args:
+            summary_logger (Optional[logging.Logger]): Logger to use. Defaults to None (this module's logger).
+
+        Returns:
+            None
+        """
+        if summary_logger is None:
+            summary_logger = logger
+        for action, stats in sorted(self.summary().items()):
+            outcomes = ', '.join('%s: %d' % item for item in sorted(stats['outcomes'].items()))
+            summary_logger.info('%s: %d requests (%s), %d retries, %d bytes sent, %d bytes received, %.2fs total, '
+                                'p50 %.3fs, p95 %.3fs, p99 %.3fs' %
+                                (action, stats['count'], outcomes, stats['retries'], stats['payload_bytes'],
+                                 stats['response_bytes'], stats['total_seconds'], stats['p50'], stats['p95'],
+                                 stats['p99']))
+
+    def reset(self) -> None:
+        """Discard all metrics recorded so far
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.actions = dict()
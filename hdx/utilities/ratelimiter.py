@@ -0,0 +1,68 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Adaptive client side rate limiting"""
+import threading
+import time
+
+from typing import Optional
+
+
+class RateLimiter(object):
+    """Token bucket rate limiter whose rate adapts to the server: additive increase while requests succeed and
+    multiplicative decrease when the server throttles (AIMD).
+
+    Args:
+        rate (Optional[float]): Initial number of requests per second. Defaults to 10.
+        min_rate (Optional[float]): Lowest rate to back off to. Defaults to 0.5.
+        max_rate (Optional[float]): Highest rate to speed up to. Defaults to 100.
+        increase (Optional[float]): Requests per second added after each successful request. Defaults to 0.1.
+        decrease_factor (Optional[float]): Factor by which rate is multiplied when throttled. Defaults to 0.5.
+        burst (Optional[float]): Maximum number of tokens that can accumulate. Defaults to 1 (no bursts).
+    """
+
+    def __init__(self, rate: Optional[float] = 10, min_rate: Optional[float] = 0.5, max_rate: Optional[float] = 100,
+                 increase: Optional[float] = 0.1, decrease_factor: Optional[float] = 0.5,
+                 burst: Optional[float] = 1):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token from the bucket, waiting until one is available
+
+        Returns:
+            float: Time waited in seconds
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def success(self) -> None:
+        """Speed up after a successful request
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self) -> None:
+        """Back off after the server throttled a request
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Name to id resolution utilities"""
+import threading
+
+from typing import Dict, Optional, Tuple
+
+
+class NameResolver(object):
+    """Thread safe cache of the ids of HDX objects keyed by name. It can be seeded from a bulk listing and if that
+    listing is complete, names missing from it are known not to exist so no request is needed to check for them.
+    """
+
+    def __init__(self):
+        self.ids = dict()
+        self.complete = False
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def resolve(self, name: str) -> Tuple[bool, Optional[str]]:
+        """Resolve name to id
+
+        Args:
+            name (str): Name of HDX object
+
+        Returns:
+            (bool, Optional[str]): (True if the answer is known, id or None if the object is known not to exist)
+        """
+        with self.lock:
+            identifier = self.ids.get(name)
+            if identifier is not None:
+                return True, identifier
+            return self.complete, None
+
+    def add(self, name: str, identifier: str) -> None:
+        """Record id of name
+
+        Args:
+            name (str): Name of HDX object
+            identifier (str): Id of HDX object
+
+        Returns:
+            None
+        """
+        if not name or not identifier:
+            return
+        with self.lock:
+            self.ids[name] = identifier
+
+    def remove(self, name: str) -> None:
+        """Forget id of name eg. because it was deleted or found to be stale
+
+        Args:
+            name (str): Name of HDX object
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.ids.pop(name, None)
+
+    def seed(self, ids: Dict[str, str], complete: Optional[bool] = False) -> None:
+        """Record ids of many names eg. from a bulk listing
+
+        Args:
+            ids (Dict[str, str]): Dictionary of ids keyed by name
+            complete (Optional[bool]): Whether the names are all that exist. Defaults to False.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.ids.update(ids)
+            if complete:
+                self.complete = True
+
+    def clear(self) -> None:
+        """Forget all ids
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.ids.clear()
+            self.complete = False
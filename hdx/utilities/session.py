@@ -0,0 +1,232 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""HTTP session utilities"""
+import logging
+import random
+import threading
+import time
+
+import ckanapi
+import requests
+from ckanapi.common import prepare_action, reverse_apicontroller_action
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import RequestMetrics
+from .ratelimiter import RateLimiter
+from .upload import MultipartStream
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+IDEMPOTENT_SUFFIXES = ('_show', '_list', '_search', '_update', '_patch', '_delete')
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that applies a default timeout to every request sent through it
+
+    Args:
+        timeout (Optional[float]): Default timeout in seconds. Defaults to None (no timeout).
+        **kwargs: Parameters to pass to requests HTTPAdapter eg. pool_connections, pool_maxsize
+    """
+
+    def __init__(self, timeout: Optional[float] = None, **kwargs):
+        self.timeout = timeout
+        super(TimeoutHTTPAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super(TimeoutHTTPAdapter, self).send(request, **kwargs)
+
+
+def get_session(pool_connections: Optional[int] = 10, pool_maxsize: Optional[int] = 10,
+                timeout: Optional[float] = 60) -> requests.Session:
+    """Get a requests session that keeps connections alive and pools them
+
+    Args:
+        pool_connections (Optional[int]): Number of connection pools to cache. Defaults to 10.
+        pool_maxsize (Optional[int]): Maximum number of connections to keep in each pool. Defaults to 10.
+        timeout (Optional[float]): Default timeout in seconds for each request. Defaults to 60.
+
+    Returns:
+        requests.Session: Session with pooled HTTP and HTTPS adapters
+    """
+    session = requests.Session()
+    adapter = TimeoutHTTPAdapter(timeout=timeout, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def make_response(request: requests.PreparedRequest, status_code: int, text: str,
+                  headers: Optional[dict] = None) -> requests.Response:
+    """Make a response to a request without sending it for use by transport adapters that do not use the network
+
+    Args:
+        request (requests.PreparedRequest): Request being responded to
+        status_code (int): HTTP status code
+        text (str): Response body
+        headers (Optional[dict]): Response headers. Defaults to None (JSON content type).
+
+    Returns:
+        requests.Response: Response
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.headers = CaseInsensitiveDict(headers or {'Content-Type': 'application/json'})
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class RemoteCKAN(ckanapi.RemoteCKAN):
+    """ckanapi RemoteCKAN that sends all its requests through a shared requests session. Idempotent actions that fail
+    with a connection error or a transient HTTP status (429, 502, 503, 504) are retried with jittered exponential
+    backoff. An optional rate limiter spaces out requests and adapts to throttling by the server. The metrics of every
+    action called are recorded in an optional RequestMetrics object. Files are uploaded in a multipart request whose
+    body is streamed from disk in chunks and such requests are never retried.
+
+    Args:
+        address (str): Web address of the CKAN instance
+        apikey (Optional[str]): API key to pass in requests. Defaults to None.
+        user_agent (Optional[str]): User agent to report in requests. Defaults to None (ckanapi's default).
+        session (Optional[requests.Session]): Session to use. Defaults to None (create with get_session).
+        max_retries (Optional[int]): Maximum number of retries of an idempotent action. Defaults to 3.
+        backoff_factor (Optional[float]): Base delay in seconds which doubles on each retry. Defaults to 0.5.
+        max_backoff (Optional[float]): Maximum delay in seconds between retries. Defaults to 30.
+        rate_limiter (Optional[RateLimiter]): Rate limiter to use. Defaults to None (no rate limiting).
+        metrics (Optional[RequestMetrics]): Request metrics collector. Defaults to None (no metrics).
+    """
+
+    def __init__(self, address: str, apikey: Optional[str] = None, user_agent: Optional[str] = None,
+                 session: Optional[requests.Session] = None, max_retries: Optional[int] = 3,
+                 backoff_factor: Optional[float] = 0.5, max_backoff: Optional[float] = 30,
+                 rate_limiter: Optional[RateLimiter] = None, metrics: Optional[RequestMetrics] = None):
+        super(RemoteCKAN, self).__init__(address, apikey=apikey, user_agent=user_agent)
+        if session is None:
+            session = get_session()
+        self.session = session
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self._local = threading.local()
+
+    def call_action(self, action, data_dict=None, context=None, apikey=None, files=None, requests_kwargs=None):
+        self._local.payload_bytes = 0
+        self._local.response_bytes = 0
+        self._local.retries = 0
+        outcome = 'success'
+        start_time = time.perf_counter()
+        try:
+            if files and not context and not self.get_only:
+                return self._upload_action(action, data_dict, files, apikey, requests_kwargs)
+            return super(RemoteCKAN, self).call_action(action, data_dict=data_dict, context=context, apikey=apikey,
+                                                       files=files, requests_kwargs=requests_kwargs)
+        except Exception as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            if self.metrics is not None:
+                identifier = None
+                if data_dict:
+                    identifier = data_dict.get('id', data_dict.get('name'))
+                self.metrics.record(action, identifier, time.perf_counter() - start_time,
+                                    self._local.payload_bytes, self._local.response_bytes, self._local.retries,
+                                    outcome)
+
+    def _upload_action(self, action: str, data_dict: Optional[dict], files: Dict[str, str], apikey: Optional[str],
+                       requests_kwargs: Optional[dict]) -> Any:
+        """Call action sending data and files as a multipart request streamed from disk
+
+        Args:
+            action (str): Action name eg. resource_create
+            data_dict (Optional[dict]): Fields to send
+            files (Dict[str, str]): Paths of files to upload keyed by field name
+            apikey (Optional[str]): API key to use instead of the default
+            requests_kwargs (Optional[dict]): Parameters to pass to requests
+
+        Returns:
+            Any: Result of action
+        """
+        url, _, headers = prepare_action(action, apikey=apikey or self.apikey)
+        data = MultipartStream(data_dict or dict(), files)
+        headers['Content-Type'] = data.content_type
+        headers['User-Agent'] = self.user_agent
+        url = self.address.rstrip('/') + '/' + url
+        status, response = self._request_fn(url, data, headers, None, requests_kwargs or dict())
+        return reverse_apicontroller_action(url, status, response)
+
+    def _backoff(self, retry: int, retry_after: Optional[str] = None) -> float:
+        """Get delay before a retry using exponential backoff with full jitter, or the server's Retry-After header
+        if it gave one
+
+        Args:
+            retry (int): Number of retries already made
+            retry_after (Optional[str]): Value of Retry-After header. Defaults to None.
+
+        Returns:
+            float: Delay in seconds
+        """
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** retry))
+
+    def _request_fn(self, url, data, headers, files, requests_kwargs) -> Tuple[int, str]:
+        """Post to url, retrying idempotent actions that fail transiently
+
+        Returns:
+            (int, str): (HTTP status code, Response text)
+        """
+        action = url.rsplit('/', 1)[-1]
+        if files or isinstance(data, MultipartStream) or not action.endswith(IDEMPOTENT_SUFFIXES):
+            max_retries = 0
+        else:
+            max_retries = self.max_retries
+        if isinstance(data, (bytes, str, MultipartStream)):
+            self._local.payload_bytes = len(data)
+        retry = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                r = self.session.post(url, data=data, headers=headers, files=files, allow_redirects=False,
+                                      **requests_kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._local.retries = retry
+                if retry >= max_retries:
+                    raise
+                reason = str(e)
+                delay = self._backoff(retry)
+            else:
+                if self.rate_limiter:
+                    if r.status_code in THROTTLE_STATUSES:
+                        self.rate_limiter.throttled()
+                    else:
+                        self.rate_limiter.success()
+                self._local.retries = retry
+                if r.status_code not in RETRY_STATUSES or retry >= max_retries:
+                    self._local.response_bytes = len(r.content)
+                    return r.status_code, r.text
+                reason = 'HTTP status %d' % r.status_code
+                delay = self._backoff(retry, r.headers.get('Retry-After'))
+            retry += 1
+            logger.warning('%s failed (%s). Retry %d of %d in %.1fs' % (action, reason, retry, max_retries, delay))
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """Close the underlying session and its pooled connections
+
+        Returns:
+            None
+        """
+        self.session.close()
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""File upload utilities"""
+import hashlib
+import json
+import os
+import uuid
+from os.path import basename
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str, chunk_size: Optional[int] = CHUNK_SIZE) -> Tuple[str, int]:
+    """Get SHA256 digest and size of a file reading it in chunks
+
+    Args:
+        path (str): Path to file
+        chunk_size (Optional[int]): Number of bytes to read at a time. Defaults to 1MB.
+
+    Returns:
+        (str, int): (Hexadecimal SHA256 digest, Size in bytes)
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+            size += len(chunk)
+    return sha256.hexdigest(), size
+
+
+class MultipartStream(object):
+    """Body of a multipart/form-data request that is generated as it is sent so that files are read in chunks rather
+    than held in memory. Its length is known in advance so the request has a Content-Length header.
+
+    Args:
+        fields (Dict[str, Any]): Form fields. Values that are not strings are sent as JSON and None values are omitted.
+        files (Dict[str, str]): Paths of files to send keyed by field name
+        chunk_size (Optional[int]): Number of bytes of a file to read at a time. Defaults to 1MB.
+    """
+
+    def __init__(self, fields: Dict[str, Any], files: Dict[str, str], chunk_size: Optional[int] = CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.content_type = 'multipart/form-data; boundary=%s' % self.boundary
+        self.parts = list()
+        for name, value in fields.items():
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            self.parts.append(('%s%s\r\n' % (self._part_header(name), value)).encode('utf-8'))
+        for name, path in files.items():
+            header = self._part_header(name, basename(path))
+            self.parts.append(('%sContent-Type: application/octet-stream\r\n\r\n' % header[:-2]).encode('utf-8'))
+            self.parts.append(path)
+            self.parts.append(b'\r\n')
+        self.parts.append(('--%s--\r\n' % self.boundary).encode('utf-8'))
+        self.length = sum(len(part) if isinstance(part, bytes) else os.path.getsize(part) for part in self.parts)
+        self.iterator = None
+        self.buffer = b''
+
+    def _part_header(self, name: str, filename: Optional[str] = None) -> str:
+        """Get header of a part of the body
+
+        Args:
+            name (str): Field name
+            filename (Optional[str]): File name if part is a file. Defaults to None.
+
+        Returns:
+            str: Part header ending with a blank line
+        """
+        disposition = 'form-data; name="%s"' % name
+        if filename is not None:
+            disposition = '%s; filename="%s"' % (disposition, filename)
+        return '--%s\r\nContent-Disposition: %s\r\n\r\n' % (self.boundary, disposition)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            with open(part, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                    yield chunk
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Read the next bytes of the body
+
+        Args:
+            size (Optional[int]): Maximum number of bytes to read. Defaults to -1 (all remaining).
+
+        Returns:
+            bytes: Next bytes of the body which are empty at the end
+        """
+        if self.iterator is None:
+            self.iterator = iter(self)
+        while size is None or size < 0 or len(self.buffer) < size:
+            chunk = next(self.iterator, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size is None or size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
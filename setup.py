@@ -21,6 +21,7 @@ setup(
     author_email='rans@email.com',
     description='HDX Python Library',
 
+    python_requires='>=3.7',
     install_requires=requirements,
     package_data={
         # If any package contains *.yml files, include them:
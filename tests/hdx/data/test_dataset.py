@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: UTF-8 -*-
 """Dataset Tests"""
+import asyncio
 import copy
 import json
+import threading
 from os.path import join
 
 import pytest
@@ -10,14 +12,17 @@ import requests
 
 from hdx.configuration import Configuration
 from hdx.data.dataset import Dataset
-from hdx.data.hdxobject import HDXError
+from hdx.data.hdxobject import HDXError, HDXObjectList
+from hdx.data.resource import Resource
 from hdx.utilities.dictionary import merge_two_dictionaries
+from hdx.utilities.fakeckan import FakeCKAN
 
 
 class MockResponse:
     def __init__(self, status_code, text):
         self.status_code = status_code
         self.text = text
+        self.content = text.encode('utf-8')
 
     def json(self):
         return json.loads(self.text)
@@ -192,15 +197,15 @@ class TestDataset():
 
     @pytest.fixture(scope='function')
     def read(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             return mockshow(url, datadict)
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_create(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             if 'show' in url or 'related_list' in url:
                 return mockshow(url, datadict)
@@ -226,11 +231,11 @@ class TestDataset():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=dataset_create"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_update(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             if 'show' in url or 'related_list' in url:
                 return mockshow(url, datadict)
@@ -265,11 +270,11 @@ class TestDataset():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=dataset_update"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_delete(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             decodedata = data.decode('utf-8')
             datadict = json.loads(decodedata)
             if 'show' in url or 'related_list' in url:
@@ -288,7 +293,27 @@ class TestDataset():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=dataset_delete"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
+
+    @pytest.fixture(scope='function')
+    def search(self, monkeypatch):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
+            datadict = json.loads(data.decode('utf-8'))
+            if 'package_search' not in url:
+                return MockResponse(404,
+                                    '{"success": false, "error": {"message": "TEST ERROR: Not search", "__type": "TEST ERROR: Not Search Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=package_search"}')
+            if datadict['q'] == 'FAIL':
+                return MockResponse(500, 'Internal Server Error')
+            results = list()
+            for i in range(datadict['start'], min(datadict['start'] + datadict['rows'], 5)):
+                resultdictcopy = copy.deepcopy(resultdict)
+                resultdictcopy['name'] = 'MyDataset%d' % i
+                results.append(resultdictcopy)
+            result = json.dumps({'count': 5, 'results': results})
+            return MockResponse(200,
+                                '{"success": true, "result": %s, "help": "http://test-data.humdata.org/api/3/action/help_show?name=package_search"}' % result)
+
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='class')
     def configuration(self):
@@ -302,12 +327,87 @@ class TestDataset():
         assert dataset['name'] == 'MyDataset1'
         assert dataset['dataset_date'] == '06/04/2016'
         assert len(dataset.resources) == 2
-        assert len(dataset.gallery) == 1
+        assert dataset.gallery == []
+        assert len(dataset.get_gallery()) == 1
+        assert dataset.resources[0].hdxpostsite is dataset.hdxpostsite
+        assert dataset.gallery[0].hdxpostsite is configuration.remoteckan()
         dataset = Dataset.read_from_hdx(configuration, 'TEST2')
         assert dataset is None
         dataset = Dataset.read_from_hdx(configuration, 'TEST3')
         assert dataset is None
 
+    def test_read_from_hdx_async(self, configuration, read):
+        async def read_datasets():
+            return await asyncio.gather(Dataset.read_from_hdx_async(configuration, 'TEST1'),
+                                        Dataset.read_from_hdx_async(configuration, 'TEST2'))
+
+        loop = asyncio.new_event_loop()
+        datasets = loop.run_until_complete(read_datasets())
+        loop.close()
+        assert datasets[0]['id'] == '6f36a41c-f126-4b18-aaaf-6c2ddfbc5d4d'
+        assert len(datasets[0].resources) == 2
+        assert datasets[1] is None
+
+    def test_read_many_from_hdx(self, configuration, read):
+        datasets, errors = Dataset.read_many_from_hdx(configuration, ['TEST1', 'TEST2', ''], max_workers=2)
+        assert datasets['TEST1']['id'] == '6f36a41c-f126-4b18-aaaf-6c2ddfbc5d4d'
+        assert len(datasets['TEST1'].resources) == 2
+        assert datasets['TEST2'] is None
+        assert '' not in datasets
+        assert list(errors.keys()) == ['']
+        assert isinstance(errors[''], HDXError)
+
+    def test_read_from_hdx_cached(self, post_update, monkeypatch):
+        hdx_key_file = join('fixtures', '.hdxkey')
+        configuration = Configuration(hdx_key_file=hdx_key_file, project_config_dict={'cache': {'ttl': 60}})
+        urls = list()
+        post = requests.Session.post
+
+        def countingpost(session, url, *args, **kwargs):
+            urls.append(url)
+            return post(session, url, *args, **kwargs)
+
+        monkeypatch.setattr(requests.Session, 'post', countingpost)
+        dataset = Dataset.read_from_hdx(configuration, 'TEST1')
+        assert len(urls) == 1
+        assert len(dataset.get_gallery()) == 1
+        assert len(urls) == 2
+        dataset = Dataset.read_from_hdx(configuration, 'TEST1')
+        assert len(urls) == 2
+        assert len(dataset.resources) == 2
+        assert len(dataset.get_gallery()) == 1
+        assert len(urls) == 2
+        dataset['id'] = 'TEST1'
+        dataset.update_in_hdx(update_gallery=False)
+        assert len(urls) == 3
+        assert configuration.cache().get('package_show', 'TEST1')[0] is False
+        assert configuration.cache().get('related_list', '6f36a41c-f126-4b18-aaaf-6c2ddfbc5d4d')[0] is False
+
+    def test_cached_by_name_after_resource_update(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'cache': {'ttl': 60}})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        dataset.add_update_resources(copy.deepcopy(TestDataset.resources_data))
+        dataset.create_in_hdx()
+        dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+        resource = dataset.get_resources()[0]
+        resource['description'] = 'Changed'
+        resource.update_in_hdx()
+        dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+        assert dataset.get_resources()[0]['description'] == 'Changed'
+
+    def test_search_in_hdx(self, configuration, search):
+        datasets = Dataset.search_in_hdx(configuration, 'ACLED', fq='organization:acled', rows=2)
+        dataset = next(datasets)
+        assert dataset['name'] == 'MyDataset0'
+        assert len(dataset.get_resources()) == 2
+        assert 'resources' not in dataset.data
+        assert [dataset['name'] for dataset in datasets] == ['MyDataset%d' % i for i in range(1, 5)]
+        with pytest.raises(HDXError):
+            next(Dataset.search_in_hdx(configuration, 'FAIL'))
+
     def test_create_in_hdx(self, configuration, post_create):
         dataset = Dataset(configuration)
         with pytest.raises(HDXError):
@@ -347,6 +447,309 @@ class TestDataset():
         assert len(dataset.resources) == 2
         assert len(dataset.gallery) == 1
 
+    def test_create_in_hdx_name_resolver(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        remoteckan = configuration.remoteckan()
+        package = remoteckan.call_action('package_create', {'name': 'MyDataset1'})
+        remoteckan.call_action('package_create', {'name': 'MyDataset2'})
+        assert Dataset.seed_name_resolver(configuration, rows=1, complete=True) == 2
+        assert configuration.name_resolver().resolve('MyDataset1') == (True, package['id'])
+        assert configuration.name_resolver().resolve('MyDataset3') == (True, None)
+
+        fake.calls.clear()
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        dataset.create_in_hdx()
+        assert fake.calls['package_show'] == 1
+        assert dataset['id'] == package['id']
+        dataset_data = copy.deepcopy(TestDataset.dataset_data)
+        dataset_data['name'] = 'MyDataset3'
+        dataset = Dataset(configuration, dataset_data)
+        dataset.create_in_hdx()
+        assert fake.calls['package_show'] == 1
+        assert configuration.name_resolver().resolve('MyDataset3') == (True, dataset['id'])
+
+        configuration.name_resolver().add('MyDataset2', 'STALE')
+        dataset_data['name'] = 'MyDataset2'
+        dataset = Dataset(configuration, dataset_data)
+        dataset.update_in_hdx()
+        assert fake.calls['package_show'] == 3
+        assert configuration.name_resolver().resolve('MyDataset2') == (True, dataset['id'])
+        dataset.delete_from_hdx()
+        assert configuration.name_resolver().resolve('MyDataset2') == (True, None)
+
+    def test_update_in_hdx_optimistic(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'optimistic_updates': True, 'skip_unchanged': True})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        dataset.add_update_resources(copy.deepcopy(TestDataset.resources_data))
+        dataset.add_update_galleryitem(copy.deepcopy(TestDataset.gallery_data[0]))
+        dataset.create_in_hdx()
+        dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+
+        fake.calls.clear()
+        dataset['notes'] = 'Other notes'
+        dataset.get_resources()[0]['description'] = 'New description'
+        dataset.get_gallery()[0]['description'] = 'New description'
+        dataset.update_in_hdx()
+        assert fake.calls == {'related_list': 1, 'package_update': 1, 'related_update': 1}
+        assert Dataset.read_from_hdx(configuration, 'MyDataset1').get_resources()[0]['description'] == \
+            'New description'
+        dataset.update_in_hdx(update_gallery=False)
+        assert dataset.unchanged is True
+        assert fake.calls == {'related_list': 1, 'package_update': 1, 'related_update': 1, 'package_show': 1}
+
+        fake.calls.clear()
+        dataset['notes'] = 'Notes without resources'
+        dataset.get_resources()[0]['description'] = 'Not sent'
+        dataset.update_in_hdx(update_resources=False, update_gallery=False)
+        assert fake.calls == {'package_patch': 1}
+        assert dataset.get_resources()[0]['description'] == 'New description'
+        fake.calls.clear()
+        notes_only = Dataset(configuration, {'id': dataset['id'], 'name': 'MyDataset1', 'revision_id': 'x',
+                                             'notes': 'Only notes'})
+        notes_only.update_in_hdx(update_gallery=False)
+        assert fake.calls == {'package_patch': 1}
+        hdx_dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+        assert hdx_dataset['notes'] == 'Only notes'
+        assert len(hdx_dataset.get_resources()) == len(TestDataset.resources_data)
+
+        fake.packages.pop(dataset['id'])
+        fake.package_names.pop('MyDataset1')
+        configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1'})
+        fake.calls.clear()
+        dataset['notes'] = 'Even more notes'
+        dataset.update_in_hdx(update_gallery=False)
+        assert fake.calls == {'package_update': 2, 'package_show': 2, 'related_list': 1}
+        assert dataset['notes'] == 'Even more notes'
+        assert dataset['id'] == configuration.name_resolver().resolve('MyDataset1')[1]
+
+    def test_sync_gallery(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={})
+        threads = set()
+
+        def latency(action):
+            if action.startswith('related_'):
+                threads.add(threading.current_thread().name)
+                return 0.02
+            return 0
+
+        fake = FakeCKAN(latency=latency)
+        fake.install(configuration)
+
+        def galleryitem(i):
+            return {'title': 'MyGalleryItem%d' % i, 'type': 'visualization', 'description': 'Item %d' % i,
+                    'url': 'http://visualisation/%d' % i, 'image_url': 'http://visualisation/%d.png' % i}
+
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        dataset.add_update_gallery([galleryitem(i) for i in range(3)])
+        dataset.create_in_hdx()
+        assert fake.calls == {'package_show': 1, 'package_create': 1, 'related_create': 3}
+        assert len(threads) == 3
+        assert [item['title'] for item in dataset.get_gallery()] == ['MyGalleryItem%d' % i for i in range(3)]
+
+        fake.calls.clear()
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        gallery = [galleryitem(i) for i in range(1, 5)]
+        gallery[0]['description'] = 'Changed'
+        dataset.add_update_gallery(gallery)
+        dataset.create_in_hdx()
+        assert fake.calls == {'package_show': 1, 'related_list': 1, 'package_update': 1, 'related_update': 1,
+                              'related_create': 2}
+        assert [item['title'] for item in dataset.get_gallery()] == ['MyGalleryItem%d' % i for i in range(5)]
+        assert [item['description'] for item in Dataset.read_from_hdx(configuration, 'MyDataset1').get_gallery()] \
+            == ['Item 0', 'Changed', 'Item 2', 'Item 3', 'Item 4']
+        snapshots = dataset.get_old_data_dict()['gallery']
+        shared = [snapshot._data is galleryitem._data for snapshot, galleryitem in zip(snapshots, dataset.gallery)]
+        assert shared == [True, False, True]
+        dataset.gallery.invalidate()
+        assert dataset.gallery.find('title', 'MyGalleryItem2') == 2
+        assert dataset.gallery.data_list()[0] is snapshots[0]._data
+        assert dataset.gallery != snapshots
+        assert snapshots[0]._data is dataset.gallery[0]._data
+        assert snapshots[2]._data is dataset.gallery[2]._data
+
+    def test_lazy_gallery(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'optimistic_updates': True})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        galleryitem = {'title': 'MyGalleryItem1', 'type': 'visualization', 'description': 'My GalleryItem',
+                       'url': 'http://visualisation/url/', 'image_url': 'http://myvisual/visual.png'}
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        dataset.add_update_galleryitem(dict(galleryitem))
+        dataset.create_in_hdx()
+
+        fake.calls.clear()
+        dataset = next(Dataset.search_in_hdx(configuration))
+        assert dataset.gallery == []
+        assert fake.calls == {'package_search': 1}
+        assert dataset.get_gallery()[0]['title'] == 'MyGalleryItem1'
+        assert fake.calls == {'package_search': 1, 'related_list': 1}
+
+        fake.calls.clear()
+        dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+        assert fake.calls == {'package_show': 1}
+        galleryitem['description'] = 'Changed'
+        dataset.add_update_galleryitem(galleryitem)
+        dataset.update_in_hdx()
+        assert fake.calls == {'package_show': 1, 'package_patch': 1, 'related_list': 1, 'related_update': 1}
+        assert [item['description'] for item in fake.related.values()] == ['Changed']
+
+    def test_lazy_resources(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        resources = [{'name': 'Resource%d' % i, 'format': 'csv', 'url': 'http://resource%d.csv' % i,
+                      'description': 'Resource %d' % i} for i in range(2000)]
+        configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1', 'resources': resources})
+        dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+        assert len(dataset.get_resources()) == 2000
+        assert dataset.get_resources().materialised() == 0
+        resource = dataset.get_resources()[1999]
+        assert isinstance(resource, Resource)
+        assert resource['name'] == 'Resource1999'
+        assert dataset.get_resources()[1999] is resource
+        assert dataset.get_resources().materialised() == 1
+        assert [resource['name'] for resource in dataset.get_resources()[1:3]] == ['Resource1', 'Resource2']
+        assert dataset.get_resources().materialised() == 3
+
+        resource['description'] = 'Changed'
+        dataset.delete_resource(dataset.get_resources().data_list()[0]['id'])
+        assert dataset.get_resources().materialised() == 3
+        assert dataset.get_resources()[:2] == dataset.get_resources().data_list()[:2]
+        dataset.update_in_hdx()
+        resources = Dataset.read_from_hdx(configuration, 'MyDataset1').get_resources()
+        assert len(resources) == 1999
+        assert resources[1998]['description'] == 'Changed'
+
+    def test_indexed_resources(self, configuration, monkeypatch):
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        resources = dataset.get_resources()
+        indexed = list()
+        index_item = resources._index_item
+        monkeypatch.setattr(resources, '_index_item', lambda *args: indexed.append(args[1]) or index_item(*args))
+        dataset.add_update_resources([{'name': 'Resource%d' % i, 'format': 'csv', 'description': 'Resource %d' % i}
+                                      for i in range(5000)])
+        dataset.add_update_resources([{'name': 'Resource%d' % i, 'url': 'http://resource%d.csv' % i}
+                                      for i in range(5000)])
+        assert len(resources) == 5000
+        assert len(indexed) == 5000
+        assert resources[4999]['url'] == 'http://resource4999.csv'
+        assert resources.get('name', 'Resource10') is resources[10]
+        assert resources.find('name', 'NotResource') is None
+
+        resources[10]['name'] = 'Renamed'
+        assert resources.find('name', 'Resource10') is None
+        assert resources.find('name', 'Renamed') == 10
+        resources[11]['id'] = 'abc'
+        assert resources.find('id', 'abc') == 11
+        del resources[0]
+        assert resources.find('id', 'abc') == 10
+        dataset.add_update_resource({'name': 'Resource5000', 'format': 'csv', 'description': 'New'})
+        assert resources.find('name', 'Resource5000') == 4999
+
+        dataset.add_update_gallery([{'title': 'Gallery1', 'url': 'http://gallery1'},
+                                    {'title': 'Gallery1', 'url': 'http://gallery2'}])
+        assert len(dataset.get_gallery()) == 1
+        assert dataset.get_gallery().get('title', 'Gallery1')['url'] == 'http://gallery2'
+
+    def test_indexed_resources_delete(self, configuration, monkeypatch):
+        resources = HDXObjectList(configuration, Resource, [{'name': 'Resource%d' % i, 'id': 'id%d' % i}
+                                                            for i in range(5000)])
+        assert resources.find('id', 'id0') == 0
+        indexed = list()
+        index_item = resources._index_item
+        monkeypatch.setattr(resources, '_index_item', lambda *args: indexed.append(args[1]) or index_item(*args))
+        resources[4001]['name'] = 'Renamed'
+        for i in range(0, 5000, 2):
+            del resources[resources.find('id', 'id%d' % i)]
+            assert resources.find('id', 'id%d' % (i + 1)) == i // 2
+        assert len(resources) == 2500
+        assert resources.find('name', 'Renamed') == 2000
+        assert resources.find('name', 'Resource4001') is None
+        assert resources.find('id', 'id4999') == 2499
+        del resources[-1]
+        del resources[100]
+        resources.insert(50, {'name': 'Inserted', 'id': 'new'})
+        assert resources.find('id', 'new') == 50
+        assert resources.find('id', 'id203') == 101
+        assert resources[101]['id'] == 'id203'
+        assert indexed == [50]
+
+    def test_update_in_hdx_no_duplicates(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        dataset_data = copy.deepcopy(TestDataset.dataset_data)
+        dataset_data['tags'] = [{'name': 'conflict'}, {'name': 'violence'}]
+        Dataset(configuration, copy.deepcopy(dataset_data)).create_in_hdx()
+        for _ in range(3):
+            dataset = Dataset(configuration, copy.deepcopy(dataset_data))
+            dataset.update_in_hdx()
+        assert dataset['groups'] == TestDataset.dataset_data['groups']
+        assert dataset['tags'] == [{'name': 'conflict'}, {'name': 'violence'}]
+
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'merge_strategies': {'tags': 'replace'}})
+        fake.install(configuration)
+        dataset_data['tags'] = [{'name': 'conflict'}]
+        dataset = Dataset(configuration, dataset_data)
+        dataset.update_in_hdx()
+        assert dataset['tags'] == [{'name': 'conflict'}]
+
+    def test_upload_files(self, tmpdir):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        path = tmpdir.join('my_resource.csv')
+        path.write_binary(b'code,value\nA,1\n')
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        resource = Resource(configuration, {'name': 'Resource1', 'format': 'csv', 'description': 'One'})
+        resource.set_file_to_upload(str(path))
+        dataset.add_update_resources([resource, {'name': 'Resource2', 'format': 'csv', 'url': 'http://resource2.csv',
+                                                 'description': 'Two'}])
+        dataset.create_in_hdx()
+        resources = dataset.get_resources()
+        assert fake.uploads == {resources[0]['id']: b'code,value\nA,1\n'}
+        assert resources[0]['url_type'] == 'upload'
+
+        fake.calls.clear()
+        dataset = Dataset(configuration, copy.deepcopy(TestDataset.dataset_data))
+        resource = Resource(configuration, {'name': 'Resource1', 'format': 'csv', 'description': 'One'})
+        resource.set_file_to_upload(str(path))
+        dataset.add_update_resource(resource)
+        dataset.update_in_hdx()
+        assert fake.calls['resource_update'] == 1
+        assert len(fake.uploads) == 1
+
+    def test_create_many_in_hdx(self, configuration, post_create):
+        datasets = list()
+        for name in ('MyDataset1', 'MyDataset2', 'MyDataset1'):
+            dataset_data = copy.deepcopy(TestDataset.dataset_data)
+            dataset_data['name'] = name
+            datasets.append(Dataset(configuration, dataset_data))
+        report = Dataset.create_many_in_hdx(datasets, max_workers=2)
+        assert [entry['name'] for entry in report['created']] == ['MyDataset1', 'MyDataset1']
+        assert [entry['name'] for entry in report['failed']] == ['MyDataset2']
+        assert isinstance(report['failed'][0]['error'], HDXError)
+        assert report['updated'] == report['unchanged'] == report['cancelled'] == []
+        assert report['seconds'] >= report['created'][0]['seconds'] >= 0
+        assert datasets[0]['id'] == '6f36a41c-f126-4b18-aaaf-6c2ddfbc5d4d'
+
+        datasets = list()
+        for name in ('MyDataset2', 'MyDataset1', 'MyDataset1'):
+            dataset_data = copy.deepcopy(TestDataset.dataset_data)
+            dataset_data['name'] = name
+            datasets.append(Dataset(configuration, dataset_data))
+        report = Dataset.create_many_in_hdx(datasets, max_workers=1, fail_fast=True)
+        assert [entry['name'] for entry in report['failed']] == ['MyDataset2']
+        assert [entry['name'] for entry in report['cancelled']] == ['MyDataset1', 'MyDataset1']
+        assert report['created'] == []
+
     def test_update_in_hdx(self, configuration, post_update):
         dataset = Dataset(configuration)
         dataset['id'] = 'NOTEXIST'
@@ -390,6 +793,19 @@ class TestDataset():
         assert len(dataset.resources) == 2
         assert len(dataset.gallery) == 1
 
+    def test_update_in_hdx_async(self, configuration, post_update):
+        dataset = Dataset.read_from_hdx(configuration, 'TEST1')
+        dataset['dataset_date'] = '02/26/2016'
+        dataset['id'] = 'TEST1'
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(dataset.update_in_hdx_async(update_gallery=False))
+        dataset['id'] = 'NOTEXIST'
+        del dataset['name']
+        with pytest.raises(HDXError):
+            loop.run_until_complete(dataset.update_in_hdx_async())
+        loop.close()
+        assert dataset['dataset_date'] == '02/26/2016'
+
     def test_delete_from_hdx(self, configuration, post_delete):
         dataset = Dataset.read_from_hdx(configuration, 'TEST1')
         dataset.delete_from_hdx()
@@ -18,6 +18,7 @@ class MockResponse:
     def __init__(self, status_code, text):
         self.status_code = status_code
         self.text = text
+        self.content = text.encode('utf-8')
 
     def json(self):
         return json.loads(self.text)
@@ -76,15 +77,15 @@ class TestGalleryItem():
 
     @pytest.fixture(scope='function')
     def read(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             return mockshow(url, datadict)
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_create(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             if 'show' in url:
                 return mockshow(url, datadict)
@@ -106,11 +107,11 @@ class TestGalleryItem():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=related_create"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_update(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             if 'show' in url:
                 return mockshow(url, datadict)
@@ -134,11 +135,11 @@ class TestGalleryItem():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=related_update"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_delete(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             decodedata = data.decode('utf-8')
             datadict = json.loads(decodedata)
             if 'show' in url:
@@ -153,7 +154,7 @@ class TestGalleryItem():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=related_delete"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='class')
     def configuration(self):
@@ -170,6 +171,13 @@ class TestGalleryItem():
         galleryitem = GalleryItem.read_from_hdx(configuration, 'TEST3')
         assert galleryitem is None
 
+    def test_read_many_from_hdx(self, configuration, read):
+        galleryitems, errors = GalleryItem.read_many_from_hdx(configuration, ['TEST1', 'TEST2', 'TEST3'])
+        assert galleryitems['TEST1']['title'] == 'MyGalleryItem1'
+        assert galleryitems['TEST2'] is None
+        assert galleryitems['TEST3'] is None
+        assert errors == {}
+
     def test_create_in_hdx(self, configuration, post_create):
         galleryitem = GalleryItem(configuration)
         with pytest.raises(HDXError):
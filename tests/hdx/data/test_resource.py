@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: UTF-8 -*-
 """Resource Tests"""
+import asyncio
 import copy
+import gc
 import json
+import warnings
 from os.path import join
 
 import pytest
@@ -12,12 +15,14 @@ from hdx.configuration import Configuration
 from hdx.data.hdxobject import HDXError
 from hdx.data.resource import Resource
 from hdx.utilities.dictionary import merge_two_dictionaries
+from hdx.utilities.fakeckan import FakeCKAN
 
 
 class MockResponse:
     def __init__(self, status_code, text):
         self.status_code = status_code
         self.text = text
+        self.content = text.encode('utf-8')
 
     def json(self):
         return json.loads(self.text)
@@ -70,15 +75,15 @@ class TestResource():
 
     @pytest.fixture(scope='function')
     def read(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             return mockshow(url, datadict)
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_create(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             if 'show' in url:
                 return mockshow(url, datadict)
@@ -99,11 +104,11 @@ class TestResource():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=resource_create"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_update(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             datadict = json.loads(data.decode('utf-8'))
             if 'show' in url:
                 return mockshow(url, datadict)
@@ -127,11 +132,11 @@ class TestResource():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=resource_update"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='function')
     def post_delete(self, monkeypatch):
-        def mockreturn(url, data, headers, files, allow_redirects, auth):
+        def mockreturn(_, url, data, headers, files, allow_redirects, auth):
             decodedata = data.decode('utf-8')
             datadict = json.loads(decodedata)
             if 'show' in url:
@@ -146,7 +151,7 @@ class TestResource():
             return MockResponse(404,
                                 '{"success": false, "error": {"message": "Not found", "__type": "Not Found Error"}, "help": "http://test-data.humdata.org/api/3/action/help_show?name=resource_delete"}')
 
-        monkeypatch.setattr(requests, 'post', mockreturn)
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
 
     @pytest.fixture(scope='class')
     def configuration(self):
@@ -224,6 +229,71 @@ class TestResource():
         assert resource['id'] == 'TEST1'
         assert resource['format'] == 'xlsx'
 
+    def test_update_in_hdx_unchanged(self, post_update, monkeypatch):
+        hdx_key_file = join('fixtures', '.hdxkey')
+        configuration = Configuration(hdx_key_file=hdx_key_file, project_config_dict={'skip_unchanged': True})
+        monkeypatch.setitem(resultdict, 'id', 'TEST1')
+        urls = list()
+        post = requests.Session.post
+
+        def countingpost(session, url, *args, **kwargs):
+            urls.append(url)
+            return post(session, url, *args, **kwargs)
+
+        monkeypatch.setattr(requests.Session, 'post', countingpost)
+        resource = Resource.read_from_hdx(configuration, 'TEST1')
+        resource['revision_id'] = 'NEW REVISION'
+        resource.update_in_hdx()
+        assert resource.unchanged is True
+        assert configuration.skipped_updates == [('resource', 'TEST1')]
+        assert [url.rsplit('/', 1)[-1] for url in urls] == ['resource_show', 'resource_show']
+        resource['format'] = 'CSV'
+        resource.update_in_hdx()
+        assert resource.unchanged is False
+        assert resource['format'] == 'CSV'
+        assert configuration.skipped_updates == [('resource', 'TEST1')]
+        assert [url.rsplit('/', 1)[-1] for url in urls][-1] == 'resource_update'
+
+    def test_update_in_hdx_patch(self, post_update, monkeypatch):
+        hdx_key_file = join('fixtures', '.hdxkey')
+        configuration = Configuration(hdx_key_file=hdx_key_file, project_config_dict={'patch_updates': True})
+        monkeypatch.setitem(resultdict, 'id', 'TEST1')
+        posts = list()
+        post = requests.Session.post
+
+        def patchpost(session, url, data, *args, **kwargs):
+            datadict = json.loads(data.decode('utf-8'))
+            posts.append((url.rsplit('/', 1)[-1], datadict))
+            if 'patch' in url:
+                resultdictcopy = copy.deepcopy(resultdict)
+                resultdictcopy.update(datadict)
+                return MockResponse(200, '{"success": true, "result": %s}' % json.dumps(resultdictcopy))
+            return post(session, url, data, *args, **kwargs)
+
+        monkeypatch.setattr(requests.Session, 'post', patchpost)
+        resource = Resource.read_from_hdx(configuration, 'TEST1')
+        resource['format'] = 'CSV'
+        resource.update_in_hdx()
+        assert posts[-1] == ('resource_patch', {'id': 'TEST1', 'format': 'CSV'})
+        assert resource['format'] == 'CSV'
+        assert resource['name'] == 'MyResource1'
+
+        def failpatchpost(session, url, data, *args, **kwargs):
+            posts.append((url.rsplit('/', 1)[-1], None))
+            return post(session, url, data, *args, **kwargs)
+
+        monkeypatch.setattr(requests.Session, 'post', failpatchpost)
+        resource['description'] = 'New description'
+        resource.update_in_hdx()
+        assert [action for action, _ in posts[-3:]] == ['resource_show', 'resource_patch', 'resource_update']
+        assert resource['description'] == 'New description'
+
+        posts.clear()
+        resource = Resource.read_from_hdx(configuration, 'TEST1')
+        resource.update_in_hdx()
+        assert [action for action, _ in posts] == ['resource_show', 'resource_show']
+        assert resource.unchanged is True
+
     def test_delete_from_hdx(self, configuration, post_delete):
         resource = Resource.read_from_hdx(configuration, 'TEST1')
         resource.delete_from_hdx()
@@ -231,6 +301,184 @@ class TestResource():
         with pytest.raises(HDXError):
             resource.delete_from_hdx()
 
+    def test_create_in_hdx_async(self, configuration, post_create):
+        resource_data = copy.deepcopy(TestResource.resource_data)
+        resource = Resource(configuration, resource_data)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(resource.create_in_hdx_async())
+        loop.close()
+        assert resource['id'] == 'de6549d8-268b-4dfe-adaf-a4ae5c8510d5'
+
+    def test_delete_from_hdx_async(self, configuration, post_delete):
+        resource = Resource.read_from_hdx(configuration, 'TEST1')
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(resource.delete_from_hdx_async())
+        del resource['id']
+        with pytest.raises(HDXError):
+            loop.run_until_complete(resource.delete_from_hdx_async())
+        loop.close()
+
+    def test_snapshot(self, configuration):
+        resource = Resource(configuration, {'name': 'MyResource1', 'tags': [{'name': 'a'}]})
+        snapshot = resource.snapshot()
+        other_snapshot = resource.snapshot()
+        assert snapshot._data is resource._data is other_snapshot._data
+        assert snapshot['name'] == 'MyResource1'
+        assert snapshot._data is resource._data
+        resource['name'] = 'Changed'
+        assert snapshot['name'] == other_snapshot['name'] == 'MyResource1'
+        assert snapshot._data is other_snapshot._data
+        snapshot['tags'].append({'name': 'b'})
+        assert other_snapshot['tags'] == resource['tags'] == [{'name': 'a'}]
+        assert other_snapshot.shared is None
+        assert snapshot == {'name': 'MyResource1', 'tags': [{'name': 'a'}, {'name': 'b'}]}
+        copied = copy.copy(resource)
+        copied['name'] = 'Copied'
+        assert resource['name'] == 'Changed'
+
+    def test_compact(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'drop_server_fields': True, 'keep_old_data': False})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        package = configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1'})
+        resource = Resource(configuration, {'package_id': package['id'], 'name': 'MyResource1', 'format': 'csv',
+                                            'url': 'http://test/my_resource.csv', 'description': 'My Resource',
+                                            'tracking_summary': {'total': 0, 'recent': 0}})
+        assert vars(resource) == dict()
+        resource.create_in_hdx()
+        assert 'tracking_summary' not in resource
+        assert 'revision_id' in resource
+        assert resource.get_old_data_dict() is None
+        resource = Resource.read_from_hdx(configuration, resource['id'])
+        assert 'created' in resource
+        resource['description'] = 'Changed'
+        resource.update_in_hdx()
+        assert resource.get_old_data_dict() is None
+        assert resource['description'] == 'Changed'
+
+        data = {'name': 'MyResource1', 'tracking_summary': {'total': 0, 'recent': 0}}
+        resource = Resource(Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={}))
+        assert resource._compact_metadata(data) is data
+        resource = Resource(Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                          project_config_dict={'intern_keys': True}))
+        compacted = resource._compact_metadata(data)
+        assert compacted is not data
+        assert compacted == data
+
+    def test_update_changed_in_hdx_patch_only(self):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict={})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        package = configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1'})
+        resource = Resource(configuration, {'package_id': package['id'], 'name': 'MyResource1', 'format': 'csv',
+                                            'url': 'http://test/my_resource.csv', 'description': 'My Resource'})
+        resource.create_in_hdx()
+        resource['format'] = 'xlsx'
+        resource._update_changed_in_hdx('resource', 'id', patch_only=True)
+        assert fake.calls.get('resource_patch') == 1
+        assert 'resource_update' not in fake.calls
+        assert resource['format'] == 'xlsx'
+
+    def test_upload(self, tmpdir):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'skip_unchanged': True})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        package = configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1'})
+        path = tmpdir.join('my_resource.csv')
+        path.write_binary(b'code,value\n' * 100000)
+        resource = Resource(configuration, {'package_id': package['id'], 'name': 'MyResource1', 'format': 'csv',
+                                            'url': 'http://test/my_resource.csv', 'description': 'My Resource'})
+        resource.set_file_to_upload(str(path))
+        assert 'url' not in resource
+        resource.create_in_hdx()
+        assert fake.uploads[resource['id']] == path.read_binary()
+        assert resource['url'].endswith('/download/my_resource.csv')
+        assert resource['size'] == 1100000
+        assert len(resource['hash']) == 64
+        assert resource.file_to_upload is None
+        metrics = configuration.metrics().summary()['resource_create']
+        assert metrics['payload_bytes'] > 1100000
+
+        fake.uploads.clear()
+        resource = Resource(configuration, {'id': resource['id'], 'description': 'My Resource'})
+        resource.set_file_to_upload(str(path))
+        resource.update_in_hdx()
+        assert fake.uploads == dict()
+        assert configuration.skipped_updates == [('resource', resource['id'])]
+
+        path.write_binary(b'code,value\n' * 10)
+        resource.set_file_to_upload(str(path))
+        resource.update_in_hdx()
+        assert fake.uploads[resource['id']] == path.read_binary()
+        assert resource['size'] == 110
+
+    def test_create_datastore(self, tmpdir):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'datastore': {'batch_size': 300}})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        package = configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1'})
+        resource = Resource(configuration, {'package_id': package['id'], 'name': 'MyResource1', 'format': 'csv',
+                                            'url': 'http://test/my_resource.csv', 'description': 'My Resource'})
+        resource.create_in_hdx()
+        with pytest.raises(HDXError) as excinfo:
+            resource._datastore_action('datastore_create', {'fields': list()})
+        assert 'read-only' in str(excinfo.value.__cause__)
+        assert resource['id'] not in fake.datastores
+        path = tmpdir.join('my_resource.csv')
+        path.write_text('code,value\n' + ''.join('C%d,%d\n' % (i, i) for i in range(1000)), encoding='utf-8')
+        resource.create_datastore(str(path))
+        datastore = fake.datastores[resource['id']]
+        assert datastore['fields'] == [{'id': 'code', 'type': 'text'}, {'id': 'value', 'type': 'int'}]
+        assert len(datastore['records']) == 1000
+        assert datastore['records'][999] == {'code': 'C999', 'value': 999}
+        assert fake.calls['datastore_upsert'] == 4
+        resource.create_datastore(join('..', 'workingexample', 'my_resource.csv'), batch_size=10, max_workers=2)
+        assert fake.datastores[resource['id']]['records'] == [{'a': 1, 'b': 2, 'c': 3}]
+        del resource['id']
+        with pytest.raises(HDXError):
+            resource.create_datastore(str(path))
+
+    def test_update_datastore(self, tmpdir):
+        configuration = Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                                      project_config_dict={'datastore': {'batch_size': 100, 'max_workers': 4}})
+        fake = FakeCKAN()
+        fake.install(configuration)
+        package = configuration.remoteckan().call_action('package_create', {'name': 'MyDataset1',
+                                                                             'resources': [{'name': 'MyResource1'}]})
+        resource = Resource.read_from_hdx(configuration, package['resources'][0]['id'])
+        path = tmpdir.join('my_resource.csv')
+        path.write_text('date,value\n' + ''.join('2016-01-%02d,%d\n' % (i, i) for i in range(1, 31)),
+                        encoding='utf-8')
+        resource.create_datastore(str(path), primary_key='date', indexes=['value'])
+        datastore = fake.datastores[resource['id']]
+        assert datastore['primary_key'] == ['date']
+        assert datastore['indexes'] == ['value']
+        path.write_text('date,value\n2016-01-30,300\n2016-01-31,31\n', encoding='utf-8')
+        fake.calls.clear()
+        assert resource.get('url_type') != 'datastore'
+        resource.update_datastore(str(path))
+        assert fake.calls == {'datastore_create': 1, 'datastore_upsert': 1}
+        assert len(datastore['records']) == 31
+        assert datastore['records'][29:] == [{'date': '2016-01-30', 'value': 300}, {'date': '2016-01-31', 'value': 31}]
+
+        path.write_text('date,value\n' + ''.join('2016-02-%02d,%d\n' % (i % 28 + 1, i) for i in range(1000)),
+                        encoding='utf-8')
+        with pytest.raises(HDXError) as e:
+            resource.create_datastore(str(path), primary_key='date')
+        assert 'rows 1-100 (' in str(e.value)
+        assert 'Key' in str(e.value)
+
+        resource['id'] = 'NOTEXIST'
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            with pytest.raises(HDXError):
+                resource.update_datastore(str(path))
+            gc.collect()
+        assert not [warning for warning in caught if issubclass(warning.category, ResourceWarning)]
+
     def test_update_yaml(self, configuration, static_yaml):
         resource_data = copy.deepcopy(TestResource.resource_data)
         resource = Resource(configuration, resource_data)
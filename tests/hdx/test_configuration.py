@@ -222,3 +222,20 @@ class TestConfiguration():
                                              project_config_yaml=project_config_yaml)
         assert actual_configuration.get_api_key() == '12345'
         assert actual_configuration.get_hdx_site() == 'https://uat-data.humdata.org/'
+
+    def test_remoteckan(self, hdx_key_file, project_config_yaml):
+        actual_configuration = Configuration(hdx_key_file=hdx_key_file, project_config_yaml=project_config_yaml)
+        remoteckan = actual_configuration.remoteckan()
+        assert remoteckan is actual_configuration.remoteckan()
+        assert remoteckan.address == 'https://test-data.humdata.org/'
+        assert remoteckan.apikey == '12345'
+        adapter = remoteckan.session.get_adapter('https://test-data.humdata.org/')
+        assert adapter.timeout == 60
+        assert adapter._pool_maxsize == 10
+        actual_configuration = Configuration(hdx_key_file=hdx_key_file,
+                                             hdx_config_dict={'hdx_test_site': 'https://test-data.humdata.org/',
+                                                              'session': {'pool_maxsize': 20, 'timeout': 5}},
+                                             project_config_dict={})
+        adapter = actual_configuration.remoteckan().session.get_adapter('https://test-data.humdata.org/')
+        assert adapter.timeout == 5
+        assert adapter._pool_maxsize == 20
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Cache Tests"""
+import time
+
+from hdx.utilities.cache import ResponseCache
+
+
+class TestCache():
+    def test_get_set(self):
+        cache = ResponseCache()
+        assert cache.get('package_show', 'a') == (False, None)
+        cache.set('package_show', 'a', {'id': 'a', 'tags': [1, 2]})
+        found, result = cache.get('package_show', 'a')
+        assert found is True
+        assert result == {'id': 'a', 'tags': [1, 2]}
+        result['tags'].append(3)
+        assert cache.get('package_show', 'a') == (True, {'id': 'a', 'tags': [1, 2]})
+        assert cache.get('related_list', 'a') == (False, None)
+        assert cache.hits == 2
+        assert cache.misses == 2
+
+    def test_ttl(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        cache = ResponseCache(ttl=10)
+        cache.set('package_show', 'a', {'id': 'a'})
+        now[0] = 109.0
+        assert cache.get('package_show', 'a')[0] is True
+        now[0] = 111.0
+        assert cache.get('package_show', 'a')[0] is False
+        assert len(cache) == 0
+
+    def test_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set('package_show', 'a', 1)
+        cache.set('package_show', 'b', 2)
+        cache.get('package_show', 'a')
+        cache.set('package_show', 'c', 3)
+        assert cache.get('package_show', 'b')[0] is False
+        assert cache.get('package_show', 'a')[0] is True
+        assert cache.get('package_show', 'c')[0] is True
+
+        cache = ResponseCache(max_bytes=10)
+        cache.set('package_show', 'a', 'abcd')
+        cache.set('package_show', 'b', 'efgh')
+        assert cache.bytes == 6
+        assert len(cache) == 1
+        assert cache.get('package_show', 'b') == (True, 'efgh')
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache.set('package_show', 'a', 1)
+        cache.set('related_list', 'a', [])
+        cache.set('package_show', 'b', 2)
+        cache.invalidate('a')
+        cache.invalidate('z')
+        assert len(cache) == 1
+        assert cache.get('package_show', 'b') == (True, 2)
+        cache.set('package_show', 'name', {'id': 'c'}, ['c', 'name'])
+        cache.invalidate('c')
+        assert cache.get('package_show', 'name')[0] is False
+        assert 'name' not in cache.keys_by_identifier
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.bytes == 0
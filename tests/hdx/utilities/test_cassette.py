@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Cassette Tests"""
+import time
+from os.path import join
+
+import pytest
+
+from hdx.configuration import Configuration, ConfigurationError
+from hdx.data.dataset import Dataset
+from hdx.data.hdxobject import HDXError
+from hdx.utilities.cassette import install_cassette
+from hdx.utilities.fakeckan import FakeCKAN
+
+
+class TestCassette():
+    dataset_data = {
+        'name': 'MyDataset1', 'title': 'MyDataset1', 'private': False, 'notes': 'Some notes',
+        'dataset_source': 'Source', 'owner_org': 'org', 'dataset_date': '06/04/2016',
+        'groups': [{'name': 'world'}], 'license_id': 'cc-by', 'methodology': 'Other',
+        'data_update_frequency': '7'
+    }
+
+    @staticmethod
+    def configuration(cassette=None):
+        project_config_dict = {'retry': {'max_retries': 0}}
+        if cassette:
+            project_config_dict['cassette'] = cassette
+        return Configuration(hdx_key_file=join('fixtures', '.hdxkey'), project_config_dict=project_config_dict)
+
+    def test_record_replay(self, tmpdir):
+        path = str(tmpdir.join('cassette.jsonl.gz'))
+        configuration = self.configuration()
+        fake = FakeCKAN(latency=0.05)
+        fake.install(configuration)
+        recorder = install_cassette(configuration.remoteckan().session, configuration.get_hdx_site(), path, 'record')
+        dataset = Dataset(configuration, dict(self.dataset_data))
+        dataset.add_update_resource({'name': 'Resource1', 'format': 'csv', 'url': 'http://resource1.csv',
+                                     'description': 'One'})
+        dataset.create_in_hdx()
+        dataset['notes'] = 'Other notes'
+        dataset.update_in_hdx()
+        assert Dataset.read_from_hdx(configuration, 'MyDataset2') is None
+        recorder.close()
+        recorded_calls = sum(fake.calls.values())
+
+        configuration = self.configuration({'path': path, 'mode': 'replay'})
+        player = configuration.remoteckan().session.get_adapter(configuration.get_hdx_site())
+        assert player.remaining() == recorded_calls
+        dataset = Dataset(configuration, dict(self.dataset_data))
+        dataset.add_update_resource({'name': 'Resource1', 'format': 'csv', 'url': 'http://resource1.csv',
+                                     'description': 'One'})
+        start_time = time.perf_counter()
+        dataset.create_in_hdx()
+        assert time.perf_counter() - start_time < 0.05
+        assert dataset['id'] in fake.packages
+        dataset['notes'] = 'Other notes'
+        dataset.update_in_hdx()
+        assert dataset['notes'] == 'Other notes'
+        assert Dataset.read_from_hdx(configuration, 'MyDataset2') is None
+        assert player.remaining() == 0
+        with pytest.raises(HDXError):
+            Dataset.read_from_hdx(configuration, 'MyDataset1')
+
+        configuration = self.configuration({'path': path, 'mode': 'replay', 'latency': True})
+        start_time = time.perf_counter()
+        assert Dataset.read_from_hdx(configuration, 'MyDataset2') is None
+        assert time.perf_counter() - start_time >= 0.05
+
+    @pytest.mark.parametrize('filename', ['cassette.jsonl.gz', 'cassette.jsonl'])
+    def test_unclosed_recording(self, tmpdir, filename):
+        path = str(tmpdir.join(filename))
+        configuration = self.configuration()
+        fake = FakeCKAN()
+        fake.install(configuration)
+        install_cassette(configuration.remoteckan().session, configuration.get_hdx_site(), path, 'record')
+        Dataset(configuration, dict(self.dataset_data)).create_in_hdx()
+        assert Dataset.read_from_hdx(configuration, 'MyDataset2') is None
+        recorded_calls = sum(fake.calls.values())
+
+        configuration = self.configuration({'path': path, 'mode': 'replay'})
+        player = configuration.remoteckan().session.get_adapter(configuration.get_hdx_site())
+        assert player.remaining() == recorded_calls
+
+        with open(path, 'rb') as f:
+            recording = f.read()
+        with open(path, 'wb') as f:
+            f.write(recording[:-10])
+        configuration = self.configuration({'path': path, 'mode': 'replay'})
+        player = configuration.remoteckan().session.get_adapter(configuration.get_hdx_site())
+        assert player.remaining() == recorded_calls - 1
+        assert Dataset(configuration, dict(self.dataset_data)).create_in_hdx() is None
+
+    def test_invalid_mode(self, tmpdir):
+        with pytest.raises(ConfigurationError):
+            self.configuration({'path': str(tmpdir.join('cassette.jsonl')), 'mode': 'rewind'})
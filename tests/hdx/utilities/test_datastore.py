@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Datastore Tests"""
+import threading
+import time
+
+import pytest
+
+from hdx.utilities.datastore import BatchError, batched, infer_type, read_csv_records, run_batches
+
+
+class TestDatastore():
+    def test_infer_type(self):
+        assert infer_type(['1', '-2', '']) == 'int'
+        assert infer_type(['1', '3000000000']) == 'bigint'
+        assert infer_type(['1', '2.5', '1e3']) == 'numeric'
+        assert infer_type(['2016-06-07', '2016-06-07T08:57:27.367939']) == 'timestamp'
+        assert infer_type(['1', 'a']) == 'text'
+        assert infer_type(['1', '2016-06-07']) == 'text'
+        assert infer_type(['', ' ']) == 'text'
+
+    def test_read_csv_records(self, tmpdir):
+        path = tmpdir.join('my_resource.csv')
+        path.write_text('﻿code,value,date\nA,1,2016-06-07\nB,,2016-06-08\n\nC,2.5\n', encoding='utf-8')
+        with open(str(path), 'r', encoding='utf-8-sig', newline='') as f:
+            fields, records = read_csv_records(f, sample_size=2)
+            assert fields == [{'id': 'code', 'type': 'text'}, {'id': 'value', 'type': 'int'},
+                              {'id': 'date', 'type': 'timestamp'}]
+            assert list(records) == [{'code': 'A', 'value': 1, 'date': '2016-06-07'},
+                                     {'code': 'B', 'value': None, 'date': '2016-06-08'},
+                                     {'code': 'C', 'value': '2.5', 'date': None}]
+        with open(str(path), 'r', encoding='utf-8-sig', newline='') as f:
+            fields, records = read_csv_records(f, fields=[{'id': 'code'}, {'id': 'value', 'type': 'numeric'}])
+            assert next(records) == {'code': 'A', 'value': 1.0}
+
+    def test_run_batches(self):
+        read = list()
+
+        def items():
+            for i in range(100):
+                read.append(i)
+                yield i
+
+        lock = threading.Lock()
+        sent = list()
+        in_flight = [0, 0]
+
+        def send(batch):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+                assert len(read) <= (len(sent) + 4) * 10
+            time.sleep(0.01)
+            with lock:
+                sent.append(batch)
+                in_flight[0] -= 1
+
+        assert run_batches(send, batched(items(), 10), max_workers=3) == 10
+        assert sorted(i for batch in sent for i in batch) == list(range(100))
+        assert in_flight[1] == 3
+        assert run_batches(sent.append, batched(range(5), 2)) == 3
+        assert sent[-3:] == [[0, 1], [2, 3], [4]]
+
+        def fail(batch):
+            if batch[0] == 20:
+                time.sleep(0.05)
+                raise ValueError('Bad batch 2')
+            if batch[0] == 30:
+                raise ValueError('Bad batch 3')
+
+        started = list()
+        with pytest.raises(BatchError) as e:
+            run_batches(lambda batch: started.append(batch) or fail(batch), batched(range(1000), 10), max_workers=3)
+        assert [(error['batch'], error['start'], error['size'], str(error['error'])) for error in e.value.errors] == \
+            [(2, 20, 10, 'Bad batch 2'), (3, 30, 10, 'Bad batch 3')]
+        assert str(e.value) == 'batch 2 (items 20-29): Bad batch 2; batch 3 (items 30-39): Bad batch 3'
+        assert len(started) < 10
+        with pytest.raises(BatchError) as e:
+            run_batches(fail, batched(range(25), 10))
+        assert e.value.errors[0]['size'] == 5
@@ -1,6 +1,9 @@
+import copy
+
 import pytest
 
-from hdx.utilities.dictionary import merge_dictionaries, dict_diff
+from hdx.utilities.dictionary import merge_dictionaries, merge_two_dictionaries, dict_diff, dict_fingerprint, \
+    intern_keys, iter_dict_changes, nested_dict_diff
 
 
 class TestDictionary():
@@ -15,6 +18,25 @@ class TestDictionary():
         assert result == {1: 1, 2: 6, 3: 3, 4: {8: '8', 'g': 3, 'b': 'c', 'a': 1}, 5: 7, 6: 9, 8: {'k': 'b', 3: 12},
                           9: {'e': 'h', 'c': 12}}
 
+    def test_merge_strategies(self):
+        d1 = {'tags': [{'name': 'a', 'x': 1}, {'name': 'b'}], 'groups': [{'id': '1'}], 'list': [1, 2], 'other': [1]}
+        d2 = {'tags': [{'name': 'b', 'x': 2}, {'name': 'c'}], 'groups': [{'id': '2'}], 'list': [2, 3], 'other': [2]}
+        result = merge_two_dictionaries(d1, d2, {'groups': 'replace', 'other': 'append'}, 'union')
+        assert result == {'tags': [{'name': 'a', 'x': 1}, {'name': 'b', 'x': 2}, {'name': 'c'}],
+                          'groups': [{'id': '2'}], 'list': [1, 2, 3], 'other': [1, 2]}
+        assert merge_two_dictionaries(result, d2, {'groups': 'replace', 'other': 'append'}, 'union')['tags'] == \
+            [{'name': 'a', 'x': 1}, {'name': 'b', 'x': 2}, {'name': 'c'}]
+        assert merge_two_dictionaries({'a': [[1], [2]]}, {'a': [[2], [3]]}, default_strategy='union') == \
+            {'a': [[1], [2], [3]]}
+        assert merge_two_dictionaries({'a': [1]}, {'a': [1]}) == {'a': [1, 1]}
+        with pytest.raises(ValueError):
+            merge_two_dictionaries({'a': [1]}, {'a': [1]}, {'a': 'merge'})
+        d1 = {'resources': [{'name': 'r%d' % i} for i in range(10000)]}
+        d2 = {'resources': [{'name': 'r%d' % i, 'url': 'u'} for i in range(5000, 15000)]}
+        result = merge_two_dictionaries(d1, d2, default_strategy='union')['resources']
+        assert len(result) == 15000
+        assert result[9999] == {'name': 'r9999', 'url': 'u'}
+
     def test_dict_diff(self):
         d1 = {1: 1, 2: 2, 3: 3, 4: {'a': 1, 'b': 'c'}}
         d2 = {4: {'a': 1, 'b': 'c'}, 2: 2, 3: 3, 1: 1}
@@ -30,3 +52,53 @@ class TestDictionary():
         del d1[4]
         diff = dict_diff(d1, d2)
         assert diff == {4: ('<KEYNOTFOUND>', {'a': 1, 'b': 'c'})}
+
+    def test_nested_dict_diff(self):
+        d1 = {'name': 'a', 'tags': [{'name': 't1'}, {'name': 't2'}], 'extras': {'x': 1, 'y': {'z': 2}},
+              'resources': [{'name': 'Resource1', 'url': 'http://1', 'revision_id': 'r1'},
+                            {'id': '2', 'url': 'http://2'}], 'formats': ['csv', 'xlsx']}
+        d2 = copy.deepcopy(d1)
+        assert nested_dict_diff(d1, d2) == {}
+        d2['tags'].reverse()
+        d2['resources'][0]['revision_id'] = 'r2'
+        assert nested_dict_diff(d1, d2, ignore_keys=['revision_id']) == {}
+        d2['resources'][0]['url'] = 'http://3'
+        d2['extras']['y']['z'] = 3
+        del d2['extras']['x']
+        d2['tags'].append({'name': 't3'})
+        del d2['resources'][1]
+        d2['formats'] = ['csv']
+        d2['title'] = 'A'
+        assert nested_dict_diff(d1, d2, no_key=None, ignore_keys=['revision_id']) == {
+            'resources[name=Resource1].url': ('http://1', 'http://3'),
+            'resources[id=2]': ({'id': '2', 'url': 'http://2'}, None),
+            'extras.y.z': (2, 3),
+            'extras.x': (1, None),
+            'tags[name=t3]': (None, {'name': 't3'}),
+            'formats': (['csv', 'xlsx'], ['csv']),
+            'title': (None, 'A')}
+        assert list(iter_dict_changes(d1, d2))[0] == ('tags[name=t3]', '<KEYNOTFOUND>', {'name': 't3'})
+        d2 = {'resources': [{'url': 'http://1', 'revision_id': 'r1'}]}
+        d3 = {'resources': [{'url': 'http://1', 'revision_id': 'r2'}]}
+        assert nested_dict_diff(d2, d3, ignore_keys=['revision_id']) == {}
+        assert nested_dict_diff(d2, d3) == {'resources': (d2['resources'], d3['resources'])}
+        assert nested_dict_diff(d2, d3, key_fields=['url']) == {'resources[url=http://1].revision_id': ('r1', 'r2')}
+
+    def test_dict_fingerprint(self):
+        d1 = {1: 1, 'a': [{'b': 2, 'revision_id': 'x'}], 'revision_id': 'y'}
+        d2 = {'a': [{'revision_id': 'z', 'b': 2}], 1: 1}
+        assert dict_fingerprint(d1) != dict_fingerprint(d2)
+        assert dict_fingerprint(d1, ['revision_id']) == dict_fingerprint(d2, ['revision_id'])
+        d2['a'][0]['b'] = 3
+        assert dict_fingerprint(d1, ['revision_id']) != dict_fingerprint(d2, ['revision_id'])
+
+    def test_intern_keys(self):
+        d1 = {''.join(['na', 'me']): 'a', 1: [{''.join(['na', 'me']): 'b', 'tracking_summary': {'total': 1}}],
+              'tracking_summary': 2}
+        d2 = intern_keys(d1)
+        assert d2 == d1
+        assert d2 is not d1
+        keys = [key for key in d2 if key == 'name'] + [key for key in d2[1][0] if key == 'name']
+        assert keys[0] is keys[1]
+        assert intern_keys(d1, ['tracking_summary']) == {'name': 'a', 1: [{'name': 'b'}]}
+        assert intern_keys('value') == 'value'
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Fake CKAN Tests"""
+import time
+from os.path import join
+
+import ckanapi
+import pytest
+
+from hdx.configuration import Configuration
+from hdx.data.dataset import Dataset
+from hdx.utilities.fakeckan import FakeCKAN
+
+
+class TestFakeCKAN():
+    dataset_data = {
+        'name': 'MyDataset1', 'title': 'MyDataset1', 'private': False, 'notes': 'Some notes',
+        'dataset_source': 'Source', 'owner_org': 'org', 'dataset_date': '06/04/2016',
+        'groups': [{'name': 'world'}], 'license_id': 'cc-by', 'methodology': 'Other',
+        'data_update_frequency': '7'
+    }
+
+    resources_data = [{'name': 'Resource1', 'format': 'csv', 'url': 'http://resource1.csv', 'description': 'One'},
+                      {'name': 'Resource2', 'format': 'xls', 'url': 'http://resource2.xls', 'description': 'Two'}]
+
+    @pytest.fixture(scope='function')
+    def configuration(self):
+        return Configuration(hdx_key_file=join('fixtures', '.hdxkey'),
+                             project_config_dict={'retry': {'backoff_factor': 0}})
+
+    @pytest.fixture(scope='function')
+    def fake(self, configuration):
+        fake = FakeCKAN(seed=1)
+        fake.install(configuration)
+        return fake
+
+    def test_dataset_lifecycle(self, configuration, fake):
+        dataset = Dataset(configuration, dict(self.dataset_data))
+        dataset.add_update_resources(self.resources_data)
+        dataset.create_in_hdx()
+        assert dataset['id'] in fake.packages
+        assert [resource['position'] for resource in dataset.get_resources()] == [0, 1]
+
+        dataset = Dataset.read_from_hdx(configuration, 'MyDataset1')
+        assert dataset['title'] == 'MyDataset1'
+        assert [resource['name'] for resource in dataset.get_resources()] == ['Resource1', 'Resource2']
+        dataset['notes'] = 'Other notes'
+        dataset.update_in_hdx()
+        assert Dataset.read_from_hdx(configuration, 'MyDataset1')['notes'] == 'Other notes'
+        assert len(fake.resources) == 2
+
+        dataset.delete_resource(dataset.get_resources()[0]['id'])
+        assert len(fake.resources) == 1
+        assert Dataset.read_from_hdx(configuration, 'NotMyDataset') is None
+        assert fake.calls['package_create'] == 1
+        assert configuration.metrics().summary()['package_show']['outcomes']['NotFound'] == 2
+        dataset.delete_from_hdx()
+        assert list(fake.packages.values())[0]['state'] == 'deleted'
+
+    def test_errors_and_latency(self, configuration, fake):
+        remoteckan = configuration.remoteckan()
+        with pytest.raises(ckanapi.ValidationError):
+            remoteckan.call_action('package_create', {'title': 'No name'})
+        with pytest.raises(ckanapi.CKANAPIError):
+            remoteckan.call_action('unknown_action', {})
+        fake.error_rate = 1
+        with pytest.raises(ckanapi.CKANAPIError):
+            remoteckan.call_action('package_show', {'id': 'MyDataset1'})
+        assert fake.calls['package_show'] == configuration.remoteckan().max_retries + 1
+        fake.error_rate = 0
+        fake.latency = lambda action: 0.05 if action == 'package_search' else 0
+        start_time = time.perf_counter()
+        assert remoteckan.call_action('package_search', {'q': '*:*'}) == {'count': 0, 'results': list()}
+        assert time.perf_counter() - start_time >= 0.05
+
+    def test_related_and_datastore(self, configuration, fake):
+        remoteckan = configuration.remoteckan()
+        package = remoteckan.call_action('package_create', {'name': 'ds', 'resources': [{'name': 'r'}]})
+        related = remoteckan.call_action('related_create', {'dataset_id': 'ds', 'title': 'Gallery1'})
+        assert related['dataset_id'] == package['id']
+        assert remoteckan.call_action('related_list', {'id': 'ds'}) == [related]
+        resource_id = package['resources'][0]['id']
+        remoteckan.call_action('datastore_create', {'resource_id': resource_id, 'force': True, 'primary_key': 'code',
+                                                    'fields': [{'id': 'code'}, {'id': 'value'}],
+                                                    'records': [{'code': 'A', 'value': 1}]})
+        with pytest.raises(ckanapi.ValidationError):
+            remoteckan.call_action('datastore_upsert', {'resource_id': resource_id, 'records': [{'code': 'C'}]})
+        remoteckan.call_action('datastore_upsert', {'resource_id': resource_id, 'force': True,
+                                                    'records': [{'code': 'A', 'value': 2}, {'code': 'B', 'value': 3}]})
+        result = remoteckan.call_action('datastore_search', {'resource_id': resource_id})
+        assert result['total'] == 2
+        assert result['records'] == [{'code': 'A', 'value': 2}, {'code': 'B', 'value': 3}]
+        assert remoteckan.call_action('resource_show', {'id': resource_id})['datastore_active'] is True
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Metrics Tests"""
+import logging
+
+import pytest
+
+from hdx.utilities.metrics import RequestMetrics, percentile
+
+
+class TestMetrics():
+    def test_percentile(self):
+        assert percentile([], 0.5) is None
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([3.0], 0.99) == 3
+
+    def test_record(self, caplog):
+        metrics = RequestMetrics()
+        requests = list()
+        metrics.add_hook(requests.append)
+        metrics.record('package_show', 'a', 0.5, 10, 1000, 0, 'success')
+        metrics.record('package_show', 'b', 0.1, 10, 100, 2, 'NotFound')
+        metrics.record('package_update', 'a', 1.5, 5000, 1000, 0, 'success')
+        assert requests[1] == {'action': 'package_show', 'identifier': 'b', 'seconds': 0.1, 'payload_bytes': 10,
+                               'response_bytes': 100, 'retries': 2, 'outcome': 'NotFound'}
+        metrics.remove_hook(requests.append)
+        metrics.record('package_show', 'c', 0.3, 10, 100, 0, 'success')
+        assert len(requests) == 3
+        summary = metrics.summary()
+        assert summary['package_show'].pop('total_seconds') == pytest.approx(0.9)
+        assert summary['package_show'] == {'count': 3, 'outcomes': {'success': 2, 'NotFound': 1},
+                                           'payload_bytes': 30, 'response_bytes': 1200, 'retries': 2,
+                                           'p50': 0.3, 'p95': 0.5, 'p99': 0.5}
+        assert summary['package_update']['count'] == 1
+        with caplog.at_level(logging.INFO):
+            metrics.log_summary()
+        assert 'package_show: 3 requests (NotFound: 1, success: 2), 2 retries' in caplog.text
+        metrics.reset()
+        assert metrics.summary() == {}
+
+    def test_failing_hook(self, caplog):
+        metrics = RequestMetrics()
+        requests = list()
+
+        def hook(request):
+            raise ValueError('hook failed')
+
+        metrics.add_hook(hook)
+        metrics.add_hook(requests.append)
+        with caplog.at_level(logging.ERROR):
+            metrics.record('package_show', 'a', 0.5, 10, 1000, 0, 'success')
+        assert 'hook failed' in caplog.text
+        assert len(requests) == 1
+
+    def test_max_latencies(self):
+        metrics = RequestMetrics(max_latencies=100)
+        for i in range(1000):
+            metrics.record('package_show', str(i), float(i), 0, 0, 0, 'success')
+        assert len(metrics.actions['package_show']['latencies']) == 100
+        summary = metrics.summary()['package_show']
+        assert summary['count'] == 1000
+        assert summary['total_seconds'] == sum(range(1000))
+        assert 0 <= summary['p50'] < 1000
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Session Tests"""
+import time
+
+import pytest
+import requests
+
+from hdx.utilities.metrics import RequestMetrics
+from hdx.utilities.ratelimiter import RateLimiter
+from hdx.utilities.session import RemoteCKAN, get_session
+
+
+class MockResponse:
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or dict()
+
+
+class TestSession():
+    @pytest.fixture(scope='function')
+    def sleeps(self, monkeypatch):
+        sleeps = list()
+        monkeypatch.setattr(time, 'sleep', sleeps.append)
+        return sleeps
+
+    @pytest.fixture(scope='function')
+    def responses(self, monkeypatch):
+        responses = list()
+        calls = list()
+
+        def mockreturn(_, url, data, headers, files, allow_redirects):
+            calls.append(url)
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        monkeypatch.setattr(requests.Session, 'post', mockreturn)
+        return responses, calls
+
+    def test_get_session(self):
+        session = get_session(pool_maxsize=5, timeout=2)
+        adapter = session.get_adapter('http://localhost')
+        assert adapter.timeout == 2
+        assert adapter._pool_maxsize == 5
+
+    def test_retry(self, responses, sleeps):
+        responses, calls = responses
+        remoteckan = RemoteCKAN('http://localhost', max_retries=2, backoff_factor=1)
+        responses.extend([requests.ConnectionError('down'), MockResponse(502, 'Bad Gateway'),
+                          MockResponse(200, '{"success": true, "result": {"id": "1"}}')])
+        assert remoteckan.call_action('package_show', {'id': '1'}) == {'id': '1'}
+        assert len(calls) == 3
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[0] <= 1
+        assert 0 <= sleeps[1] <= 2
+
+        responses.extend([MockResponse(429, 'Too Many', {'Retry-After': '7'}), MockResponse(503, 'Unavailable'),
+                          MockResponse(503, 'Unavailable')])
+        with pytest.raises(Exception):
+            remoteckan.call_action('package_show', {'id': '1'})
+        assert len(calls) == 6
+        assert sleeps[2] == 7
+
+    def test_metrics(self, responses, sleeps):
+        responses, calls = responses
+        metrics = RequestMetrics()
+        requests_metrics = list()
+        metrics.add_hook(requests_metrics.append)
+        remoteckan = RemoteCKAN('http://localhost', max_retries=2, metrics=metrics)
+        response = '{"success": true, "result": {"id": "1", "title": "Côte d\'Ivoire"}}'
+        responses.extend([MockResponse(502, 'Bad Gateway'), MockResponse(200, response),
+                          MockResponse(404, '{"success": false, "error": {"__type": "Not Found Error"}}')])
+        remoteckan.call_action('package_show', {'id': '1'})
+        with pytest.raises(Exception):
+            remoteckan.call_action('package_update', {'name': 'a'})
+        assert requests_metrics[0]['action'] == 'package_show'
+        assert requests_metrics[0]['identifier'] == '1'
+        assert requests_metrics[0]['payload_bytes'] == len('{"id": "1"}')
+        assert requests_metrics[0]['response_bytes'] == len(response.encode('utf-8')) == len(response) + 1
+        assert requests_metrics[0]['retries'] == 1
+        assert requests_metrics[0]['outcome'] == 'success'
+        assert requests_metrics[1]['identifier'] == 'a'
+        assert requests_metrics[1]['retries'] == 0
+        assert requests_metrics[1]['outcome'] == 'NotFound'
+        assert metrics.summary()['package_show']['count'] == 1
+
+        def failing_hook(request):
+            raise ValueError('hook failed')
+
+        metrics.add_hook(failing_hook)
+        responses.append(MockResponse(200, response))
+        assert remoteckan.call_action('package_show', {'id': '1'})['id'] == '1'
+        assert metrics.summary()['package_show']['count'] == 2
+
+    def test_no_retry_create(self, responses, sleeps):
+        responses, calls = responses
+        remoteckan = RemoteCKAN('http://localhost', max_retries=2)
+        responses.append(requests.ConnectionError('down'))
+        with pytest.raises(requests.ConnectionError):
+            remoteckan.call_action('package_create', {'name': '1'})
+        assert len(calls) == 1
+        assert sleeps == []
+
+    def test_rate_limiter(self, responses, sleeps):
+        responses, calls = responses
+        rate_limiter = RateLimiter(rate=10, min_rate=1, max_rate=11, increase=0.5, decrease_factor=0.5)
+        remoteckan = RemoteCKAN('http://localhost', max_retries=1, rate_limiter=rate_limiter)
+        responses.extend([MockResponse(429, 'Too Many'), MockResponse(200, '{"success": true, "result": []}')])
+        remoteckan.call_action('related_list', {'id': '1'})
+        assert rate_limiter.rate == 5.5
+        for _ in range(3):
+            rate_limiter.success()
+        assert rate_limiter.rate == 7
+        for _ in range(5):
+            rate_limiter.throttled()
+        assert rate_limiter.rate == 1
+        for _ in range(30):
+            rate_limiter.success()
+        assert rate_limiter.rate == 11
+
+    def test_rate_limiter_acquire(self, sleeps):
+        rate_limiter = RateLimiter(rate=4)
+        assert rate_limiter.acquire() == 0
+        assert rate_limiter.acquire() == pytest.approx(0.25, abs=0.01)
+        assert sleeps[0] == pytest.approx(0.25, abs=0.01)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""Upload Tests"""
+import hashlib
+from email.parser import BytesParser
+
+from hdx.utilities.upload import MultipartStream, file_digest
+
+
+class TestUpload():
+    def test_file_digest(self, tmpdir):
+        path = tmpdir.join('file.csv')
+        content = b'code,value\n' * 1000
+        path.write_binary(content)
+        assert file_digest(str(path), chunk_size=100) == (hashlib.sha256(content).hexdigest(), 11000)
+
+    def test_multipart_stream(self, tmpdir):
+        path = tmpdir.join('file.csv')
+        content = b'code,value\n' * 1000
+        path.write_binary(content)
+        stream = MultipartStream({'name': 'Resource1', 'size': 11000, 'url': None}, {'upload': str(path)},
+                                 chunk_size=100)
+        body = b''
+        while True:
+            chunk = stream.read(1000)
+            if not chunk:
+                break
+            assert len(chunk) <= 1000
+            body += chunk
+        assert len(body) == len(stream)
+        assert body == b''.join(stream)
+        message = BytesParser().parsebytes(b'Content-Type: ' + stream.content_type.encode('utf-8') + b'\r\n\r\n' +
+                                           body)
+        parts = {part.get_param('name', header='content-disposition'): part for part in message.get_payload()}
+        assert list(parts.keys()) == ['name', 'size', 'upload']
+        assert parts['name'].get_payload(decode=True) == b'Resource1'
+        assert parts['size'].get_payload(decode=True) == b'11000'
+        assert parts['upload'].get_filename() == 'file.csv'
+        assert parts['upload'].get_payload(decode=True) == content